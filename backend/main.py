@@ -3,6 +3,7 @@ import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
+import pandas as pd
 
 # Load environment variables
 load_dotenv()
@@ -15,10 +16,16 @@ sys.path.append(
 )
 sys.path.append(os.path.dirname(os.path.abspath(__file__))) # Add backend to path
 
+# 🐼 Copy-on-write for the whole process: the dataset caches (services/frame_cache.py)
+# hand out shallow copies of shared frames, and dataset versions share their unchanged
+# columns; with it, a write always lands in the writer's own copy
+pd.set_option("mode.copy_on_write", True)
+
 # Database
 from database.database import engine
 from models.user import Base  # 🔥 use Base, not User
 from routes import auth, upload, profiling, preprocess, recommendation
+from utils.json_sanitizer import FastJSONResponse
 
 # Create tables
 Base.metadata.create_all(bind=engine)
@@ -26,7 +33,9 @@ Base.metadata.create_all(bind=engine)
 app = FastAPI(
     title="AutoML Backend",
     description="FastAPI backend for React + ML AutoML Assistant",
-    version="1.0.0"
+    version="1.0.0",
+    # ⚡ orjson rendering (numpy values and NaN/Inf handled natively)
+    default_response_class=FastJSONResponse
 )
 
 # 🌍 CORS Configuration
@@ -51,6 +60,14 @@ app.include_router(automl.router)
 app.include_router(monitoring.router)
 app.include_router(report.router)
 
+# 🧵 Background job workers (queued and interrupted AutoML runs resume after a restart)
+from services.job_queue import job_queue
+
+
+@app.on_event("startup")
+def start_job_workers():
+    job_queue.start()
+
 
 @app.get("/")
 def root():
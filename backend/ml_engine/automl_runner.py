@@ -2,28 +2,46 @@
 import pandas as pd
 import numpy as np
 import os
+from scipy import sparse
 from sklearn.model_selection import train_test_split
 from ml_engine.model_factory import ModelFactory
-from ml_engine.trainer import Trainer
-from ml_engine.evaluator import Evaluator
+from ml_engine.parallel_trainer import train_candidates
+from ml_engine.candidate_racing import race_candidates, use_racing
 from ml_engine.shap_engine import ShapEngine
-# In-memory preprocessing imports
-from logic.preprocessing.missing_handler import handle_missing
-from logic.preprocessing.feature_transformer import encode_and_scale
+from ml_engine.landmarker import Landmarker
+# Fitted preprocessing steps (shared with /preprocess/)
+from services.preprocessing_pipeline import PreprocessingPipeline
 # Recommendation logic
 from logic.selection.algorithm_recommender import recommend_algorithm
 from logic.selection.imbalance_checker import check_class_imbalance
 
 class AutoMLRunner:
-    def __init__(self, dataset_path, target_column):
-        self.dataset_path = dataset_path
+    def __init__(self, df, target_column, pipeline: PreprocessingPipeline = None, racing: bool = None,
+                 racing_budget: dict = None):
+        # The caller loads the frame from the dataset store (no CSV re-parse here);
+        # `pipeline` holds the steps already applied to it (dataset_store.load_pipeline).
+        # `racing`: successive halving on growing subsamples (None: for large training splits);
+        # `racing_budget`: its min_rows, eta and eval_rows (see race_candidates; None: its defaults)
         self.target_column = target_column
-        self.df = pd.read_csv(dataset_path)
+        self.df = df
+        self.pipeline = (pipeline or PreprocessingPipeline()).copy()
+        self.racing = racing
+        self.racing_budget = racing_budget or {}
+
+    def run(self, on_progress=None):
+        # `on_progress(progress)`, if given, receives the stage and per-candidate status
+        # after every change (background jobs store it; an exception it raises aborts the run)
+        progress = {"stage": "recommending", "candidates": []}
+
+        def report(**update):
+            progress.update(update)
+            if on_progress:
+                on_progress(progress)
 
-    def run(self):
         # 1. Basic Validation
         if self.target_column not in self.df.columns:
             raise ValueError(f"Target column '{self.target_column}' not found.")
+        report()
 
         # 2. Determine Task Type & Imbalance
         n_rows = self.df.shape[0]
@@ -39,8 +57,11 @@ class AutoMLRunner:
             imbalance_ratio = 1.0
 
         # 3. Get Recommendations (Top 3)
-        rec_result = recommend_algorithm(self.df, self.target_column, imbalance_ratio)
+        # Landmarking (quick proxy models) picks the algorithm trained first
+        landmarks = Landmarker.extract(self.df, self.target_column)
+        rec_result = recommend_algorithm(self.df, self.target_column, imbalance_ratio, landmarks=landmarks)
         top_algos = [algo['name'] for algo in rec_result['recommendations']] # get 3 names
+        report(stage="preprocessing", candidates=[{"name": name, "status": "pending"} for name in top_algos])
 
         # 4. Preprocess (In-Memory)
         # Auto-detect categorical columns
@@ -48,19 +69,17 @@ class AutoMLRunner:
         if self.target_column in categorical_cols:
              categorical_cols.remove(self.target_column)
 
-        # Apply missing value handling (Drop for simplicity in AutoML mode or Mean)
-        # For AutoML, let's use a safe default: Mean/Mode
-        df_clean = handle_missing(self.df, "Fill with Mean (Numeric Only)", categorical_cols)
-        df_clean = handle_missing(df_clean, "Fill with Mode (Categorical Only)", categorical_cols) # handle categorical missing too
-        
-        # Apply encoding and scaling
-        df_processed = encode_and_scale(df_clean, categorical_cols, self.target_column)
+        # Mean/Mode imputation, encoding and scaling, fitted as further pipeline steps:
+        # what the applied steps already did is reused, and the extended pipeline
+        # (self.pipeline) reproduces the model input from the raw data for inference
+        df_processed = self.pipeline.extend_for_training(self.df, self.target_column, categorical_cols)
 
         # 5. Split Data
-        X = df_processed.drop(columns=[self.target_column])
+        # (X is a sparse CSR matrix when high-cardinality columns were hashed)
+        X, feature_names = self.pipeline.model_matrix(df_processed, self.target_column)
         y = df_processed[self.target_column]
         
-        # Ensure y is numeric for classification if not already processed by encode_and_scale (it should be)
+        # Ensure y is numeric for classification if not already processed by the encoding step (it should be)
         
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
@@ -68,9 +87,6 @@ class AutoMLRunner:
         results = []
         best_model = None
         best_score = -float('inf')
-        
-        trainer = Trainer(task_type)
-        evaluator = Evaluator()
 
         # Tradeoff knowledge base
         tradeoffs = {
@@ -84,13 +100,50 @@ class AutoMLRunner:
             "Neural Network": "Captures complex patterns; Requires much data and tuning, black box."
         }
 
-        for algo_name in top_algos:
+        def candidate_done(i, outcome):
+            if isinstance(outcome, Exception):
+                progress["candidates"][i].update(status="failed", error=str(outcome))
+            elif outcome.get("eliminated"):
+                progress["candidates"][i].update(status="eliminated", metrics=outcome['metrics'],
+                                                 trained_rows=outcome['trained_rows'])
+            else:
+                progress["candidates"][i].update(status="succeeded", metrics=outcome['metrics'],
+                                                 training_time=outcome['training_time'])
+            report()
+
+        def candidate_rung_done(i, rows, outcome):
+            # Racing: each rung a candidate finishes (its progress; a cancelled job stops here)
+            if isinstance(outcome, Exception):
+                progress["candidates"][i].update(rung_rows=rows, rung_error=str(outcome))
+            else:
+                progress["candidates"][i].update(rung_rows=rows, rung_metrics=outcome['metrics'])
+            report()
+
+        # All candidates train at once (worker processes for large data); outcomes come
+        # back in recommendation order, so the leaderboard and best-model ties are deterministic.
+        # While workers train, the progress is re-sent every TRAIN_POLL_INTERVAL_S (`poll=report`), so a
+        # cancelled job stops then rather than when its next candidate finishes
+        racing = self.racing if self.racing is not None else use_racing(X_train.shape[0], len(top_algos))
+        report(stage="racing" if racing else "training",
+               candidates=[{"name": name, "status": "training"} for name in top_algos])
+        schedule = None
+        if racing:
+            # Successive halving: candidates losing on small stratified subsamples are dropped
+            # early, and only the winner is fitted on the whole training split
+            outcomes, schedule = race_candidates(top_algos, task_type, X_train, y_train, X_test, y_test,
+                                                 **self.racing_budget, on_result=candidate_done,
+                                                 on_rung_result=candidate_rung_done, poll=report)
+        else:
+            outcomes = train_candidates(top_algos, task_type, X_train, y_train, X_test, y_test,
+                                        on_result=candidate_done, poll=report)
+
+        for algo_name, train_result in zip(top_algos, outcomes):
             try:
-                # Train
-                train_result = trainer.train_and_evaluate(algo_name, X_train, y_train, X_test)
-                
-                # Evaluate
-                metrics = evaluator.evaluate(y_test, train_result['predictions'], task_type)
+                if isinstance(train_result, Exception):
+                    raise train_result
+
+                # Evaluated where it was trained
+                metrics = train_result['metrics']
                 
                 # Extract Metrics
                 acc = metrics.get('accuracy', 0) if task_type == 'classification' else metrics.get('r2_score', 0)
@@ -123,9 +176,15 @@ class AutoMLRunner:
                     "tradeoffs": tradeoffs.get(algo_name, "Balanced performance."),
                     "metrics": metrics
                 }
+                if schedule is not None:
+                    # (an eliminated candidate's metrics are from its last, smaller rung)
+                    analysis_entry["trained_rows"] = train_result['trained_rows']
+                    analysis_entry["eliminated"] = train_result.get('eliminated', False)
                 results.append(analysis_entry)
                 
-                # track best
+                # track best (an eliminated candidate never is: it was not fitted on the full data)
+                if train_result.get('eliminated'):
+                    continue
                 if acc > best_score:
                     best_score = acc
                     best_model = train_result['model']
@@ -136,22 +195,28 @@ class AutoMLRunner:
                 continue
 
         # 7. SHAP on Best Model
+        report(stage="explaining")
         feature_importance = []
         try:
             if best_model:
                 # Use a smaller sample for SHAP to be fast
-                X_sample = X_train.sample(min(100, len(X_train)), random_state=42)
+                if sparse.issparse(X_train):
+                    # (only the sample is densified)
+                    rows = np.random.default_rng(42).choice(X_train.shape[0], min(100, X_train.shape[0]), replace=False)
+                    X_sample = pd.DataFrame(X_train[rows].toarray(), columns=feature_names)
+                else:
+                    X_sample = X_train.sample(min(100, len(X_train)), random_state=42)
                 feature_importance = ShapEngine.get_feature_importance(best_model, X_sample, task_type)
         except Exception as e:
             print(f"SHAP calculation failed: {e}")
             # Fallback to random/heuristic if SHAP fails, to avoid breaking UI
-            feature_importance = [{"name": c, "value": 0.5} for c in X.columns[:5]]
+            feature_importance = [{"name": c, "value": 0.5} for c in feature_names[:5]]
 
         # 8. Construct Final Response
-        # Sort results by accuracy/score desc
-        results.sort(key=lambda x: x['accuracy'], reverse=True)
+        # Sort results by accuracy/score desc (raced: candidates fitted on the full data first)
+        results.sort(key=lambda x: (not x.get('eliminated', False), x['accuracy']), reverse=True)
 
-        return {
+        result = {
             "algorithms": results,
             "best_algorithm": best_algo_name if best_model else "None",
             "feature_importance": feature_importance,
@@ -161,5 +226,9 @@ class AutoMLRunner:
                 "Outlier removal might improve SVM/KNN performance."
             ],
             "selection_reason": f"The model '{best_algo_name if best_model else 'N/A'}' was selected because it achieved the highest validation score of {round(best_score*100, 2) if best_score <= 1.0 else round(best_score, 2)}%.",
-            "reason_parts": rec_result.get('reason_parts', [])
+            "reason_parts": rec_result.get('reason_parts', []),
+            "pipeline": self.pipeline.actions,
+            "racing": schedule
         }
+        report(stage="done")
+        return result
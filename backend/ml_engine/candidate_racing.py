@@ -0,0 +1,144 @@
+import os
+import math
+import time
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from ml_engine.parallel_trainer import train_candidates
+
+# 🏁 Training splits with at least this many rows are raced (successive halving) by default
+RACING_MIN_TRAIN_ROWS = int(os.getenv("RACING_MIN_TRAIN_ROWS", "200000"))
+
+# Rows of the first rung, on which every candidate is trained
+RACING_MIN_ROWS = int(os.getenv("RACING_MIN_ROWS", "10000"))
+
+# Each rung keeps the best 1/eta of the candidates and trains them on eta times more rows
+RACING_ETA = int(os.getenv("RACING_ETA", "3"))
+
+# Test rows the rungs are scored on (the winner's final score uses the whole test split)
+RACING_EVAL_ROWS = int(os.getenv("RACING_EVAL_ROWS", "50000"))
+
+
+def use_racing(n_train_rows: int, n_candidates: int) -> bool:
+    return n_candidates > 1 and n_train_rows >= RACING_MIN_TRAIN_ROWS
+
+
+def stratified_order(y, seed: int = 42, stratify: bool = True) -> np.ndarray:
+    """
+    A random row order whose every prefix is a stratified sample of `y` (each class
+    at its overall share, up to one row): rows are sorted by their rank within their
+    class, relative to the class size. Prefixes are nested, so each rung's sample
+    contains the previous one.
+    """
+    y = np.asarray(y)
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(y))
+    if not stratify:
+        return order
+    codes = pd.factorize(y[order])[0]
+    rank = pd.Series(codes).groupby(codes).cumcount().to_numpy()
+    share = (rank + rng.random(len(order))) / np.bincount(codes)[codes]
+    return order[np.argsort(share, kind="stable")]
+
+
+def _rows(data, index: np.ndarray):
+    if sparse.issparse(data):
+        return data[index]
+    return data.iloc[index] if isinstance(data, (pd.DataFrame, pd.Series)) else data[index]
+
+
+def _score(outcome, task_type: str) -> float:
+    if isinstance(outcome, Exception):
+        return -math.inf
+    metrics = outcome["metrics"]
+    return metrics.get("accuracy", 0) if task_type == "classification" else metrics.get("r2_score", 0)
+
+
+def race_candidates(algorithms: list, task_type: str, X_train, y_train, X_test, y_test,
+                    min_rows: int = None, eta: int = None, eval_rows: int = None,
+                    on_result=None, on_rung_result=None, poll=None) -> tuple[list, dict]:
+    """
+    Successive halving: every candidate is trained on a small stratified subsample,
+    the best 1/eta of them move on to a sample eta times larger, and so on until
+    one is left (or the next sample would be the whole split); the remaining
+    candidates are then trained on the full training split and scored on the full
+    test split. Rungs are scored on a stratified sample of `eval_rows` test rows, and
+    each rung trains its candidates side by side (train_candidates). The budget
+    (min_rows, eta, eval_rows) defaults to RACING_MIN_ROWS, RACING_ETA and RACING_EVAL_ROWS.
+    Returns one outcome per algorithm, as train_candidates, where an eliminated
+    candidate's outcome is its last rung's (flagged "eliminated", with
+    "trained_rows"), and the elimination schedule.
+    `on_result(index, outcome)` is called once per candidate, with its final outcome,
+    and `on_rung_result(index, rows, outcome)` as a candidate finishes each rung; `poll`
+    is passed on to every train_candidates call. An exception any of them raises
+    (e.g. a cancelled job) stops the race.
+    """
+    min_rows = max(1, RACING_MIN_ROWS if min_rows is None else min_rows)
+    eta = max(2, RACING_ETA if eta is None else eta)
+    classification = task_type == "classification"
+    n_train = X_train.shape[0]
+    train_order = stratified_order(y_train, stratify=classification)
+    eval_rows = max(1, RACING_EVAL_ROWS if eval_rows is None else eval_rows)
+    eval_index = np.sort(stratified_order(y_test, seed=43, stratify=classification)[:eval_rows])
+    X_eval, y_eval = _rows(X_test, eval_index), _rows(y_test, eval_index)
+
+    outcomes = [None] * len(algorithms)
+    alive = list(range(len(algorithms)))
+
+    # Per-candidate callbacks of train_candidates (`k` indexes the candidates still racing)
+    def rung_done(k, outcome):
+        if on_rung_result:
+            on_rung_result(alive[k], int(rows), outcome)
+
+    def final_done(k, outcome):
+        if not isinstance(outcome, Exception):
+            outcome = {**outcome, "trained_rows": int(n_train)}
+        outcomes[alive[k]] = outcome
+        if on_result:
+            on_result(alive[k], outcome)
+
+    rungs, rows = [], min_rows
+    while len(alive) > 1 and rows < n_train:
+        start = time.perf_counter()
+        sample = np.sort(train_order[:rows])
+        rung_outcomes = train_candidates([algorithms[i] for i in alive], task_type,
+                                         _rows(X_train, sample), _rows(y_train, sample), X_eval, y_eval,
+                                         on_result=rung_done, poll=poll)
+        scores = [_score(outcome, task_type) for outcome in rung_outcomes]
+        # Best first; ties keep the recommendation order. Failed candidates never move on.
+        ranked = sorted(range(len(alive)), key=lambda k: -scores[k])
+        promoted = [k for k in ranked[:max(1, math.ceil(len(alive) / eta))] if scores[k] > -math.inf]
+
+        rungs.append({
+            "rows": int(rows),
+            "candidates": [
+                {"name": algorithms[alive[k]], "score": None if scores[k] == -math.inf else scores[k],
+                 "promoted": k in promoted}
+                for k in ranked
+            ],
+            "time_s": round(time.perf_counter() - start, 4),
+        })
+        for k in ranked:
+            if k not in promoted:
+                outcome = rung_outcomes[k]
+                if not isinstance(outcome, Exception):
+                    outcome = {**outcome, "eliminated": True, "trained_rows": int(rows)}
+                outcomes[alive[k]] = outcome
+                if on_result:
+                    on_result(alive[k], outcome)
+        alive = [alive[k] for k in promoted]
+        rows *= eta
+
+    # The finalists (usually one) on the full data
+    if alive:
+        train_candidates([algorithms[i] for i in alive], task_type, X_train, y_train, X_test, y_test,
+                         on_result=final_done, poll=poll)
+
+    schedule = {
+        "eta": eta,
+        "train_rows": int(n_train),
+        "eval_rows": int(len(eval_index)),
+        "rungs": rungs,
+        "finalists": [algorithms[i] for i in alive],
+    }
+    return outcomes, schedule
@@ -0,0 +1,138 @@
+import os
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from logic.preprocessing.feature_transformer import factorize_labels
+
+ENCODING_STRATEGIES = ("ordinal", "target", "hashing")
+
+# 🔤 Feature columns with at most this many categories are ordinal (label) encoded
+ENCODING_ORDINAL_MAX_CARDINALITY = int(os.getenv("ENCODING_ORDINAL_MAX_CARDINALITY", "32"))
+
+# Width of the shared feature-hashing space (sparse columns) of high-cardinality columns
+ENCODING_HASH_FEATURES = int(os.getenv("ENCODING_HASH_FEATURES", "1024"))
+
+# Target encoding: pseudo-count of the prior (global target mean) in each category's mean
+ENCODING_TARGET_SMOOTHING = float(os.getenv("ENCODING_TARGET_SMOOTHING", "10"))
+
+# Folds of the out-of-fold target encoding of the training rows
+ENCODING_TARGET_FOLDS = int(os.getenv("ENCODING_TARGET_FOLDS", "5"))
+
+# Same rule as AutoMLRunner: a numeric target with fewer distinct values is a class label
+REGRESSION_MIN_UNIQUE = 20
+
+
+class CategoricalEncoder:
+    """
+    Categorical encodings over factorized columns: values are hashed into integer
+    codes once, and only the distinct values are turned into strings (never every row).
+    - ordinal: position in the sorted string labels, as LabelEncoder on astype(str)
+    - target: smoothed per-category target mean (binary or regression targets);
+      training rows are encoded out of fold
+    - hashing: "column=value" tokens hashed into a shared sparse space
+    `choose_strategy` picks one per column from its cardinality.
+    """
+
+    @staticmethod
+    def factorize(series: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Codes into the sorted, distinct string forms of the values: the classes and
+        codes of LabelEncoder().fit_transform(series.astype(str)). The same codes as
+        encode_data's label encoding (feature_transformer.factorize_labels).
+        """
+        return factorize_labels(series)
+
+    @staticmethod
+    def classes(series: pd.Series) -> list[str]:
+        return CategoricalEncoder.factorize(series)[1].tolist()
+
+    @staticmethod
+    def ordinal(series: pd.Series, classes: list) -> np.ndarray:
+        """Position of each value's string form in `classes`; unseen values get -1."""
+        codes, labels = CategoricalEncoder.factorize(series)
+        return pd.Index(classes).get_indexer(labels)[codes]
+
+    @staticmethod
+    def target_usable(y: pd.Series) -> bool:
+        """A mean target per category is meaningful for binary and regression targets only."""
+        n_unique = y.nunique()
+        return n_unique == 2 or (pd.api.types.is_numeric_dtype(y) and n_unique >= REGRESSION_MIN_UNIQUE)
+
+    @staticmethod
+    def choose_strategy(n_categories: int, target_usable: bool) -> str:
+        if n_categories <= ENCODING_ORDINAL_MAX_CARDINALITY:
+            return "ordinal"
+        return "target" if target_usable else "hashing"
+
+    @staticmethod
+    def _category_stats(codes: np.ndarray, y: np.ndarray, n_categories: int) -> tuple[np.ndarray, np.ndarray]:
+        return (np.bincount(codes, minlength=n_categories).astype(np.float64),
+                np.bincount(codes, weights=y, minlength=n_categories))
+
+    @staticmethod
+    def fit_target(series: pd.Series, y: np.ndarray, smoothing: float = None) -> dict:
+        """Smoothed target mean of each category, on all rows (what new rows are encoded with)."""
+        smoothing = ENCODING_TARGET_SMOOTHING if smoothing is None else smoothing
+        codes, labels = CategoricalEncoder.factorize(series)
+        y = np.asarray(y, dtype=np.float64)
+        prior = float(y.mean()) if len(y) else 0.0
+        counts, sums = CategoricalEncoder._category_stats(codes, y, len(labels))
+        return {
+            "labels": labels.tolist(),
+            "values": ((sums + smoothing * prior) / (counts + smoothing)).tolist(),
+            "prior": prior,
+        }
+
+    @staticmethod
+    def target(series: pd.Series, params: dict) -> np.ndarray:
+        """Encode with fitted target means; unseen categories get the prior."""
+        codes, labels = CategoricalEncoder.factorize(series)
+        positions = pd.Index(params["labels"]).get_indexer(labels)
+        lookup = np.append(np.asarray(params["values"], dtype=np.float64), params["prior"])
+        return lookup[positions][codes]  # (position -1: the appended prior)
+
+    @staticmethod
+    def target_out_of_fold(series: pd.Series, y: np.ndarray, smoothing: float = None,
+                           folds: int = None, seed: int = 42) -> np.ndarray:
+        """
+        Target encoding of the fitting rows themselves: each row gets the smoothed
+        means of the other folds, so its own target never leaks into its feature.
+        One bincount over (fold, category) pairs gives every fold's statistics.
+        """
+        smoothing = ENCODING_TARGET_SMOOTHING if smoothing is None else smoothing
+        folds = ENCODING_TARGET_FOLDS if folds is None else folds
+        codes, labels = CategoricalEncoder.factorize(series)
+        y = np.asarray(y, dtype=np.float64)
+        n, k = len(y), len(labels)
+        fold = np.random.default_rng(seed).permutation(n) % folds
+
+        counts, sums = CategoricalEncoder._category_stats(codes, y, k)
+        fold_counts, fold_sums = CategoricalEncoder._category_stats(fold * k + codes, y, folds * k)
+        fold_counts, fold_sums = fold_counts.reshape(folds, k), fold_sums.reshape(folds, k)
+        # Statistics without the row's own fold
+        rest_rows = n - np.bincount(fold, minlength=folds)
+        rest_prior = (y.sum() - np.bincount(fold, weights=y, minlength=folds)) / np.maximum(rest_rows, 1)
+        rest_counts = counts[codes] - fold_counts[fold, codes]
+        rest_sums = sums[codes] - fold_sums[fold, codes]
+        return (rest_sums + smoothing * rest_prior[fold]) / (rest_counts + smoothing)
+
+    @staticmethod
+    def hashed(df: pd.DataFrame, columns: list, n_features: int = None) -> sp.csr_matrix:
+        """
+        One sparse row per frame row, with a 1 in the bucket of each column's
+        "column=value" token (collisions add up). Buckets come from pandas' stable
+        hash of the distinct tokens only, so they are the same in every process.
+        """
+        n_features = ENCODING_HASH_FEATURES if n_features is None else n_features
+        n, k = len(df), len(columns)
+        indices = np.empty((n, k), dtype=np.int64)
+        for j, col in enumerate(columns):
+            codes, labels = CategoricalEncoder.factorize(df[col])
+            tokens = np.array([f"{col}={label}" for label in labels], dtype=object)
+            buckets = (pd.util.hash_array(tokens) % np.uint64(n_features)).astype(np.int64)
+            indices[:, j] = buckets[codes]
+        matrix = sp.csr_matrix(
+            (np.ones(n * k), indices.ravel(), np.arange(0, n * k + 1, k)), shape=(n, n_features)
+        )
+        matrix.sum_duplicates()
+        return matrix
@@ -0,0 +1,155 @@
+import os
+import math
+import numpy as np
+import pandas as pd
+from ml_engine.moment_kernel import column_moments, iter_blocks
+
+# Column pairs evaluated before switching from the exact to the sampled estimate
+# (the accuracy/time knob: cost grows linearly with it)
+CORRELATION_MAX_PAIRS = int(os.getenv("CORRELATION_MAX_PAIRS", "500000"))
+
+# Rows used for the estimate; 0 = all rows (exact for moderate widths)
+CORRELATION_MAX_ROWS = int(os.getenv("CORRELATION_MAX_ROWS", "0"))
+
+# Columns per randomly drawn group in the sampled estimate (one GEMM per group)
+SAMPLE_GROUP_COLUMNS = 512
+
+# Bytes of float32 data per row block handed to BLAS
+BLOCK_BYTES = 4 * 1024 * 1024
+
+
+class _GramAccumulator:
+    """
+    Running X^T X products for one set of standardized columns.
+    Without missing values only Z^T Z is needed; otherwise the pairwise-complete
+    counts and sums (as pandas' corr() uses) come from three more products with the mask.
+    """
+
+    def __init__(self, n_columns: int, pairwise: bool):
+        shape = (n_columns, n_columns)
+        self.pairwise = pairwise
+        self.zz = np.zeros(shape)
+        self.n = np.zeros(shape) if pairwise else None
+        self.zm = np.zeros(shape) if pairwise else None
+        self.z2m = np.zeros(shape) if pairwise else None
+        self.rows = 0
+
+    def update(self, z: np.ndarray, present: np.ndarray = None) -> None:
+        # float32 GEMMs on the block, float64 accumulation across blocks
+        self.zz += z.T @ z
+        self.rows += len(z)
+        if self.pairwise:
+            m = present.astype(np.float32)
+            self.n += m.T @ m
+            self.zm += z.T @ m
+            self.z2m += (z * z).T @ m
+
+    def correlation(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if not self.pairwise:
+                # Standardized with the column std, so Z^T Z / n is the correlation
+                diag = np.sqrt(np.diag(self.zz))
+                corr = self.zz / np.outer(diag, diag)
+            else:
+                n = self.n
+                sx, sy = self.zm, self.zm.T
+                cov = self.zz - sx * sy / n
+                var_x = self.z2m - sx * sx / n
+                var_y = self.z2m.T - sy * sy / n
+                corr = cov / np.sqrt(var_x * var_y)
+                corr[n < 2] = np.nan
+        return np.clip(corr, -1.0, 1.0)
+
+
+class CorrelationEngine:
+    @staticmethod
+    def choose_strategy(n_columns: int, max_pairs: int = CORRELATION_MAX_PAIRS) -> str:
+        """"exact" when every column pair fits in the budget (or in one sample group), else "sampled"."""
+        fits = n_columns * (n_columns - 1) // 2 <= max_pairs or n_columns <= SAMPLE_GROUP_COLUMNS
+        return "exact" if fits else "sampled"
+
+    @staticmethod
+    def is_exact(n_rows: int, n_columns: int, max_pairs: int = CORRELATION_MAX_PAIRS,
+                 max_rows: int = CORRELATION_MAX_ROWS) -> bool:
+        """Whether mean_abs_correlation will use every row and every column pair."""
+        rows_sampled = bool(max_rows) and n_rows > max_rows
+        return CorrelationEngine.choose_strategy(n_columns, max_pairs) == "exact" and not rows_sampled
+
+    @staticmethod
+    def mean_abs_correlation(numeric_df: pd.DataFrame, max_pairs: int = CORRELATION_MAX_PAIRS,
+                             max_rows: int = CORRELATION_MAX_ROWS, seed: int = 0) -> dict:
+        """
+        Mean absolute off-diagonal Pearson correlation (pairwise-complete, like pandas).
+        Pairs with an undefined correlation (constant or too sparse columns) are skipped.
+
+        - exact: every pair, from row-blocked float32 BLAS products of the standardized
+          columns; O(n*p^2) time but only O(p^2) memory and no Python loops.
+        - sampled: columns are shuffled into groups of SAMPLE_GROUP_COLUMNS and the exact
+          kernel runs within as many groups as `max_pairs` allows, giving an unbiased
+          estimate over uniformly random pairs at O(n * max_pairs) cost.
+        `max_rows` additionally bounds the rows used (uniform sample).
+
+        Returns {"value", "strategy", "exact", "pairs", "rows"}.
+        """
+        n_rows, n_columns = numeric_df.shape
+        rng = np.random.default_rng(seed)
+        if n_columns < 2 or n_rows == 0:
+            return {"value": 0.0, "strategy": "exact", "exact": True, "pairs": 0, "rows": n_rows}
+
+        rows_sampled = bool(max_rows) and n_rows > max_rows
+        if rows_sampled:
+            numeric_df = numeric_df.iloc[np.sort(rng.choice(n_rows, max_rows, replace=False))]
+
+        strategy = CorrelationEngine.choose_strategy(n_columns, max_pairs)
+        if strategy == "exact":
+            groups = [np.arange(n_columns)]
+        else:
+            group_size = min(SAMPLE_GROUP_COLUMNS, n_columns)
+            pairs_per_group = group_size * (group_size - 1) // 2
+            order = rng.permutation(n_columns)
+            n_groups = max(1, min(n_columns // group_size, math.ceil(max_pairs / pairs_per_group)))
+            groups = [np.sort(order[i * group_size:(i + 1) * group_size]) for i in range(n_groups)]
+
+        values = CorrelationEngine._group_abs_correlations(numeric_df, groups)
+        values = values[~np.isnan(values)]
+        return {
+            "value": float(values.mean()) if len(values) else 0.0,
+            "strategy": strategy,
+            "exact": CorrelationEngine.is_exact(n_rows, n_columns, max_pairs, max_rows),
+            "pairs": int(len(values)),
+            "rows": int(len(numeric_df)),
+        }
+
+    @staticmethod
+    def _group_abs_correlations(numeric_df: pd.DataFrame, groups: list) -> np.ndarray:
+        """|corr| of every pair inside each column group, in one pass over the rows."""
+        moments = column_moments(numeric_df)
+        mean = moments.means()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = np.sqrt(moments.m2 / moments.count)
+            # Constant (or empty) columns have no defined correlation
+            undefined = ~(std > 0)
+            scale = np.where(undefined, 1.0, 1.0 / std).astype(np.float32)
+        shift = np.where(np.isnan(mean), 0.0, mean)
+        pairwise = bool(moments.nan_count.any())
+
+        accumulators = [_GramAccumulator(len(cols), pairwise) for cols in groups]
+        block_bytes = BLOCK_BYTES * 2  # float64 source blocks shrink to float32 on standardization
+        for block in iter_blocks(numeric_df, block_bytes):
+            for cols, acc in zip(groups, accumulators):
+                sub = block[:, cols]
+                z = ((sub - shift[cols]) * scale[cols]).astype(np.float32)
+                if pairwise:
+                    present = ~np.isnan(z)
+                    z[~present] = 0.0
+                    acc.update(z, present)
+                else:
+                    acc.update(z)
+
+        parts = []
+        for cols, acc in zip(groups, accumulators):
+            corr = acc.correlation()
+            corr[undefined[cols], :] = np.nan
+            corr[:, undefined[cols]] = np.nan
+            parts.append(np.abs(corr[np.triu_indices(len(cols), k=1)]))
+        return np.concatenate(parts) if parts else np.empty(0)
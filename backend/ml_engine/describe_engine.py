@@ -0,0 +1,151 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Numeric columns with more non-null values than this get sampled quartiles
+DESCRIBE_APPROX_MIN_ROWS = int(os.getenv("DESCRIBE_APPROX_MIN_ROWS", "10000000"))
+
+# Values drawn (uniformly, with replacement) for sampled quartiles
+DESCRIBE_SAMPLE_ROWS = int(os.getenv("DESCRIBE_SAMPLE_ROWS", "1000000"))
+
+QUANTILES = (0.25, 0.5, 0.75)
+QUANTILE_LABELS = ("25%", "50%", "75%")
+
+
+def _python(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class DescribeEngine:
+    """
+    Per-column replacement for describe(include="all"): same statistics, rows and
+    missing-value conventions, emitted directly as plain Python values.
+    - numeric: min, quartiles and max from order-statistic selection (partitioning)
+      instead of full sorts; quartiles use the same linear interpolation as pandas.
+    - categorical (object, category, bool, string): counts from hashing (factorize,
+      or the category codes) with a single bincount; no sorted value_counts.
+    Other dtypes (datetimes, timedeltas) fall back to pandas.
+    """
+
+    @staticmethod
+    def describe_column(series: pd.Series, approx_min_rows: int = DESCRIBE_APPROX_MIN_ROWS,
+                        sample_rows: int = DESCRIBE_SAMPLE_ROWS, seed: int = 0) -> tuple[dict, list]:
+        """Returns ({stat: value}, [stats that were estimated rather than computed exactly])."""
+        dtype = series.dtype
+        if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(dtype) \
+                or pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+            return DescribeEngine._categorical(series), []
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_complex_dtype(dtype):
+            return DescribeEngine._numeric(series, approx_min_rows, sample_rows, seed)
+        return {stat: _python(value) for stat, value in series.describe().items()}, []
+
+    @staticmethod
+    def _numeric(series: pd.Series, approx_min_rows: int, sample_rows: int, seed: int) -> tuple[dict, list]:
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        values = values[~np.isnan(values)]
+        n = len(values)
+        stats = dict.fromkeys(("count", "mean", "std", "min", *QUANTILE_LABELS, "max"), np.nan)
+        stats["count"] = float(n)
+        if n == 0:
+            return stats, []
+
+        mean = values.sum() / n
+        stats["mean"] = float(mean)
+        if n > 1:
+            dev = values - mean
+            stats["std"] = float(np.sqrt(np.dot(dev, dev) / (n - 1)))
+
+        approximate = []
+        if n > approx_min_rows:
+            sample = values[np.random.default_rng(seed).integers(0, n, sample_rows)]
+            quartiles = DescribeEngine.quantiles(sample, QUANTILES)
+            stats["min"], stats["max"] = float(values.min()), float(values.max())
+            approximate = list(QUANTILE_LABELS)
+        else:
+            stats["min"], *quartiles, stats["max"] = DescribeEngine.quantiles(values, QUANTILES, with_extremes=True)
+        stats.update(zip(QUANTILE_LABELS, quartiles))
+        return stats, approximate
+
+    @staticmethod
+    def quantiles(values: np.ndarray, qs, with_extremes: bool = False) -> list[float]:
+        """
+        Linearly interpolated quantiles of a NaN-free array (numpy's/pandas' default
+        method) from the few order statistics they need, found by selection rather than
+        a sort. `with_extremes` prepends the min and appends the max.
+        """
+        n = len(values)
+        positions = np.asarray(qs, dtype=np.float64) * (n - 1)
+        lo = np.floor(positions).astype(np.intp)
+        hi = np.minimum(lo + 1, n - 1)
+        ranks = sorted(set(lo.tolist()) | set(hi.tolist()) | ({0, n - 1} if with_extremes else set()))
+        stat = DescribeEngine._order_statistics(values, ranks)
+        a = np.array([stat[k] for k in lo.tolist()])
+        b = np.array([stat[k] for k in hi.tolist()])
+        t = positions - lo
+        diff = b - a
+        # numpy's lerp: interpolate from whichever end is closer
+        result = [float(v) for v in np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)]
+        return [float(stat[0])] + result + [float(stat[n - 1])] if with_extremes else result
+
+    @staticmethod
+    def _order_statistics(values: np.ndarray, ranks: list) -> dict:
+        """
+        Values of the given ranks (sorted ascending). One single-pivot in-place partition
+        per segment, recursing into the halves: a single kth takes numpy's fast selection
+        path, which a multi-kth np.partition call does not. Ranks at a segment's edge are
+        its min or max.
+        """
+        work = values.copy()
+        found = {}
+        segments = [(0, len(work), ranks)]
+        while segments:
+            start, stop, wanted = segments.pop()
+            segment = work[start:stop]
+            if wanted[0] == start:
+                found[start] = segment.min()
+                wanted = wanted[1:]
+            if wanted and wanted[-1] == stop - 1:
+                found[stop - 1] = segment.max()
+                wanted = wanted[:-1]
+            if not wanted:
+                continue
+            pivot = wanted[len(wanted) // 2]
+            segment.partition(pivot - start)
+            found[pivot] = segment[pivot - start]
+            left = [k for k in wanted if k < pivot]
+            right = [k for k in wanted if k > pivot]
+            if left:
+                segments.append((start, pivot, left))
+            if right:
+                segments.append((pivot + 1, stop, right))
+        return found
+
+    @staticmethod
+    def _categorical(series: pd.Series) -> dict:
+        counts, labels = DescribeEngine._value_counts(series)
+        count = int(counts.sum())
+        if count == 0:
+            return {"count": 0, "unique": 0, "top": np.nan, "freq": np.nan}
+        top = int(counts.argmax())  # first value among equal counts
+        return {
+            "count": count,
+            "unique": int(np.count_nonzero(counts)),
+            "top": _python(labels[top]),
+            "freq": int(counts[top]),
+        }
+
+    @staticmethod
+    def _value_counts(series: pd.Series) -> tuple[np.ndarray, list]:
+        """Counts of the non-null values, in order of first appearance (categories: category order)."""
+        if series.dtype == np.bool_:
+            # No hashing needed: count the True values
+            values = series.to_numpy()
+            n_true = int(np.count_nonzero(values))
+            counts = {True: n_true, False: len(values) - n_true}
+            labels = [bool(values[0]), not values[0]] if len(values) else []
+            return np.array([counts[label] for label in labels], dtype=np.int64), labels
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, labels = series.cat.codes.to_numpy(), series.cat.categories
+        else:
+            codes, labels = pd.factorize(series)
+        return np.bincount(codes[codes >= 0], minlength=len(labels)), labels
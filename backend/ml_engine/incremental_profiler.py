@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+# /preprocess/ actions that map every column through an affine function (StandardScaler),
+# which leaves every pairwise correlation, and so avg_feature_correlation, unchanged
+CORRELATION_PRESERVING_ACTIONS = {"scaling"}
+
+
+def touched_columns(action: str, df: pd.DataFrame, target_column: str = None,
+                    categorical_columns: list = None) -> list | None:
+    """
+    Columns a /preprocess/ action may rewrite, judged from the frame *before* the
+    action runs (routes/preprocess.py). The sets are deliberately generous (ID
+    columns the transforms skip are included); anything listed is just recomputed.
+    None means the action changes row membership instead of column values.
+    """
+    if action == "scaling":
+        # scale_data: numeric features except the target
+        return [col for col in df.select_dtypes(include=[np.number]).columns if col != target_column]
+    if action == "encoding":
+        # encode_data: the requested categoricals, plus the target when it is categorical
+        columns = [col for col in (categorical_columns or []) if col in df.columns]
+        return columns + [target_column] if target_column in df.columns else columns
+    if action == "missing":
+        # handle_missing only fills columns that have gaps
+        return list(df.columns[df.isna().any().to_numpy()])
+    if action == "outliers":
+        # remove_outliers_iqr drops rows; values of the kept rows are untouched
+        return None
+    return list(df.columns)
+
+
+def carry_forward(stats: dict | None, touched: list | None, n_rows: int, dtypes: dict,
+                  preserves_correlation: bool = False) -> dict | None:
+    """
+    Column statistics (see routes/profiling.py) that remain valid after a preprocess
+    action: entries of untouched columns whose stored dtype is unchanged, the class
+    counts of untouched targets and, when none of its inputs changed (or the action
+    preserves correlations), the average correlation. Missing entries are recomputed
+    on the next profile. A change in row count invalidates everything.
+    """
+    if stats is None or n_rows != stats["rows"]:
+        return None
+    touched = set(touched or [])
+    columns = {
+        col: entry for col, entry in stats["columns"].items()
+        if col not in touched and dtypes.get(col) == entry["dtype"]
+    }
+    class_counts = {target: counts for target, counts in stats["class_counts"].items() if target in columns}
+
+    correlation = stats.get("correlation")
+    if correlation is not None and not preserves_correlation:
+        if any(col not in columns for col in correlation["numeric_columns"]):
+            correlation = None
+    return {"rows": n_rows, "columns": columns, "class_counts": class_counts, "correlation": correlation}
@@ -0,0 +1,139 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import KFold, StratifiedKFold, train_test_split
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+from sklearn.naive_bayes import GaussianNB
+from sklearn.neighbors import KNeighborsClassifier, KNeighborsRegressor
+from sklearn.linear_model import LogisticRegression, Ridge
+from ml_engine.meta_feature_extractor import MetaFeatureExtractor
+
+# ⏱️ Wall-clock budget for the whole landmarking stage, in seconds
+LANDMARK_BUDGET_S = float(os.getenv("LANDMARK_BUDGET_S", "2.0"))
+
+# Rows in the (stratified) subsample the landmarkers are fitted on
+LANDMARK_SAMPLE_ROWS = int(os.getenv("LANDMARK_SAMPLE_ROWS", "2000"))
+
+# Landmarkers fitted concurrently (sklearn releases the GIL in its numeric kernels)
+LANDMARK_WORKERS = int(os.getenv("LANDMARK_WORKERS", "4"))
+
+LANDMARK_FOLDS = 3
+
+# Cheap proxy models: name -> (classifier, regressor); None = not applicable to the task
+LANDMARKERS = {
+    "stump": (lambda: DecisionTreeClassifier(max_depth=1), lambda: DecisionTreeRegressor(max_depth=1)),
+    "naive_bayes": (lambda: GaussianNB(), None),
+    "1nn": (lambda: KNeighborsClassifier(n_neighbors=1), lambda: KNeighborsRegressor(n_neighbors=1)),
+    "linear": (lambda: LogisticRegression(max_iter=200), lambda: Ridge(alpha=1.0)),
+}
+
+
+class Landmarker:
+    @staticmethod
+    def extract(df: pd.DataFrame, target_column: str, budget_s: float = LANDMARK_BUDGET_S,
+                sample_rows: int = LANDMARK_SAMPLE_ROWS, seed: int = 0) -> dict:
+        """
+        Landmarking meta-features: cross-validated scores (accuracy for classification,
+        R² for regression) of cheap proxy models fitted on a subsample, as
+        "landmark_<name>". The landmarkers run in parallel and the stage stops when
+        `budget_s` runs out; a landmarker that finished no fold in time is reported
+        as None. "landmark_time_s" is the time the stage took.
+        """
+        start = time.perf_counter()
+        deadline = start + budget_s
+        scores = {f"landmark_{name}": None for name in LANDMARKERS}
+
+        data = Landmarker._prepare(df, target_column, sample_rows, seed)
+        if data is not None:
+            X, y, task_type, folds = data
+            column = 0 if task_type == "classification" else 1
+            jobs = {name: models[column] for name, models in LANDMARKERS.items() if models[column] is not None}
+
+            executor = ThreadPoolExecutor(max_workers=max(1, LANDMARK_WORKERS))
+            futures = {
+                executor.submit(Landmarker._score, make_model, X, y, folds, deadline): name
+                for name, make_model in jobs.items()
+            }
+            done, _ = wait(futures, timeout=max(0.0, deadline - time.perf_counter()))
+            # Whatever is still queued is dropped; a fit already running finishes in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+            for future in done:
+                if future.exception() is None and future.result() is not None:
+                    scores[f"landmark_{futures[future]}"] = round(future.result(), 4)
+
+        scores["landmark_time_s"] = round(time.perf_counter() - start, 3)
+        return scores
+
+    @staticmethod
+    def _prepare(df: pd.DataFrame, target_column: str, sample_rows: int, seed: int):
+        """Subsampled, numerically encoded, standardized X; encoded y; task type; CV folds."""
+        if target_column not in df.columns:
+            return None
+        target = df[target_column]
+        rows = np.flatnonzero(target.notna().to_numpy())
+        if len(rows) < 2 * LANDMARK_FOLDS or df.shape[1] < 2:
+            return None
+
+        class_counts = MetaFeatureExtractor.target_class_counts(target)
+        task_type = "regression" if class_counts is None else "classification"
+        if class_counts is not None:
+            class_counts = class_counts[class_counts > 0]
+            if len(class_counts) < 2:
+                return None
+
+        # Stratified subsample of row positions (so rare classes keep their share);
+        # only the sampled rows are ever copied out of the frame
+        if len(rows) > sample_rows:
+            stratify = target.to_numpy()[rows] if class_counts is not None and class_counts.min() >= 2 else None
+            try:
+                rows, _ = train_test_split(rows, train_size=sample_rows, stratify=stratify, random_state=seed)
+            except ValueError:
+                rows, _ = train_test_split(rows, train_size=sample_rows, random_state=seed)
+        df = df.iloc[np.sort(rows)]
+
+        features = df.drop(columns=[target_column])
+        columns = []
+        for col in features.columns:
+            values = features[col]
+            if pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype):
+                columns.append(values.to_numpy(dtype=np.float64, na_value=np.nan))
+            else:
+                codes = pd.factorize(values)[0].astype(np.float64)
+                codes[codes < 0] = np.nan
+                columns.append(codes)
+        X = np.column_stack(columns)
+
+        # Mean imputation and standardization (1-NN and the linear model are scale sensitive)
+        present = ~np.isnan(X)
+        n_present = present.sum(axis=0)
+        mean = np.where(n_present > 0, np.where(present, X, 0.0).sum(axis=0) / np.maximum(n_present, 1), 0.0)
+        X = np.where(present, X, mean)
+        std = X.std(axis=0)
+        X = (X - mean) / np.where(std > 0, std, 1.0)
+
+        if task_type == "classification":
+            y = pd.factorize(df[target_column])[0]
+            min_class = np.bincount(y).min()
+            if min_class >= LANDMARK_FOLDS:
+                splitter = StratifiedKFold(LANDMARK_FOLDS, shuffle=True, random_state=seed)
+            else:
+                splitter = KFold(LANDMARK_FOLDS, shuffle=True, random_state=seed)
+        else:
+            y = df[target_column].to_numpy(dtype=np.float64)
+            splitter = KFold(LANDMARK_FOLDS, shuffle=True, random_state=seed)
+        return X, y, task_type, list(splitter.split(X, y))
+
+    @staticmethod
+    def _score(make_model, X: np.ndarray, y: np.ndarray, folds: list, deadline: float):
+        """Mean held-out score over the folds completed before the deadline (None if none were)."""
+        scores = []
+        for train, test in folds:
+            if time.perf_counter() >= deadline:
+                break
+            if len(np.unique(y[train])) < 2:
+                continue
+            model = make_model().fit(X[train], y[train])
+            scores.append(model.score(X[test], y[test]))
+        return float(np.mean(scores)) if scores else None
@@ -1,7 +1,8 @@
-
 import pandas as pd
 import numpy as np
-from scipy.stats import skew, kurtosis, entropy
+from scipy.stats import entropy
+from ml_engine.moment_kernel import column_moments
+from ml_engine.correlation_engine import CorrelationEngine
 
 class MetaFeatureExtractor:
     @staticmethod
@@ -9,64 +10,86 @@ class MetaFeatureExtractor:
         """
         Extracts meta-features from the dataframe.
         """
-        n_instances = df.shape[0]
-        n_features = df.shape[1]
-        
         # Feature types
         numeric_df = df.select_dtypes(include=[np.number])
         categorical_df = df.select_dtypes(exclude=[np.number])
-        
-        n_continuous = numeric_df.shape[1]
-        n_categorical = categorical_df.shape[1]
-        
+
+        # Statistical Properties (Numeric)
+        # One blocked pass gives count/NaNs/mean/M2/M3/M4 for every numeric column
+        moments = column_moments(numeric_df)
+        n_missing_values = int(moments.nan_count.sum()) + int(categorical_df.isna().sum().sum())
+        avg_corr = MetaFeatureExtractor.average_correlation(numeric_df) if not numeric_df.empty else 0
+
+        # Target Analysis
+        class_counts = None
+        if target_column and target_column in df.columns:
+            class_counts = MetaFeatureExtractor.target_class_counts(df[target_column])
+
+        return MetaFeatureExtractor.from_summaries(
+            n_instances=df.shape[0],
+            n_features=df.shape[1],
+            n_categorical=categorical_df.shape[1],
+            n_missing_values=n_missing_values,
+            moments=moments,
+            avg_corr=avg_corr,
+            class_counts=class_counts,
+        )
+
+    @staticmethod
+    def target_class_counts(target_series: pd.Series) -> pd.Series | None:
+        """Class counts of a classification target, None for a regression target."""
+        # Check if classification (categorical or low unique count logic as before)
+        is_classification = (
+            target_series.dtype == 'object'
+            or isinstance(target_series.dtype, pd.CategoricalDtype)
+            or target_series.nunique() < 20
+        )
+        return target_series.value_counts() if is_classification else None
+
+    @staticmethod
+    def average_correlation(numeric_df: pd.DataFrame) -> float:
+        """Mean absolute off-diagonal Pearson correlation of the numeric columns."""
+        try:
+            # Exact blocked BLAS for moderate widths, sampled column pairs for very wide tables
+            avg_corr = CorrelationEngine.mean_abs_correlation(numeric_df)["value"]
+            return round(float(avg_corr), 4)
+        except Exception as e:
+            print(f"Correlation calculation failed: {e}")
+            return 0
+
+    @staticmethod
+    def from_summaries(n_instances: int, n_features: int, n_categorical: int, n_missing_values: int,
+                       moments, avg_corr: float, class_counts: pd.Series = None) -> dict:
+        """
+        Builds the meta-feature dict from pre-computed summaries: the numeric column
+        moments (BlockMoments), the average correlation and, for classification
+        targets, the class counts. Shared by `extract` and the streaming profiler.
+        """
+        n_continuous = len(moments.count)
+
         # Dimensionality
         dimensionality_ratio = round(n_features / n_instances, 4) if n_instances > 0 else 0
-        
-        # Statistical Properties (Numeric)
-        if not numeric_df.empty:
-            mean_features = round(numeric_df.mean().mean(), 4)
-            std_features = round(numeric_df.std().mean(), 4)
-            skewness = round(numeric_df.apply(lambda x: skew(x, nan_policy='omit')).mean(), 4)
-            kurt = round(numeric_df.apply(lambda x: kurtosis(x, nan_policy='omit')).mean(), 4)
-            
-            # Correlation
-            try:
-                corr_matrix = numeric_df.corr().abs()
-                # Exclude diagonal
-                mask = np.ones(corr_matrix.shape, dtype=bool)
-                np.fill_diagonal(mask, 0)
-                # Calculate mean of off-diagonal elements (scalar)
-                avg_corr = corr_matrix.values[mask].mean()
-                
-                # Handle NaN (e.g., if matrix is empty or all NaN)
-                if pd.isna(avg_corr):
-                    avg_corr = 0
-                else:
-                    avg_corr = round(float(avg_corr), 4)
-            except Exception as e:
-                print(f"Correlation calculation failed: {e}")
-                avg_corr = 0
+
+        if n_continuous > 0 and n_instances > 0:
+            mean_features = round(pd.Series(moments.means()).mean(), 4)
+            std_features = round(pd.Series(moments.stds()).mean(), 4)
+            skewness = round(pd.Series(moments.skewness()).mean(), 4)
+            kurt = round(pd.Series(moments.kurtosis()).mean(), 4)
         else:
             mean_features, std_features, skewness, kurt, avg_corr = 0, 0, 0, 0, 0
 
-        # Target Analysis
         n_classes = 0
         imbalance_ratio = 0
         target_entropy = 0
-        
-        if target_column and target_column in df.columns:
-            target_series = df[target_column]
-            # Check if classification (categorical or low unique count logic as before)
-            is_classification = target_series.dtype == 'object' or target_series.nunique() < 20
-            
-            if is_classification:
-                class_counts = target_series.value_counts()
-                n_classes = len(class_counts)
-                if n_classes > 1:
-                    imbalance_ratio = round(class_counts.max() / class_counts.min(), 2)
-                    # Entropy
-                    probs = class_counts / n_instances
-                    target_entropy = round(entropy(probs), 4)
+
+        if class_counts is not None:
+            class_counts = class_counts[class_counts > 0] # drop unused categories
+            n_classes = len(class_counts)
+            if n_classes > 1:
+                imbalance_ratio = round(class_counts.max() / class_counts.min(), 2)
+                # Entropy
+                probs = class_counts / n_instances
+                target_entropy = round(entropy(probs), 4)
 
         # Approximate Signal-to-Noise Ratio (Mean / Std)
         snr = round(mean_features / std_features, 4) if std_features != 0 else 0
@@ -76,6 +99,7 @@ class MetaFeatureExtractor:
             "n_features": int(n_features),
             "n_continuous": int(n_continuous),
             "n_categorical": int(n_categorical),
+            "n_missing_values": int(n_missing_values),
             "dimensionality_ratio": float(dimensionality_ratio) if not pd.isna(dimensionality_ratio) else 0.0,
             "mean_features": float(mean_features) if not pd.isna(mean_features) else 0.0,
             "std_features": float(std_features) if not pd.isna(std_features) else 0.0,
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+# Each block handed to NumPy is at most this many bytes (float64), so the
+# repeated reductions over it run on data that is still in cache
+BLOCK_BYTES = 4 * 1024 * 1024
+
+
+class BlockMoments:
+    """
+    Per-column count, NaN count, sum and central moments (M2, M3, M4) of a numeric block.
+    Moments are kept central rather than as raw power sums so skewness/kurtosis stay
+    accurate for large-valued columns. Two results merge exactly (Chan / Pébay update
+    formulas), so row blocks, upload chunks or per-worker partials combine into the
+    moments of the whole column.
+    """
+
+    def __init__(self, count, nan_count, mean, m2, m3, m4):
+        self.count = count
+        self.nan_count = nan_count
+        self.mean = mean
+        self.m2 = m2
+        self.m3 = m3
+        self.m4 = m4
+
+    @classmethod
+    def empty(cls, n_columns: int) -> "BlockMoments":
+        zeros = lambda: np.zeros(n_columns, dtype=np.float64)
+        return cls(zeros(), zeros(), zeros(), zeros(), zeros(), zeros())
+
+    @classmethod
+    def from_block(cls, block: np.ndarray) -> "BlockMoments":
+        """Moments of a 2-D float block (rows x columns) in one sweep per power."""
+        nan_mask = np.isnan(block)
+        has_nan = nan_mask.any()
+        if has_nan:
+            block = np.where(nan_mask, 0.0, block)
+            nan_count = nan_mask.sum(axis=0, dtype=np.float64)
+        else:
+            nan_count = np.zeros(block.shape[1], dtype=np.float64)
+        count = block.shape[0] - nan_count
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, block.sum(axis=0) / count, 0.0)
+        dev = block - mean
+        if has_nan:
+            dev[nan_mask] = 0.0
+        dev2 = dev * dev
+        return cls(
+            count, nan_count, mean,
+            dev2.sum(axis=0),
+            np.einsum("ij,ij->j", dev2, dev),
+            np.einsum("ij,ij->j", dev2, dev2),
+        )
+
+    def merge(self, other: "BlockMoments") -> "BlockMoments":
+        na, nb = self.count, other.count
+        n = na + nb
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = other.mean - self.mean
+            # Weights are 0 where a side is empty, which leaves the other side unchanged
+            wa = np.where(n > 0, na / n, 0.0)
+            wb = np.where(n > 0, nb / n, 0.0)
+            mean = self.mean + delta * wb
+            m2 = self.m2 + other.m2 + delta ** 2 * na * wb
+            m3 = (self.m3 + other.m3
+                  + delta ** 3 * na * wb * (wa - wb)
+                  + 3 * delta * (wa * other.m2 - wb * self.m2))
+            m4 = (self.m4 + other.m4
+                  + delta ** 4 * na * wb * (wa * wa - wa * wb + wb * wb)
+                  + 6 * delta ** 2 * (wa * wa * other.m2 + wb * wb * self.m2)
+                  + 4 * delta * (wa * other.m3 - wb * self.m3))
+        return BlockMoments(n, self.nan_count + other.nan_count, mean, m2, m3, m4)
+
+    @property
+    def sum(self) -> np.ndarray:
+        return self.mean * self.count
+
+    @property
+    def sum_of_squares(self) -> np.ndarray:
+        return self.m2 + self.count * self.mean ** 2
+
+    def means(self) -> np.ndarray:
+        return np.where(self.count > 0, self.mean, np.nan)
+
+    def stds(self, ddof: int = 1) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > ddof, np.sqrt(self.m2 / (self.count - ddof)), np.nan)
+
+    def _zero_variance(self) -> np.ndarray:
+        # Same "numerically constant" test scipy.stats uses before dividing by m2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            m2 = self.m2 / self.count
+            return (self.count == 0) | (m2 <= (np.finfo(np.float64).eps * self.mean) ** 2)
+
+    def skewness(self) -> np.ndarray:
+        """Biased sample skewness (scipy.stats.skew defaults, NaNs omitted)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            m2, m3 = self.m2 / self.count, self.m3 / self.count
+            return np.where(self._zero_variance(), np.nan, m3 / m2 ** 1.5)
+
+    def kurtosis(self) -> np.ndarray:
+        """Biased Fisher kurtosis (scipy.stats.kurtosis defaults, NaNs omitted)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            m2, m4 = self.m2 / self.count, self.m4 / self.count
+            return np.where(self._zero_variance(), np.nan, m4 / m2 ** 2 - 3.0)
+
+
+def iter_blocks(df: pd.DataFrame, block_bytes: int = BLOCK_BYTES):
+    """Yield float64 row blocks of a numeric frame (views when the frame is already float64)."""
+    n_rows, n_cols = df.shape
+    block_rows = max(1, block_bytes // (8 * max(n_cols, 1)))
+    for start in range(0, n_rows, block_rows):
+        yield df.iloc[start:start + block_rows].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def column_moments(df: pd.DataFrame, block_bytes: int = BLOCK_BYTES) -> BlockMoments:
+    """Moments of every column of a numeric frame, computed block by block."""
+    moments = BlockMoments.empty(df.shape[1])
+    for block in iter_blocks(df, block_bytes):
+        moments = moments.merge(BlockMoments.from_block(block))
+    return moments
@@ -1,16 +1,15 @@
-
 import pandas as pd
 import numpy as np
+from ml_engine.outlier_engine import OutlierEngine
 
 def remove_outliers_iqr(df: pd.DataFrame, target_column: str = None) -> pd.DataFrame:
     """
     Removes outliers from numerical columns using the IQR method.
     Ignores the target column to preserve labels.
+    Bounds of every column come from the full data; one mask filters the rows once.
     """
-    df_clean = df.copy()
-    
     # Select numerical columns
-    numeric_cols = df_clean.select_dtypes(include=[np.number]).columns.tolist()
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
     
     # Exclude target column if present
     if target_column and target_column in numeric_cols:
@@ -22,16 +21,8 @@ def remove_outliers_iqr(df: pd.DataFrame, target_column: str = None) -> pd.DataF
         if not c.lower().endswith("id") 
         and c.lower() not in ["id", "index", "row_id", "observation_id"]
     ]
-        
-    for col in numeric_cols:
-        Q1 = df_clean[col].quantile(0.25)
-        Q3 = df_clean[col].quantile(0.75)
-        IQR = Q3 - Q1
-        
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
-        
-        # Filter outliers
-        df_clean = df_clean[(df_clean[col] >= lower_bound) & (df_clean[col] <= upper_bound)]
-        
-    return df_clean
+
+    params = OutlierEngine.fit(df, numeric_cols, "iqr")
+    if params is None:
+        return df.copy()
+    return df[OutlierEngine.inlier_mask(df, params)]
@@ -0,0 +1,193 @@
+import os
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+from ml_engine.describe_engine import DescribeEngine
+from ml_engine.moment_kernel import BlockMoments, column_moments, iter_blocks
+
+OUTLIER_METHODS = ("iqr", "zscore", "mad", "isolation_forest")
+
+# 🌲 Rows (sampled uniformly) the isolation forest is fitted on; scoring covers every row
+OUTLIER_FOREST_SAMPLE_ROWS = int(os.getenv("OUTLIER_FOREST_SAMPLE_ROWS", "10000"))
+
+# Trees in the isolation forest (each is stored with the dataset's pipeline)
+OUTLIER_FOREST_TREES = int(os.getenv("OUTLIER_FOREST_TREES", "100"))
+
+IQR_MULTIPLIER = 1.5
+ZSCORE_THRESHOLD = 3.0
+MAD_THRESHOLD = 3.5  # on the modified z-score 0.6745 * (x - median) / MAD
+FOREST_THRESHOLD = 0.5  # anomaly score above which a row is an outlier (IsolationForest's "auto")
+
+
+def _values(df: pd.DataFrame, col) -> np.ndarray:
+    values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+    return values[~np.isnan(values)]
+
+
+def _average_path_length(n_samples: np.ndarray) -> np.ndarray:
+    # Expected path length of an unsuccessful BST search among n points (Liu et al.)
+    n = np.asarray(n_samples, dtype=np.float64)
+    result = np.zeros_like(n)
+    result[n == 2] = 1.0
+    large = n > 2
+    result[large] = 2.0 * (np.log(n[large] - 1.0) + np.euler_gamma) - 2.0 * (n[large] - 1.0) / n[large]
+    return result
+
+
+class OutlierEngine:
+    """
+    Outlier detection as fitted, row-local parameters, so the same fit filters the
+    whole frame, a column subset or a record batch (see preprocessing_pipeline).
+    - iqr / zscore / mad: per-column bounds, every one from the full, unfiltered
+      column (quantiles by selection, moments in row blocks); a row is kept when all
+      its values are within bounds (NaN is never within bounds).
+    - isolation_forest: a forest fitted on a row sample, exported as plain arrays
+      and evaluated in row blocks.
+    The inlier mask is built block by block: no filtered intermediate frames.
+    """
+
+    @staticmethod
+    def fit(df: pd.DataFrame, columns: list, method: str = "iqr", seed: int = 0) -> dict | None:
+        """
+        JSON-ready parameters of `method` over the numeric `columns` (None when there is
+        nothing to bound). Bounds come with the per-column outlier counts they give on `df`.
+        """
+        if method not in OUTLIER_METHODS:
+            raise ValueError(f"Unknown outlier method '{method}'. Use one of: {', '.join(OUTLIER_METHODS)}.")
+        if not columns:
+            return None
+        if method == "isolation_forest":
+            # (no counts: scoring every row is the costly part, left to the one filtering pass)
+            return OutlierEngine._fit_forest(df, columns, seed)
+        params = {"method": method, "bounds": OutlierEngine._fit_bounds(df, columns, method)}
+        if not params["bounds"]:
+            return None
+        _, params["counts"] = OutlierEngine.inlier_mask(df, params, with_counts=True)
+        return params
+
+    @staticmethod
+    def _fit_bounds(df: pd.DataFrame, columns: list, method: str) -> dict:
+        if method == "zscore":
+            return OutlierEngine.zscore_bounds(columns, column_moments(df[columns]))
+
+        bounds = {}
+        for col in columns:
+            values = _values(df, col)
+            if len(values) == 0:
+                bounds[col] = [None, None]  # nothing is within the bounds of an empty column
+            elif method == "iqr":
+                q1, q3 = DescribeEngine.quantiles(values, (0.25, 0.75))
+                iqr = q3 - q1
+                bounds[col] = [q1 - IQR_MULTIPLIER * iqr, q3 + IQR_MULTIPLIER * iqr]
+            else:
+                median = DescribeEngine.quantiles(values, (0.5,))[0]
+                mad = DescribeEngine.quantiles(np.abs(values - median), (0.5,))[0]
+                if mad > 0:  # a zero MAD (over half the values equal) bounds nothing out: no bounds
+                    half_width = MAD_THRESHOLD * mad / 0.6745
+                    bounds[col] = [median - half_width, median + half_width]
+        return bounds
+
+    @staticmethod
+    def zscore_bounds(columns: list, moments: BlockMoments) -> dict:
+        """z-score bounds from column moments (which can be merged across batches)."""
+        mean, std = moments.means(), moments.stds(ddof=0)
+        return {
+            col: [float(m - ZSCORE_THRESHOLD * s), float(m + ZSCORE_THRESHOLD * s)]
+            for col, m, s in zip(columns, mean, std)
+        }
+
+    @staticmethod
+    def _fit_forest(df: pd.DataFrame, columns: list, seed: int) -> dict:
+        rng = np.random.default_rng(seed)
+        rows = np.arange(len(df))
+        if len(rows) > OUTLIER_FOREST_SAMPLE_ROWS:
+            rows = np.sort(rng.choice(rows, OUTLIER_FOREST_SAMPLE_ROWS, replace=False))
+        sample = df[columns].iloc[rows].to_numpy(dtype=np.float64, na_value=np.nan)
+        # Gaps are scored at the column median (the forest needs complete rows)
+        fill = np.nan_to_num(np.nanmedian(sample, axis=0)) if len(sample) else np.zeros(len(columns))
+        sample = np.where(np.isnan(sample), fill, sample)
+
+        forest = IsolationForest(n_estimators=OUTLIER_FOREST_TREES, random_state=seed).fit(sample)
+        trees = []
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            depth = np.zeros(tree.node_count)
+            for node in range(tree.node_count):  # children always follow their parent
+                for child in (tree.children_left[node], tree.children_right[node]):
+                    if child != -1:
+                        depth[child] = depth[node] + 1
+            leaf = tree.children_left == -1
+            trees.append({
+                "feature": tree.feature.tolist(),
+                "threshold": tree.threshold.tolist(),
+                "left": tree.children_left.tolist(),
+                "right": tree.children_right.tolist(),
+                # Path length of a row ending in each leaf, as IsolationForest scores it
+                "path": np.where(leaf, depth + _average_path_length(tree.n_node_samples), 0.0).tolist(),
+            })
+        return {
+            "method": "isolation_forest",
+            "columns": list(columns),
+            "fill": fill.tolist(),
+            "trees": trees,
+            "max_samples": int(forest.max_samples_),
+        }
+
+    @staticmethod
+    def columns(params: dict) -> list:
+        """Columns the detector reads."""
+        return list(params["columns"]) if params.get("method") == "isolation_forest" else list(params["bounds"])
+
+    @staticmethod
+    def inlier_mask(df: pd.DataFrame, params: dict, with_counts: bool = False):
+        """
+        Boolean mask of the rows to keep, built one row block at a time. With
+        `with_counts`, also the outlier counts: per column for bounds, as "rows" for the forest.
+        """
+        columns = OutlierEngine.columns(params)
+        forest = params.get("method") == "isolation_forest"
+        keep = np.ones(len(df), dtype=bool)
+        counts = np.zeros(len(columns), dtype=np.int64)
+        if not forest:
+            # (null bounds, of empty columns, compare False: every row is dropped)
+            lo = np.array([params["bounds"][col][0] for col in columns], dtype=np.float64)
+            hi = np.array([params["bounds"][col][1] for col in columns], dtype=np.float64)
+
+        start = 0
+        for block in iter_blocks(df[columns]):
+            stop = start + len(block)
+            if forest:
+                keep[start:stop] = ~OutlierEngine._forest_outliers(block, params)
+            else:
+                inside = (block >= lo) & (block <= hi)
+                keep[start:stop] = inside.all(axis=1)
+                if with_counts:
+                    counts += len(block) - inside.sum(axis=0)
+            start = stop
+
+        if not with_counts:
+            return keep
+        if forest:
+            return keep, {"rows": int(len(keep) - keep.sum())}
+        return keep, dict(zip(columns, counts.tolist()))
+
+    @staticmethod
+    def _forest_outliers(block: np.ndarray, params: dict) -> np.ndarray:
+        # Trees split float32 features (as sklearn does); gaps take the fitted fill values
+        X = np.where(np.isnan(block), params["fill"], block).astype(np.float32)
+        rows = np.arange(len(X))
+        path = np.zeros(len(X))
+        for tree in params["trees"]:
+            feature, threshold = np.asarray(tree["feature"]), np.asarray(tree["threshold"])
+            left, right = np.asarray(tree["left"]), np.asarray(tree["right"])
+            node = np.zeros(len(X), dtype=np.int64)
+            while True:
+                internal = left[node] != -1
+                if not internal.any():
+                    break
+                go_left = X[rows, np.maximum(feature[node], 0)] <= threshold[node]
+                node = np.where(internal, np.where(go_left, left[node], right[node]), node)
+            path += np.asarray(tree["path"])[node]
+        # Anomaly score 2^(-E[h(x)] / c(max_samples)), as IsolationForest.score_samples (negated)
+        score = 2.0 ** (-path / (len(params["trees"]) * _average_path_length([params["max_samples"]])[0]))
+        return score > FOREST_THRESHOLD
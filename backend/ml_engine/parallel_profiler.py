@@ -0,0 +1,126 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pandas as pd
+from pyarrow import feather
+from ml_engine.moment_kernel import BlockMoments, column_moments
+from ml_engine.describe_engine import DescribeEngine
+from ml_engine.worker_pool import ML_POOL_WORKERS, discard_executor, get_executor
+
+# Workers of the shared pool one profile uses (1 = always profile in-process)
+PROFILE_WORKERS = min(int(os.getenv("PROFILE_WORKERS", str(ML_POOL_WORKERS))), ML_POOL_WORKERS)
+
+# Frames with fewer cells than this are profiled serially: below it, shipping
+# the work to other processes costs more than the statistics themselves
+PARALLEL_PROFILE_MIN_CELLS = int(os.getenv("PARALLEL_PROFILE_MIN_CELLS", "2000000"))
+
+# Column shards per worker, so one slow shard (e.g. a wide text column) does not idle the rest
+SHARDS_PER_WORKER = 2
+
+
+def use_parallel(n_rows: int, n_columns: int, workers: int = PROFILE_WORKERS) -> bool:
+    return workers > 1 and n_columns > 1 and n_rows * n_columns >= PARALLEL_PROFILE_MIN_CELLS
+
+
+def shard_columns(columns: list, n_shards: int) -> list[list]:
+    """Round-robin column shards; interleaving spreads numeric and text columns evenly."""
+    n_shards = max(1, min(n_shards, len(columns)))
+    return [columns[i::n_shards] for i in range(n_shards)]
+
+
+def summarize_columns(df: pd.DataFrame) -> dict:
+    """
+    Per-column statistics of a frame (or a column shard of one), one JSON-ready entry
+    per column: dtype, missing count, describe() values (and which of them were
+    estimated) and, for numeric columns, the moments (count, NaN count, mean, M2, M3, M4). Entries of different shards,
+    or cached from an earlier profile, combine with `merge_summaries`.
+    """
+    numeric_cols = list(df.select_dtypes(include=[np.number]).columns)
+    missing = df.isnull().sum()
+    entries = {}
+    for col in df.columns:
+        describe, approximate = DescribeEngine.describe_column(df[col])
+        entries[col] = {
+            "dtype": str(df[col].dtype),
+            "missing": int(missing[col]),
+            "describe": describe,
+            "approximate": approximate,
+            "moments": None,
+        }
+    moments = column_moments(df[numeric_cols])
+    for i, col in enumerate(numeric_cols):
+        entries[col]["moments"] = [float(a[i]) for a in (moments.count, moments.nan_count, moments.mean,
+                                                         moments.m2, moments.m3, moments.m4)]
+    return entries
+
+
+def _summarize_shard(path: str, columns: list, pipeline=None) -> dict:
+    # Worker side: the shard's columns are read straight from the memory-mapped
+    # Arrow file, so no column data is pickled between processes
+    if pipeline is None or not pipeline.steps:
+        return summarize_columns(feather.read_feather(path, columns=columns, use_threads=False, memory_map=True))
+    raw = feather.read_feather(path, columns=pipeline.input_columns(columns), use_threads=False, memory_map=True)
+    return summarize_columns(pipeline.transform(raw)[columns])
+
+
+def start_column_summaries(df: pd.DataFrame, path: str = None, workers: int = PROFILE_WORKERS, pipeline=None):
+    """
+    Start computing `summarize_columns(df)`, where `df` holds columns of the dataset
+    stored at the Arrow file `path` (with the dataset's preprocessing `pipeline`
+    applied, see dataset_store). Large frames are split into column shards
+    summarized by worker processes that memory-map their columns from `path`;
+    small ones (or no `path`) are summarized in-process.
+    Returns a function that waits for and returns the entries, so the caller can
+    do other work (e.g. the correlation, which needs all columns at once) meanwhile.
+    The pool is shared with AutoML training (worker_pool); if a worker dies (e.g. a
+    cancelled fit), the summaries are computed in-process instead.
+    """
+    if path is None or not use_parallel(*df.shape, workers=workers):
+        return lambda: summarize_columns(df)
+
+    executor = get_executor()
+    futures = [
+        executor.submit(_summarize_shard, path, shard, pipeline)
+        for shard in shard_columns(list(df.columns), workers * SHARDS_PER_WORKER)
+    ]
+
+    def wait() -> dict:
+        entries = {}
+        try:
+            for future in futures:
+                entries.update(future.result())
+        except BrokenProcessPool:
+            discard_executor(executor)
+            return summarize_columns(df)
+        return {col: entries[col] for col in df.columns}
+    return wait
+
+
+def merge_summaries(entries: dict, columns: list) -> dict:
+    """Combine per-column entries into the full-profile pieces, in the frame's column order."""
+    numeric_cols = [col for col in columns if entries[col]["moments"] is not None]
+    stacked = np.array([entries[col]["moments"] for col in numeric_cols], dtype=np.float64).reshape(-1, 6)
+    moments = BlockMoments(*(stacked[:, i].copy() for i in range(6)))
+
+    # Row set and order of describe(include="all"): stat lists by length (categorical
+    # before numeric), each stat at its first appearance; inapplicable stats are ""
+    rows = []
+    for stats in sorted((list(entries[col]["describe"]) for col in columns), key=len):
+        rows += [stat for stat in stats if stat not in rows]
+    descriptive = {}
+    for col in columns:
+        describe = entries[col]["describe"]
+        descriptive[col] = {stat: ("" if pd.isna(describe.get(stat)) else describe[stat]) for stat in rows}
+
+    column_info = [
+        {"Column Name": col, "Data Type": entries[col]["dtype"], "Missing Values": entries[col]["missing"]}
+        for col in columns
+    ]
+    return {
+        "column_info": column_info,
+        "descriptive_statistics": descriptive,
+        "numeric_columns": numeric_cols,
+        "moments": moments,
+        "n_missing_values": sum(entries[col]["missing"] for col in columns),
+        "approximate": {col: entries[col]["approximate"] for col in columns if entries[col].get("approximate")},
+    }
@@ -0,0 +1,161 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from threadpoolctl import threadpool_limits
+from ml_engine.trainer import Trainer
+from ml_engine.evaluator import Evaluator
+from ml_engine.worker_pool import ML_POOL_WORKERS, discard_executor, get_executor, retire_executor
+
+# 🏎️ Workers of the shared pool that train one run's candidates side by side (1 = one after another)
+TRAIN_WORKERS = min(int(os.getenv("TRAIN_WORKERS", str(ML_POOL_WORKERS))), ML_POOL_WORKERS)
+
+# Training sets with fewer cells than this are trained in-process: below it, starting
+# the work in other processes costs more than the fits themselves
+PARALLEL_TRAIN_MIN_CELLS = int(os.getenv("PARALLEL_TRAIN_MIN_CELLS", "100000"))
+
+# Seconds between `poll` calls while candidates train in workers (how soon a cancel is noticed)
+TRAIN_POLL_INTERVAL_S = float(os.getenv("TRAIN_POLL_INTERVAL_S", "1"))
+
+
+def use_parallel(n_rows: int, n_columns: int, n_candidates: int, workers: int = TRAIN_WORKERS) -> bool:
+    return workers > 1 and n_candidates > 1 and n_rows * n_columns >= PARALLEL_TRAIN_MIN_CELLS
+
+
+def train_and_evaluate(algorithm_name: str, task_type: str, X_train, y_train, X_test, y_test) -> dict:
+    """Fit one candidate and score it on the test split: its model, metrics and training time."""
+    result = Trainer(task_type).train_and_evaluate(algorithm_name, X_train, y_train, X_test)
+    return {
+        "model": result["model"],
+        "metrics": Evaluator.evaluate(y_test, result["predictions"], task_type),
+        "training_time": result["training_time"],
+    }
+
+
+# ---------------------------------------------------------
+# Shared inputs: the splits are written once as .npy files, and every worker
+# memory-maps them (read-only) instead of receiving a pickled copy
+# ---------------------------------------------------------
+
+def _save(directory: str, name: str, values: np.ndarray) -> str:
+    path = os.path.join(directory, f"{name}.npy")
+    np.save(path, values)
+    return path
+
+
+def _share(directory: str, name: str, data) -> tuple:
+    """Write `data` (frame, CSR matrix, series or array) under `directory`; returns how to reopen it."""
+    if sparse.issparse(data):
+        data = data.tocsr()
+        return ("csr", data.shape, *(_save(directory, f"{name}_{part}", getattr(data, part))
+                                     for part in ("data", "indices", "indptr")))
+    if isinstance(data, pd.DataFrame):
+        # One C-ordered float matrix, filled column by column (the features are all numeric)
+        path = os.path.join(directory, f"{name}.npy")
+        matrix = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=data.shape)
+        for j in range(data.shape[1]):
+            matrix[:, j] = data.iloc[:, j].to_numpy(dtype=np.float64, na_value=np.nan)
+        matrix.flush()
+        return ("frame", list(data.columns), path)
+    return ("array", _save(directory, name, np.asarray(data)))
+
+
+def _open(spec: tuple):
+    kind = spec[0]
+    if kind == "csr":
+        shape, *paths = spec[1:]
+        return sparse.csr_matrix(tuple(np.load(path, mmap_mode="r") for path in paths), shape=shape, copy=False)
+    if kind == "frame":
+        return pd.DataFrame(np.load(spec[2], mmap_mode="r"), columns=spec[1], copy=False)
+    return np.load(spec[1], mmap_mode="r")
+
+
+def _train_shared(algorithm_name: str, task_type: str, specs: tuple, threads: int) -> dict:
+    # Worker side; each candidate gets its share of the cores for its own thread pools
+    with threadpool_limits(limits=threads):
+        return train_and_evaluate(algorithm_name, task_type, *(_open(spec) for spec in specs))
+
+
+def _train_in_process(algorithms: list, task_type: str, X_train, y_train, X_test, y_test, on_result=None) -> list:
+    outcomes = []
+    for i, algorithm_name in enumerate(algorithms):
+        try:
+            outcomes.append(train_and_evaluate(algorithm_name, task_type, X_train, y_train, X_test, y_test))
+        except Exception as e:
+            outcomes.append(e)
+        if on_result:
+            on_result(i, outcomes[-1])
+    return outcomes
+
+
+def train_candidates(algorithms: list, task_type: str, X_train, y_train, X_test, y_test,
+                     workers: int = TRAIN_WORKERS, on_result=None, poll=None) -> list:
+    """
+    Train and evaluate every candidate algorithm on the same split. Returns one outcome
+    per algorithm, in the order given: the train_and_evaluate result, or the exception
+    its training raised (one failing candidate never stops the others).
+    Large training sets are trained side by side in worker processes, which
+    memory-map the splits from a temporary directory; outcomes are collected as
+    each candidate finishes. Small ones are trained in-process, one after another.
+    `on_result(index, outcome)` is called as each candidate finishes, and `poll()`
+    every TRAIN_POLL_INTERVAL_S while candidates train in workers; an exception
+    either raises (e.g. a cancelled job) stops the run: candidates not started yet
+    are dropped, and running ones are killed with the pool they run in. (In-process
+    fits cannot be interrupted: there the run stops after the current candidate.)
+    """
+    if not use_parallel(*X_train.shape, len(algorithms), workers=workers):
+        return _train_in_process(algorithms, task_type, X_train, y_train, X_test, y_test, on_result)
+
+    workers = min(workers, len(algorithms), ML_POOL_WORKERS)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    directory = tempfile.mkdtemp(prefix="automl_")
+    try:
+        try:
+            specs = tuple(_share(directory, name, data) for name, data in
+                          (("X_train", X_train), ("y_train", y_train), ("X_test", X_test), ("y_test", y_test)))
+        except (TypeError, ValueError):
+            # Non-numeric features or labels: every candidate reports its own failure, as in-process
+            return _train_in_process(algorithms, task_type, X_train, y_train, X_test, y_test, on_result)
+
+        def submit(i: int) -> None:
+            executor = get_executor()
+            futures[executor.submit(_train_shared, algorithms[i], task_type, specs, threads)] = (i, executor)
+
+        futures, retried = {}, set()
+        for i in range(len(algorithms)):
+            submit(i)
+        outcomes = [None] * len(algorithms)
+        try:
+            while futures:
+                done, _ = wait(futures, timeout=TRAIN_POLL_INTERVAL_S, return_when=FIRST_COMPLETED)
+                if not done and poll:
+                    poll()
+                for future in done:
+                    i, executor = futures.pop(future)
+                    try:
+                        outcomes[i] = future.result()
+                    except BrokenProcessPool as e:
+                        # A worker died (out of memory, or its pool was stopped for another
+                        # run's cancellation): the candidate gets one more try on a new pool
+                        discard_executor(executor)
+                        if i not in retried:
+                            retried.add(i)
+                            submit(i)
+                            continue
+                        outcomes[i] = e
+                    except Exception as e:
+                        outcomes[i] = e
+                    if on_result:
+                        on_result(i, outcomes[i])
+        except BaseException:
+            running = {executor for future, (_, executor) in futures.items() if not future.cancel() and not future.done()}
+            for executor in running:
+                retire_executor(executor)
+            raise
+        return outcomes
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
@@ -11,10 +11,10 @@ class PreprocessingSuggester:
         suggestions = []
         
         # 1. Missing Values
-        # Check meta_features first if available, else sum df
-        # (Assuming meta_features extraction logic might have sum, 
-        # but let's re-check DF to be safe/granular if needed)
-        total_missing = df.isnull().sum().sum()
+        # Use the count from meta-feature extraction; only scan the df if it is missing
+        total_missing = meta_features.get("n_missing_values")
+        if total_missing is None:
+            total_missing = df.isnull().sum().sum()
         if total_missing > 0:
             suggestions.append({
                 "action": "missing",
@@ -0,0 +1,227 @@
+import math
+import numpy as np
+import pandas as pd
+
+# Distinct values are counted exactly up to this many, then by HyperLogLog
+EXACT_DISTINCT_LIMIT = 4096
+
+# HLL registers = 2 ** precision; 14 gives ~0.8% standard error in 16 KB
+HLL_PRECISION = 14
+
+# KLL accuracy parameter; rank error is roughly 1.7 / k
+KLL_K = 200
+
+# Counters kept per column for heavy hitters (top values)
+TOP_K_COUNTERS = 256
+
+
+def hash_values(values) -> np.ndarray:
+    """64-bit hashes of non-null values; equal values hash equally across batches."""
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.CategoricalDtype):
+        # Hash each category once and gather by code
+        codes = values.cat.codes.to_numpy()
+        category_hashes = pd.util.hash_array(values.cat.categories.to_numpy(dtype=object))
+        return category_hashes[codes[codes >= 0]]
+    values = pd.Series(values).dropna().to_numpy()
+    if values.dtype.kind in "iub":
+        values = values.astype(np.int64)
+    elif values.dtype.kind == "f":
+        values = values.astype(np.float64)
+    else:
+        values = values.astype(object)
+    return pd.util.hash_array(values)
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    """Bit length of each uint64 (smear the highest set bit down, then popcount)."""
+    x = x.copy()
+    for shift in (1, 2, 4, 8, 16, 32):
+        x |= x >> np.uint64(shift)
+    return np.bitwise_count(x)
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter over 64-bit hashes. Merging = register-wise max."""
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.intp)
+        # Remaining bits, with a sentinel bit so the rank is bounded by 64 - p + 1
+        rest = (hashes << p) | (np.uint64(1) << (p - np.uint64(1)))
+        rank = (np.uint8(65) - _bit_length(rest)).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        merged = HyperLogLog(self.precision)
+        merged.registers = np.maximum(self.registers, other.registers)
+        return merged
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)  # linear counting for small cardinalities
+        return float(raw)
+
+
+class DistinctCounter:
+    """
+    Exact distinct count (set of hashes) while small, HyperLogLog once it grows
+    past `limit`. `approximate` tells which one produced the count.
+    """
+
+    def __init__(self, limit: int = EXACT_DISTINCT_LIMIT):
+        self.limit = limit
+        self.exact = np.empty(0, dtype=np.uint64)
+        self.hll = None
+
+    @property
+    def approximate(self) -> bool:
+        return self.hll is not None
+
+    def update(self, hashes: np.ndarray) -> None:
+        if self.hll is not None:
+            self.hll.update(hashes)
+            return
+        self.exact = np.union1d(self.exact, hashes)
+        if len(self.exact) > self.limit:
+            self.hll = HyperLogLog()
+            self.hll.update(self.exact)
+            self.exact = None
+
+    def merge(self, other: "DistinctCounter") -> "DistinctCounter":
+        merged = DistinctCounter(self.limit)
+        for part in (self, other):
+            if part.hll is not None:
+                if merged.hll is None:
+                    merged.hll = HyperLogLog()
+                    merged.hll.update(merged.exact)
+                    merged.exact = None
+                merged.hll = merged.hll.merge(part.hll)
+            else:
+                merged.update(part.exact)
+        return merged
+
+    def count(self) -> int:
+        return int(round(self.hll.estimate())) if self.hll is not None else len(self.exact)
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch. Level h holds items of weight 2**h; a full level is sorted
+    and every other item (random offset) is promoted. Stays exact until the first
+    compaction, which `approximate` reports.
+    """
+
+    def __init__(self, k: int = KLL_K, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self.approximate = False
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.n += len(values)
+        self._compress()
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+                keep = len(items) % 2  # an odd item out stays on this level
+                promoted = items[keep:][self._rng.integers(2)::2]
+                self.levels[level] = items[:keep]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                self.approximate = True
+            level += 1
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        merged = KLLSketch(self.k)
+        height = max(len(self.levels), len(other.levels))
+        merged.levels = [
+            np.concatenate([part.levels[h] for part in (self, other) if h < len(part.levels)])
+            for h in range(height)
+        ]
+        merged.n = self.n + other.n
+        merged.approximate = self.approximate or other.approximate
+        merged._compress()
+        return merged
+
+    def quantiles(self, qs) -> list[float]:
+        if self.n == 0:
+            return [np.nan] * len(qs)
+        if not self.approximate:
+            # Nothing compacted yet: identical to pandas' linear interpolation
+            return [float(v) for v in np.quantile(self.levels[0], qs)]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(lvl), 2 ** h, dtype=np.float64) for h, lvl in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        ranks = np.asarray(qs, dtype=np.float64) * cumulative[-1]
+        idx = np.minimum(np.searchsorted(cumulative, ranks, side="left"), len(items) - 1)
+        return [float(v) for v in items[idx]]
+
+
+class MisraGries:
+    """
+    Mergeable Misra-Gries heavy-hitters summary over value counts.
+    Counts are lower bounds, short by at most `error`; exact while the number of
+    distinct values never exceeded `k`.
+    """
+
+    def __init__(self, k: int = TOP_K_COUNTERS):
+        self.k = k
+        self.counts = pd.Series(dtype=np.int64)
+        self.error = 0
+
+    @property
+    def approximate(self) -> bool:
+        return self.error > 0
+
+    def update(self, values: pd.Series) -> None:
+        counts = values.value_counts(sort=False)
+        counts = counts[counts > 0]
+        counts.index = counts.index.astype(object)
+        self._absorb(counts, 0)
+
+    def merge(self, other: "MisraGries") -> "MisraGries":
+        merged = MisraGries(self.k)
+        merged.counts, merged.error = self.counts, self.error
+        merged._absorb(other.counts, other.error)
+        return merged
+
+    def _absorb(self, counts: pd.Series, error: int) -> None:
+        merged = self.counts.add(counts, fill_value=0).astype(np.int64)
+        self.error += error
+        if len(merged) > self.k:
+            merged = merged.sort_values(ascending=False, kind="stable")
+            cut = int(merged.iloc[self.k])
+            merged = merged.iloc[:self.k] - cut
+            merged = merged[merged > 0]
+            self.error += cut
+        self.counts = merged
+
+    def top(self, n: int = None) -> pd.Series:
+        top = self.counts.sort_values(ascending=False, kind="stable")
+        return top if n is None else top.head(n)
@@ -0,0 +1,230 @@
+import os
+import numpy as np
+import pandas as pd
+from ml_engine.moment_kernel import BlockMoments
+from ml_engine.correlation_engine import CorrelationEngine
+from ml_engine.meta_feature_extractor import MetaFeatureExtractor
+from ml_engine.sketches import DistinctCounter, KLLSketch, MisraGries, hash_values
+from utils.json_sanitizer import frame_records
+
+# Rows (sampled uniformly over the dataset) used for the correlation meta-feature
+CORRELATION_SAMPLE_ROWS = int(os.getenv("CORRELATION_SAMPLE_ROWS", "100000"))
+
+PREVIEW_ROWS = 5
+
+_QUANTILES = [0.25, 0.5, 0.75]
+_QUANTILE_LABELS = ["25%", "50%", "75%"]
+_NUMERIC_STATS = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+_CATEGORICAL_STATS = ["count", "unique", "top", "freq"]
+
+
+def _is_numeric(dtype) -> bool:
+    # Same split as select_dtypes(include=[np.number]) / describe(): bools are categorical
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+class StreamingProfiler:
+    """
+    Builds the /profiling response from a dataset streamed in chunks, keeping only
+    mergeable per-column summaries: exact moments (BlockMoments, the batched form of
+    Welford's update), min/max and missing counts, KLL quantiles for numeric columns,
+    distinct counts (exact, then HyperLogLog) and Misra-Gries top values for the rest.
+    Memory is bounded by one chunk plus the sketches, whatever the dataset size.
+    Statistics that came from a sketch rather than exact counting are listed under
+    "approximate" in the result.
+    """
+
+    def __init__(self, target_column: str = None, total_rows: int = None, seed: int = 0):
+        self.target_column = target_column
+        self.total_rows = total_rows
+        self.rows = 0
+        self.dtypes = None
+        self.numeric_cols = []
+        self.categorical_cols = []
+        self.missing = None
+        self.moments = None
+        self.mins = None
+        self.maxs = None
+        self.quantiles = {}
+        self.distinct = {}
+        self.top = {}
+        self.preview = None
+        self.corr_sample = []
+        self.corr_sampled = False
+        self._rng = np.random.default_rng(seed)
+
+    def _init_columns(self, chunk: pd.DataFrame) -> None:
+        if self.target_column not in chunk.columns:
+            self.target_column = None  # unknown targets are ignored, as in extract()
+        self.dtypes = chunk.dtypes
+        self.numeric_cols = [col for col, dtype in self.dtypes.items() if _is_numeric(dtype)]
+        self.categorical_cols = [col for col in chunk.columns if col not in self.numeric_cols]
+        self.missing = pd.Series(0, index=chunk.columns, dtype=np.int64)
+        self.moments = BlockMoments.empty(len(self.numeric_cols))
+        self.mins = np.full(len(self.numeric_cols), np.nan)
+        self.maxs = np.full(len(self.numeric_cols), np.nan)
+        self.quantiles = {col: KLLSketch() for col in self.numeric_cols}
+        # The target also needs distinct/class counts to decide classification vs regression
+        tracked = set(self.categorical_cols) | ({self.target_column} if self.target_column else set())
+        self.distinct = {col: DistinctCounter() for col in chunk.columns if col in tracked}
+        self.top = {col: MisraGries() for col in chunk.columns if col in tracked}
+        self.preview = chunk.head(0)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        if self.dtypes is None:
+            self._init_columns(chunk)
+        if len(chunk) == 0:
+            return
+        self.rows += len(chunk)
+        self.missing += chunk.isna().sum().astype(np.int64)
+        if len(self.preview) < PREVIEW_ROWS:
+            self.preview = pd.concat([self.preview, chunk.head(PREVIEW_ROWS - len(self.preview))])
+
+        if self.numeric_cols:
+            block = chunk[self.numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+            self.moments = self.moments.merge(BlockMoments.from_block(block))
+            # fmin/fmax skip NaNs, and an all-NaN column simply stays NaN
+            self.mins = np.fmin(self.mins, np.fmin.reduce(block, axis=0))
+            self.maxs = np.fmax(self.maxs, np.fmax.reduce(block, axis=0))
+            for i, col in enumerate(self.numeric_cols):
+                self.quantiles[col].update(block[:, i])
+            self._sample_for_correlation(chunk[self.numeric_cols])
+
+        for col in self.distinct:
+            self.distinct[col].update(hash_values(chunk[col]))
+            self.top[col].update(chunk[col])
+
+    def _sample_for_correlation(self, numeric_chunk: pd.DataFrame) -> None:
+        if self.total_rows is not None and self.total_rows > CORRELATION_SAMPLE_ROWS:
+            # Bernoulli sample with the rate that yields ~CORRELATION_SAMPLE_ROWS overall
+            keep = self._rng.random(len(numeric_chunk)) < CORRELATION_SAMPLE_ROWS / self.total_rows
+            numeric_chunk = numeric_chunk[keep]
+            self.corr_sampled = True
+        else:
+            # Unknown total: keep the first rows
+            room = CORRELATION_SAMPLE_ROWS - sum(len(part) for part in self.corr_sample)
+            if room < len(numeric_chunk):
+                self.corr_sampled = True
+            numeric_chunk = numeric_chunk.head(max(room, 0))
+        if len(numeric_chunk):
+            self.corr_sample.append(numeric_chunk)
+
+    def merge(self, other: "StreamingProfiler") -> "StreamingProfiler":
+        """Combine profiles of two disjoint parts of the same dataset (self's rows first)."""
+        if other.dtypes is None:
+            return self
+        if self.dtypes is None:
+            return other
+        merged = StreamingProfiler(self.target_column, self.total_rows)
+        merged.dtypes, merged.numeric_cols, merged.categorical_cols = self.dtypes, self.numeric_cols, self.categorical_cols
+        merged.rows = self.rows + other.rows
+        merged.missing = self.missing + other.missing
+        merged.moments = self.moments.merge(other.moments)
+        merged.mins, merged.maxs = np.fmin(self.mins, other.mins), np.fmax(self.maxs, other.maxs)
+        merged.quantiles = {col: self.quantiles[col].merge(other.quantiles[col]) for col in self.quantiles}
+        merged.distinct = {col: self.distinct[col].merge(other.distinct[col]) for col in self.distinct}
+        merged.top = {col: self.top[col].merge(other.top[col]) for col in self.top}
+        merged.preview = pd.concat([self.preview, other.preview]).head(PREVIEW_ROWS)
+        merged.corr_sample = self.corr_sample + other.corr_sample
+        merged.corr_sampled = self.corr_sampled or other.corr_sampled
+        return merged
+
+    def _describe(self) -> tuple[dict, dict]:
+        """describe(include="all").fillna("") equivalent, plus the stats that are approximate."""
+        stats = {}
+        approximate = {}
+        means, stds = self.moments.means(), self.moments.stds()
+        for i, col in enumerate(self.numeric_cols):
+            q25, q50, q75 = self.quantiles[col].quantiles(_QUANTILES)
+            stats[col] = {
+                "count": float(self.moments.count[i]), "mean": means[i], "std": stds[i], "min": self.mins[i],
+                "25%": q25, "50%": q50, "75%": q75, "max": self.maxs[i],
+            }
+            if self.quantiles[col].approximate:
+                approximate[col] = list(_QUANTILE_LABELS)
+        for col in self.categorical_cols:
+            top = self.top[col].top(1)
+            stats[col] = {
+                "count": int(self.rows - self.missing[col]),
+                "unique": self.distinct[col].count(),
+                "top": top.index[0] if len(top) else np.nan,
+                "freq": int(top.iloc[0]) if len(top) else np.nan,
+            }
+            flags = (["unique"] if self.distinct[col].approximate else []) + (["top", "freq"] if self.top[col].approximate else [])
+            if flags:
+                approximate[col] = flags
+
+        # Same rows (and order) describe(include="all") produces for this mix of columns
+        rows = []
+        if self.categorical_cols:
+            rows = list(_CATEGORICAL_STATS)
+        if self.numeric_cols:
+            rows += [stat for stat in _NUMERIC_STATS if stat not in rows]
+        descriptive = {
+            col: {stat: ("" if pd.isna(stats[col].get(stat, np.nan)) else stats[col][stat]) for stat in rows}
+            for col in self.dtypes.index
+        }
+        return descriptive, approximate
+
+    def _class_counts(self):
+        target = self.target_column
+        if not target or target not in self.top:
+            return None
+        dtype = self.dtypes[target]
+        is_classification = (
+            dtype == 'object'
+            or isinstance(dtype, pd.CategoricalDtype)
+            or self.distinct[target].count() < 20
+        )
+        return self.top[target].top() if is_classification else None
+
+    def result(self) -> dict:
+        if self.dtypes is None:
+            raise ValueError("No data was profiled.")
+        descriptive, approximate_stats = self._describe()
+        total_missing = int(self.missing.sum())
+
+        avg_corr = 0
+        if self.corr_sample:
+            avg_corr = MetaFeatureExtractor.average_correlation(pd.concat(self.corr_sample))
+        class_counts = self._class_counts()
+        meta_features = MetaFeatureExtractor.from_summaries(
+            n_instances=self.rows,
+            n_features=len(self.dtypes),
+            n_categorical=len(self.categorical_cols),
+            n_missing_values=total_missing,
+            moments=self.moments,
+            avg_corr=avg_corr,
+            class_counts=class_counts,
+        )
+        approximate_meta = []
+        sample_rows = sum(len(part) for part in self.corr_sample)
+        if self.numeric_cols and (self.corr_sampled or not CorrelationEngine.is_exact(sample_rows, len(self.numeric_cols))):
+            approximate_meta.append("avg_feature_correlation")
+        if class_counts is not None and self.top[self.target_column].approximate:
+            approximate_meta += ["n_classes", "class_imbalance_ratio", "target_entropy"]
+
+        column_info = [
+            {"Column Name": col, "Data Type": str(dtype), "Missing Values": int(self.missing[col])}
+            for col, dtype in self.dtypes.items()
+        ]
+        return {
+            "rows": self.rows,
+            "columns": len(self.dtypes),
+            "total_missing_values": total_missing,
+            "column_info": column_info,
+            "descriptive_statistics": descriptive,
+            "meta_features": meta_features,
+            "preview": frame_records(self.preview),
+            "approximate": {
+                "descriptive_statistics": approximate_stats,
+                "meta_features": approximate_meta,
+            },
+        }
+
+
+def profile_stream(chunks, target_column: str = None, total_rows: int = None) -> dict:
+    profiler = StreamingProfiler(target_column, total_rows)
+    for chunk in chunks:
+        profiler.update(chunk)
+    return profiler.result()
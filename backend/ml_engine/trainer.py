@@ -8,6 +8,8 @@ class Trainer:
     def train_and_evaluate(self, algorithm_name, X_train, y_train, X_test):
         """
         Trains the model, measures time, and returns predictions.
+        X_train / X_test may be scipy.sparse CSR matrices (hashed categorical
+        features): every ModelFactory model fits and predicts on them as they are.
         """
         model = ModelFactory.get_model(algorithm_name, self.task_type)
         
@@ -0,0 +1,46 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# 🏊 Worker processes shared by parallel profiling and AutoML training: one pool and
+# one process limit, however many profiles and runs are in flight
+ML_POOL_WORKERS = int(os.getenv("ML_POOL_WORKERS", str(os.cpu_count() or 1)))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    # One long-lived pool; "spawn" because the API process runs threads, which fork does not copy safely
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=ML_POOL_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def discard_executor(executor: ProcessPoolExecutor) -> None:
+    # A pool whose worker died rejects all further work: the next call starts a new one
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+
+def retire_executor(executor: ProcessPoolExecutor) -> None:
+    """
+    Stop a pool at once, killing the tasks it is running (a cancelled run's fits):
+    the next call starts a new pool, and work other callers had on this one fails
+    with BrokenProcessPool (parallel_trainer retries it, parallel_profiler falls
+    back to summarizing in-process).
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    processes = list((executor._processes or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
@@ -1,8 +1,15 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 import os
+import threading
+import time
 import traceback
 from ml_engine.automl_runner import AutoMLRunner
+from services.dataset_store import (
+    dataset_exists, dataset_fingerprint, dataset_version, load_dataset, load_pipeline, load_version_log,
+)
+from services.job_queue import FINISHED_STATUSES, job_queue
+from utils.json_sanitizer import FastJSONResponse, dump_json, load_json
 
 router = APIRouter(
     prefix="/automl",
@@ -10,56 +17,177 @@ router = APIRouter(
 )
 
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-DATASET_DIR = os.path.join(BASE_DIR, "storage", "datasets")
+AUTOML_DIR = os.path.join(BASE_DIR, "storage", "automl")
+# Each queued run's own results and pipeline, by dataset and job id
+AUTOML_JOBS_DIR = os.path.join(AUTOML_DIR, "jobs")
+
+_persist_lock = threading.Lock()
+
 
 class AutoMLRequest(BaseModel):
     dataset_id: str
     target_column: str
     use_meta_selection: bool = True
+    # Successive halving of the candidates (None: only for large training splits, see candidate_racing)
+    racing: bool | None = None
+    # Its budget, when the run races: first-rung training rows, the factor each rung cuts the
+    # candidates by (and grows the rows by), and the test rows rungs are scored on (None: defaults)
+    racing_min_rows: int | None = None
+    racing_eta: int | None = None
+    racing_eval_rows: int | None = None
+
+
+def _racing_budget(req: AutoMLRequest) -> dict:
+    return {"min_rows": req.racing_min_rows, "eta": req.racing_eta, "eval_rows": req.racing_eval_rows}
+
+
+def _persist_results(dataset_id: str, target_column: str, runner: AutoMLRunner, results: dict,
+                     submitted_at: float, job_id: str = None) -> dict:
+    results["target_column"] = target_column
+    # The run that produced them (None: a synchronous /automl/run)
+    results["job_id"] = job_id
+    results["submitted_at"] = submitted_at
+    # Fitted preprocessing the models were trained behind (raw columns -> model input)
+    pipeline = runner.pipeline.to_dict()
+
+    # --- PERSIST RESULTS ---
+    if job_id:
+        os.makedirs(AUTOML_JOBS_DIR, exist_ok=True)
+        dump_json(results, os.path.join(AUTOML_JOBS_DIR, f"{dataset_id}_{job_id}_results.json"))
+        dump_json(pipeline, os.path.join(AUTOML_JOBS_DIR, f"{dataset_id}_{job_id}_pipeline.json"))
+
+    # Save to storage/automl so Explainability page can access it later: the dataset's
+    # files are the latest submitted run's, so a run finishing after a newer one
+    # (concurrent jobs) does not replace them, and results and pipeline stay a pair
+    os.makedirs(AUTOML_DIR, exist_ok=True)
+    results_path = os.path.join(AUTOML_DIR, f"{dataset_id}_results.json")
+    with _persist_lock:
+        try:
+            current = load_json(results_path).get("submitted_at") or 0
+        except (OSError, ValueError):
+            current = 0
+        if current <= results["submitted_at"]:
+            dump_json(results, results_path)
+            dump_json(pipeline, os.path.join(AUTOML_DIR, f"{dataset_id}_pipeline.json"))
+    return results
+
 
 @router.post("/run")
 def run_automl(req: AutoMLRequest):
-    dataset_path = os.path.join(DATASET_DIR, f"{req.dataset_id}.csv")
-    
-    if not os.path.exists(dataset_path):
+    """Synchronous run (the request lasts as long as training); see /automl/jobs for the queued one."""
+    if not dataset_exists(req.dataset_id):
         raise HTTPException(status_code=404, detail="Dataset not found.")
 
     try:
-        runner = AutoMLRunner(dataset_path, req.target_column)
-        results = runner.run()
-        results["target_column"] = req.target_column
-        
-        # --- PERSIST RESULTS ---
-        # Save to storage/automl so Explainability page can access it later
-        AUTOML_DIR = os.path.join(BASE_DIR, "storage", "automl")
-        os.makedirs(AUTOML_DIR, exist_ok=True)
-        
-        results_path = os.path.join(AUTOML_DIR, f"{req.dataset_id}_results.json")
-        import json
-        with open(results_path, "w") as f:
-            json.dump(results, f)
-            
-        return results
+        submitted_at = time.time()
+        runner = AutoMLRunner(load_dataset(req.dataset_id), req.target_column, load_pipeline(req.dataset_id),
+                              racing=req.racing, racing_budget=_racing_budget(req))
+        results = _persist_results(req.dataset_id, req.target_column, runner, runner.run(),
+                                   submitted_at=submitted_at)
+        return FastJSONResponse(results)
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+
+# ---------------------------------------------------------
+# 🧵 Background runs: submitting returns a job id at once, a worker thread runs
+# AutoMLRunner, and clients poll the job (services/job_queue.py)
+# ---------------------------------------------------------
+
+def _run_automl_job(job: dict, report) -> dict:
+    # Runs on the dataset version that was current at submission (see dataset_store.VersionLog)
+    params = job["params"]
+    dataset_id, stamp = params["dataset_id"], params["dataset_version"]
+    version = stamp[-1]
+    if (not dataset_exists(dataset_id) or version not in load_version_log(dataset_id)
+            or list(dataset_version(dataset_id, version)) != stamp):
+        raise ValueError("The dataset no longer exists, or was replaced since the job was submitted.")
+    runner = AutoMLRunner(load_dataset(dataset_id, version=version), params["target_column"],
+                          load_pipeline(dataset_id, version), racing=params.get("racing"),
+                          racing_budget=params.get("racing_budget"))
+    return _persist_results(dataset_id, params["target_column"], runner, runner.run(on_progress=report),
+                            job_id=job["id"], submitted_at=job["created_at"])
+
+
+job_queue.register("automl", _run_automl_job)
+
+
+def _job_status(job: dict) -> dict:
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "dataset_id": job["params"]["dataset_id"],
+        "target_column": job["params"]["target_column"],
+        "progress": job["progress"],
+        "error": job["error"],
+        "cancel_requested": job["cancel_requested"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+
+
+def _get_job(job_id: str) -> dict:
+    job = job_queue.get(job_id)
+    if job is None or job["kind"] != "automl":
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+
+@router.post("/jobs", status_code=202)
+def submit_automl_job(req: AutoMLRequest):
+    if not dataset_exists(req.dataset_id):
+        raise HTTPException(status_code=404, detail="Dataset not found.")
+    job = job_queue.submit("automl", {
+        "dataset_id": req.dataset_id,
+        "target_column": req.target_column,
+        "dataset_version": dataset_fingerprint(req.dataset_id)["version"],
+        "racing": req.racing,
+        "racing_budget": _racing_budget(req),
+    })
+    return _job_status(job)
+
+
+@router.get("/jobs/{job_id}")
+def get_automl_job(job_id: str):
+    """Status and progress: the current stage and each candidate's status and metrics."""
+    return _job_status(_get_job(job_id))
+
+
+@router.get("/jobs/{job_id}/results")
+def get_automl_job_results(job_id: str):
+    job = _get_job(job_id)
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}; results exist once it has succeeded.")
+    return FastJSONResponse(job["result"])
+
+
+@router.post("/jobs/{job_id}/cancel")
+def cancel_automl_job(job_id: str):
+    """Queued jobs are cancelled at once; running ones stop at their next progress report."""
+    job = _get_job(job_id)
+    if job["status"] in FINISHED_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job is already {job['status']}.")
+    return _job_status(job_queue.cancel(job_id))
+
 @router.get("/results/{dataset_id}")
-def get_automl_results(dataset_id: str):
+def get_automl_results(dataset_id: str, job_id: str = None):
     """
-    Retrieve persisted AutoML results for a given dataset.
+    Retrieve persisted AutoML results for a given dataset: the latest submitted run's,
+    or those of the queued run `job_id`.
     """
-    AUTOML_DIR = os.path.join(BASE_DIR, "storage", "automl")
-    results_path = os.path.join(AUTOML_DIR, f"{dataset_id}_results.json")
-    
+    if job_id:
+        results_path = os.path.join(AUTOML_JOBS_DIR, f"{dataset_id}_{os.path.basename(job_id)}_results.json")
+    else:
+        results_path = os.path.join(AUTOML_DIR, f"{dataset_id}_results.json")
+
     if os.path.exists(results_path):
-        import json
         try:
-            with open(results_path, "r") as f:
-                return json.load(f)
+            return load_json(results_path)
         except Exception as e:
             print(f"Error reading results file: {e}")
             raise HTTPException(status_code=500, detail="Failed to read results file.")
-            
+
     # Return 404 if not found (frontend should handle this gracefully as "no results yet")
     raise HTTPException(status_code=404, detail="No results found for this dataset.")
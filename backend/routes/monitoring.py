@@ -3,6 +3,8 @@ import time
 import os
 from fastapi import APIRouter
 from datetime import datetime
+from services.frame_cache import frame_cache, sample_cache
+from services.profile_cache import profile_cache
 
 router = APIRouter(
     prefix="/system",
@@ -37,7 +39,10 @@ def get_system_stats():
         "uptime": uptime_str,
         "active_models": 3, # Mock for now
         "total_requests": 142 + int(uptime_seconds / 10), # Simulated increase
-        "status": "Healthy"
+        "status": "Healthy",
+        "dataset_cache": frame_cache.stats(),
+        "sample_cache": sample_cache.stats(),
+        "profile_cache": profile_cache.stats()
     }
 
 @router.get("/logs")
@@ -1,22 +1,33 @@
 # routes/preprocess.py 
+import os
+import time
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-import pandas as pd
-import os
 
-# Import your existing ML logic
-from logic.preprocessing.missing_handler import handle_missing
-from logic.preprocessing.missing_handler import handle_missing
-from logic.preprocessing.feature_transformer import encode_and_scale, encode_data, scale_data
-from ml_engine.outlier_detector import remove_outliers_iqr
+from ml_engine.describe_engine import DescribeEngine
+from ml_engine.incremental_profiler import CORRELATION_PRESERVING_ACTIONS, carry_forward, touched_columns
+from ml_engine.outlier_engine import OUTLIER_METHODS
+from services.chunked_preprocessor import chunkable, fit_step_chunked
+from services.dataset_store import (
+    columnar_path, compare_versions, dataset_columns, dataset_exists, dataset_fingerprint, dataset_head,
+    dataset_num_rows, dataset_sample, dataset_versions, iter_dataset_batches, load_dataset, load_pipeline,
+    load_version_log, save_pipeline, set_current_version,
+)
+from services.preprocessing_pipeline import ROW_FILTER_ACTIONS, STEPS, step_columns
+from services.profile_cache import profile_cache
+from utils.json_sanitizer import frame_records
 
 router = APIRouter(
     prefix="/preprocess",
     tags=["Preprocess"]
 )
 
-BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-DATASET_DIR = os.path.join(BASE_DIR, "storage", "datasets")
+# 🧱 Datasets whose columnar copy is larger than this are preprocessed out of core:
+# steps are fitted and checked batch by batch (services/chunked_preprocessor.py)
+CHUNKED_PREPROCESS_MIN_MB = int(os.getenv("CHUNKED_PREPROCESS_MIN_MB", "256"))
+
+# 👀 Rows of the (cached, stratified) sample that previews are computed on
+PREVIEW_SAMPLE_ROWS = int(os.getenv("PREVIEW_SAMPLE_ROWS", "10000"))
 
 
 # 📦 Request body schema
@@ -25,54 +36,302 @@ class PreprocessRequest(BaseModel):
     target_column: str
     action: str  # "missing", "scaling", "encoding", "outliers"
     categorical_columns: list[str] = []
+    outlier_method: str = "iqr"  # "iqr", "zscore", "mad", "isolation_forest"
+    preview: bool = False  # estimate the effect on a sample; nothing is saved
 
 
-@router.post("/")
-def apply_preprocessing(req: PreprocessRequest):
-    file_path = os.path.join(DATASET_DIR, f"{req.dataset_id}.csv")
+class BatchPreprocessRequest(BaseModel):
+    dataset_id: str
+    target_column: str
+    actions: list[str]  # applied in order, e.g. ["missing", "encoding", "scaling", "outliers"]
+    categorical_columns: list[str] = []
+    outlier_method: str = "iqr"
+    preview: bool = False
 
-    # Check dataset exists
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="Dataset not found.")
 
-    # Load dataset
-    df = pd.read_csv(file_path)
+class VersionRequest(BaseModel):
+    dataset_id: str
+    version: int | None = None  # checkout only
+
 
+def _use_chunked(dataset_id: str) -> bool:
+    path = columnar_path(dataset_id)
+    return os.path.exists(path) and os.path.getsize(path) > CHUNKED_PREPROCESS_MIN_MB * 1024 * 1024
+
+
+def _apply_actions(dataset_id: str, target_column: str, actions: list[str], categorical_columns: list[str],
+                   outlier_method: str = "iqr"):
+    """
+    Fit `actions` in order as steps of the dataset's preprocessing pipeline, then
+    persist the pipeline once (each applied action becomes a version of the dataset,
+    which undo/redo move between). Each step records its imputation values, encoder
+    classes, scaler parameters or outlier detector; the columnar copy is never
+    rewritten, every read applies the recorded steps to it.
+    Datasets up to CHUNKED_PREPROCESS_MIN_MB are loaded once and the actions run back
+    to back on that frame. Larger ones are not loaded whole: each action takes two
+    passes over the record batches (fit, then check), until an action that cannot be
+    fitted batch by batch (MAD or isolation-forest outliers); the output of the steps
+    so far is loaded for that one, and the remaining actions run on that frame.
+    Returns the row count, a preview, the pipeline and per-action timings and row
+    counts (plus the outlier counts of an "outliers" action).
+    """
+    column_stats = profile_cache.get(dataset_id, dataset_fingerprint(dataset_id), None, "columns")
+    pipeline = load_pipeline(dataset_id)
+    saved_steps = len(pipeline.steps)
+    chunked = _use_chunked(dataset_id)
+    df = None if chunked else load_dataset(dataset_id)
+    rows = dataset_num_rows(dataset_id) if chunked else df.shape[0]
+
+    report, touched, applied = [], set(), []
+    for action in actions:
+        start = time.perf_counter()
+        rows_before = rows
+        n_steps = len(pipeline.steps)
+        options = {"method": outlier_method} if action == "outliers" else {}
+        # (categorical_columns: as passed by the frontend; when empty only the target is encoded)
+        if df is None and chunkable(action, outlier_method):
+            step = fit_step_chunked(pipeline, action, lambda: iter_dataset_batches(dataset_id, pipeline=pipeline),
+                                    target_column, categorical_columns, **options)
+            # 🧩 Columns the fitted step rewrites; cached statistics of the others stay valid
+            action_touched = step_columns(step) if step else []
+        else:
+            if df is None:
+                df = pipeline.transform(load_dataset(dataset_id), start=saved_steps)
+            # 🧩 Columns this action can rewrite; cached statistics of the others stay valid
+            action_touched = touched_columns(action, df, target_column, categorical_columns)
+            df = pipeline.fit_step(action, df, target_column, categorical_columns, **options)
+        entry = {"action": action, "applied": len(pipeline.steps) > n_steps}
+        if entry["applied"]:  # (nothing to do: no step is recorded)
+            rows = pipeline.rows
+            applied.append(action)
+            touched.update(action_touched or [])
+        entry.update({"rows_before": rows_before, "rows_after": rows, "rows_removed": rows_before - rows})
+        if entry["applied"] and action == "outliers":
+            entry["outlier_method"] = outlier_method
+            # Per column for bounds; the isolation forest flags whole rows
+            entry["outlier_counts"] = pipeline.steps[-1]["params"].get("counts", {"rows": entry["rows_removed"]})
+        entry["time_s"] = round(time.perf_counter() - start, 4)
+        report.append(entry)
+
+    if applied:
+        save_pipeline(dataset_id, pipeline, df)
+    preview = df.head() if df is not None else dataset_head(dataset_id)
+
+    if applied:
+        # Carry the still-valid column statistics over, so the next profile only recomputes the rest
+        dtypes = {col: str(dtype) for col, dtype in (df if df is not None else preview).dtypes.items()}
+        column_stats = carry_forward(column_stats, sorted(touched), rows, dtypes,
+                                     preserves_correlation=all(a in CORRELATION_PRESERVING_ACTIONS for a in applied))
+        if column_stats is not None:
+            profile_cache.put(dataset_id, dataset_fingerprint(dataset_id), None, "columns", column_stats)
+    return rows, preview, pipeline, report
+
+
+def _preview_actions(dataset_id: str, target_column: str, actions: list[str], categorical_columns: list[str],
+                     outlier_method: str = "iqr") -> dict:
+    """
+    What `actions` would do, estimated on a stratified sample of the dataset
+    (PREVIEW_SAMPLE_ROWS rows, cached until the dataset changes): the actions are
+    fitted on the sample with a copy of the pipeline and nothing is persisted.
+    Returns the sample's preview and per-action row counts, the row count estimated
+    for the whole dataset, and the before/after statistics of every column that changed.
+    """
+    sample = dataset_sample(dataset_id, PREVIEW_SAMPLE_ROWS, stratify=target_column)
+    total_rows = dataset_num_rows(dataset_id)
+    pipeline = load_pipeline(dataset_id).copy()
+
+    df, report, touched = sample, [], set()
+    for action in actions:
+        start = time.perf_counter()
+        rows_before = df.shape[0]
+        n_steps = len(pipeline.steps)
+        options = {"method": outlier_method} if action == "outliers" else {}
+        action_touched = touched_columns(action, df, target_column, categorical_columns)
+        df = pipeline.fit_step(action, df, target_column, categorical_columns, **options)
+        entry = {"action": action, "applied": len(pipeline.steps) > n_steps,
+                 "rows_before": rows_before, "rows_after": df.shape[0], "rows_removed": rows_before - df.shape[0]}
+        if entry["applied"]:
+            # Dropping rows changes the statistics of every column
+            touched.update(df.columns if action in ROW_FILTER_ACTIONS else action_touched or [])
+            if action == "outliers":
+                entry["outlier_method"] = outlier_method
+                entry["outlier_counts"] = pipeline.steps[-1]["params"].get("counts", {"rows": entry["rows_removed"]})
+        entry["time_s"] = round(time.perf_counter() - start, 4)
+        report.append(entry)
+
+    changed = {}
+    for col in sorted(touched, key=str):
+        if col in sample.columns and col in df.columns:
+            before, after = DescribeEngine.describe_column(sample[col])[0], DescribeEngine.describe_column(df[col])[0]
+            if before != after:
+                changed[col] = {"before": before, "after": after}
+    return {
+        "sample_rows": sample.shape[0],
+        "total_rows": total_rows,
+        # The sample's surviving fraction, scaled to the dataset (exact when the sample is the whole dataset)
+        "estimated_rows_after_processing": round(total_rows * df.shape[0] / sample.shape[0]) if sample.shape[0] else 0,
+        "actions": report,
+        "changed_statistics": changed,
+        "preview": frame_records(df.head()),
+    }
+
+
+def _validate(dataset_id: str, target_column: str, actions: list[str], outlier_method: str = "iqr") -> None:
+    # Check dataset exists
+    if not dataset_exists(dataset_id):
+        raise HTTPException(status_code=404, detail="Dataset not found.")
     # Validate target column
-    if req.target_column not in df.columns:
+    if target_column not in dataset_columns(dataset_id):
         raise HTTPException(status_code=400, detail="Invalid target column.")
+    if not actions or any(action not in STEPS for action in actions):
+        raise HTTPException(status_code=400, detail="Invalid action.")
+    if outlier_method not in OUTLIER_METHODS:
+        raise HTTPException(status_code=400, detail=f"Invalid outlier method. Use one of: {', '.join(OUTLIER_METHODS)}.")
 
-    try:
-        if req.action == "missing":
-            # Apply missing value handling
-            df = handle_missing(df, "Fill with Mean (Numeric Only)", req.categorical_columns)
-            df = handle_missing(df, "Fill with Mode (Categorical Only)", req.categorical_columns)
-            
-        elif req.action == "scaling":
-             # Apply scaling ONLY
-             df = scale_data(df, req.target_column)
-
-        elif req.action == "encoding":
-             # Apply encoding ONLY
-             # Note: We need categorical columns. 
-             # If req.categorical_columns is empty, we should probably auto-detect them or assume frontend passed them.
-             # For now, relying on request. If empty, it might not do anything unless target needs encoding.
-             df = encode_data(df, req.categorical_columns, req.target_column)
-
-        elif req.action == "outliers":
-            df = remove_outliers_iqr(df, req.target_column)
 
-        else:
-             raise HTTPException(status_code=400, detail="Invalid action.")
+@router.post("/")
+def apply_preprocessing(req: PreprocessRequest):
+    _validate(req.dataset_id, req.target_column, [req.action], req.outlier_method)
 
-        # Save updated dataset (overwrite)
-        df.to_csv(file_path, index=False)
+    if req.preview:
+        try:
+            result = _preview_actions(req.dataset_id, req.target_column, [req.action],
+                                      req.categorical_columns, req.outlier_method)
+            return {"message": f"Preview of '{req.action}' on a sample; nothing was saved.", "mode": "preview", **result}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
-        return {
+    try:
+        rows, preview, pipeline, report = _apply_actions(req.dataset_id, req.target_column, [req.action],
+                                                         req.categorical_columns, req.outlier_method)
+        response = {
             "message": f"Action '{req.action}' applied successfully.",
-            "rows_after_processing": df.shape[0],
-            "preview": df.head().to_dict(orient="records")
+            "rows_after_processing": rows,
+            "pipeline": pipeline.actions,
+            "preview": frame_records(preview)
         }
+        if "outlier_counts" in report[0]:
+            response["outlier_counts"] = report[0]["outlier_counts"]
+        return response
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/batch")
+def apply_preprocessing_batch(req: BatchPreprocessRequest):
+    """
+    Apply an ordered list of actions in one request: the dataset is loaded once,
+    the actions run back to back on the same frame and the result is persisted once.
+    With `preview`, the actions are only estimated on a sample (see _preview_actions).
+    """
+    _validate(req.dataset_id, req.target_column, req.actions, req.outlier_method)
+
+    if req.preview:
+        try:
+            start = time.perf_counter()
+            result = _preview_actions(req.dataset_id, req.target_column, req.actions,
+                                      req.categorical_columns, req.outlier_method)
+            return {"message": f"Preview of {', '.join(req.actions)} on a sample; nothing was saved.", "mode": "preview",
+                    "total_time_s": round(time.perf_counter() - start, 4), **result}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    try:
+        start = time.perf_counter()
+        rows, preview, pipeline, report = _apply_actions(req.dataset_id, req.target_column, req.actions,
+                                                         req.categorical_columns, req.outlier_method)
+        return {
+            "message": f"Actions {', '.join(req.actions)} applied successfully.",
+            "rows_after_processing": rows,
+            "actions": report,
+            "total_time_s": round(time.perf_counter() - start, 4),
+            "pipeline": pipeline.actions,
+            "preview": frame_records(preview)
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ---------------------------------------------------------
+# ↩️ Version history: every applied action is a version of the dataset
+# (services/version_log.py); undo, redo and checkout only move the current version
+# ---------------------------------------------------------
+
+def _move_to(dataset_id: str, version: int, message: str) -> dict:
+    log = set_current_version(dataset_id, version)
+    return {
+        "message": message,
+        "version": log.head,
+        "rows_after_processing": dataset_num_rows(dataset_id),
+        "pipeline": log.pipeline().actions,
+        "preview": frame_records(dataset_head(dataset_id)),
+    }
+
+
+@router.get("/versions/{dataset_id}")
+def list_versions(dataset_id: str):
+    if not dataset_exists(dataset_id):
+        raise HTTPException(status_code=404, detail="Dataset not found.")
+    return dataset_versions(dataset_id)
+
+
+@router.post("/undo")
+def undo_preprocessing(req: VersionRequest):
+    if not dataset_exists(req.dataset_id):
+        raise HTTPException(status_code=404, detail="Dataset not found.")
+    target = load_version_log(req.dataset_id).undo_target()
+    if target is None:
+        raise HTTPException(status_code=400, detail="Nothing to undo.")
+    return _move_to(req.dataset_id, target, "Last action undone.")
+
+
+@router.post("/redo")
+def redo_preprocessing(req: VersionRequest):
+    if not dataset_exists(req.dataset_id):
+        raise HTTPException(status_code=404, detail="Dataset not found.")
+    target = load_version_log(req.dataset_id).redo_target()
+    if target is None:
+        raise HTTPException(status_code=400, detail="Nothing to redo.")
+    return _move_to(req.dataset_id, target, "Action redone.")
+
+
+@router.post("/checkout")
+def checkout_version(req: VersionRequest):
+    if not dataset_exists(req.dataset_id):
+        raise HTTPException(status_code=404, detail="Dataset not found.")
+    if req.version is None or req.version not in load_version_log(req.dataset_id):
+        raise HTTPException(status_code=404, detail="Version not found.")
+    return _move_to(req.dataset_id, req.version, f"Version {req.version} is now current.")
+
+
+@router.get("/versions/{dataset_id}/compare")
+def compare_dataset_versions(dataset_id: str, a: int, b: int, statistics: bool = False):
+    """
+    How versions `a` and `b` differ: the actions each has beyond their common
+    ancestor and the columns they rewrote, read from the log. With `statistics`,
+    also the before/after describe statistics of those columns (of every column
+    when rows were filtered), computed on the two versions' data.
+    """
+    if not dataset_exists(dataset_id):
+        raise HTTPException(status_code=404, detail="Dataset not found.")
+    try:
+        result = compare_versions(dataset_id, a, b)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Version not found.")
+    if not statistics:
+        return result
+
+    try:
+        columns = dataset_columns(dataset_id) if result["rows_differ"] else result["changed_columns"]
+        df_a, df_b = load_dataset(dataset_id, columns, version=a), load_dataset(dataset_id, columns, version=b)
+        changed = {}
+        for col in columns:
+            stats_a, stats_b = DescribeEngine.describe_column(df_a[col])[0], DescribeEngine.describe_column(df_b[col])[0]
+            if stats_a != stats_b:
+                changed[col] = {"a": stats_a, "b": stats_b}
+        result["changed_statistics"] = changed
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,70 +1,292 @@
 # routes/profiling.py
 
-from fastapi import APIRouter, HTTPException
-import pandas as pd
 import os
+import numpy as np
+import pandas as pd
+from fastapi import APIRouter, HTTPException, Query
 
-# Import your existing profiling utility
-from utils.profiling.profile_summary import get_column_info
 from ml_engine.meta_feature_extractor import MetaFeatureExtractor
+from ml_engine.correlation_engine import CorrelationEngine
 from ml_engine.preprocessing_suggester import PreprocessingSuggester
+from ml_engine.streaming_profiler import profile_stream
+from ml_engine.parallel_profiler import merge_summaries, start_column_summaries
+from services.dataset_store import (
+    columnar_path, dataset_columns, dataset_exists, dataset_fingerprint, dataset_head, dataset_num_rows,
+    iter_dataset_batches, load_dataset, load_pipeline,
+)
+from services.profile_cache import profile_cache
+from utils.json_sanitizer import FastJSONResponse, frame_records, sanitize_for_json
 
 router = APIRouter(
     prefix="/profiling",
     tags=["Profiling"]
 )
 
-# 📁 Locate stored datasets
-BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-DATASET_DIR = os.path.join(BASE_DIR, "storage", "datasets")
+# 📏 In "auto" mode, stored datasets larger than this are profiled out-of-core
+STREAMING_PROFILE_MIN_MB = int(os.getenv("STREAMING_PROFILE_MIN_MB", "256"))
+PROFILING_MODES = ("auto", "full", "streaming")
 
+# 🪟 Column window of /profiling/{id}/columns: default and largest page size
+PROFILE_PAGE_COLUMNS = int(os.getenv("PROFILE_PAGE_COLUMNS", "50"))
+PROFILE_PAGE_MAX_COLUMNS = int(os.getenv("PROFILE_PAGE_MAX_COLUMNS", "500"))
+
+
+def _use_streaming(dataset_id: str, mode: str) -> bool:
+    if mode != "auto":
+        return mode == "streaming"
+    path = columnar_path(dataset_id)
+    return os.path.exists(path) and os.path.getsize(path) > STREAMING_PROFILE_MIN_MB * 1024 * 1024
+
+
+def _streaming_profile(dataset_id: str, target_column: str = None) -> dict:
+    """
+    Profile the dataset batch by batch without loading it.
+    Same response as the in-memory path; sketch-based values are listed under "approximate".
+    """
+    result = profile_stream(
+        iter_dataset_batches(dataset_id), target_column, total_rows=dataset_num_rows(dataset_id)
+    )
+    result["preprocessing_suggestions"] = PreprocessingSuggester.get_suggestions(None, result["meta_features"])
+    result["profiling_mode"] = "streaming"
+    return result
+
+
+def _column_stats(dataset_id: str, fingerprint: dict, n_rows: int) -> dict:
+    """Column statistics cached for this dataset state (the "columns" kind), as a private copy."""
+    cached = profile_cache.get(dataset_id, fingerprint, None, "columns") or {"correlation": None}
+    # Copies: the cached entry is shared with other requests
+    return {
+        "rows": n_rows,
+        "columns": dict(cached.get("columns", {})),
+        "class_counts": dict(cached.get("class_counts", {})),
+        "correlation": cached["correlation"],
+    }
+
+
+def _full_profile(dataset_id: str, fingerprint: dict, target_column: str = None) -> dict:
+    """
+    In-memory profile, built from per-column statistics (exact, except quartiles of
+    very long columns, which are sampled and listed under "approximate").
+    Column entries cached for this dataset state (kept across preprocess actions for the
+    columns they did not touch, see incremental_profiler) are reused; only the remaining
+    columns are loaded and summarized.
+    """
+    columns = dataset_columns(dataset_id)
+    n_rows = dataset_num_rows(dataset_id)
+    stats = _column_stats(dataset_id, fingerprint, n_rows)
+
+    # Validate target_column exists in dataframe
+    if target_column and target_column not in columns:
+        print(f"Warning: target_column '{target_column}' not found in dataset. Ignoring.")
+        target_column = None
+
+    # Load dataset (only the stale columns when the rest are cached)
+    stale = [col for col in columns if col not in stats["columns"]]
+    df = load_dataset(dataset_id) if len(stale) == len(columns) else load_dataset(dataset_id, columns=stale)
+    pending = start_column_summaries(df, columnar_path(dataset_id), pipeline=load_pipeline(dataset_id))
+
+    # Average correlation, while the column summaries are being computed
+    stale_numeric = list(df.select_dtypes(include=[np.number]).columns)
+    numeric_cols = [
+        col for col in columns
+        if col in stale_numeric or (col in stats["columns"] and stats["columns"][col]["moments"] is not None)
+    ]
+    correlation = stats["correlation"]
+    if correlation is None or correlation["numeric_columns"] != numeric_cols:
+        numeric_df = df[numeric_cols] if len(stale_numeric) == len(numeric_cols) else load_dataset(dataset_id, columns=numeric_cols)
+        avg_corr = MetaFeatureExtractor.average_correlation(numeric_df) if numeric_cols else 0
+        correlation = {"numeric_columns": numeric_cols, "value": avg_corr}
+
+    # Target class counts
+    if target_column and target_column not in stats["class_counts"]:
+        target = df[target_column] if target_column in df.columns else load_dataset(dataset_id, columns=[target_column])[target_column]
+        counts = MetaFeatureExtractor.target_class_counts(target)
+        stats["class_counts"][target_column] = None if counts is None else [int(c) for c in counts]
+    class_counts = stats["class_counts"].get(target_column) if target_column else None
+
+    stats["columns"].update(sanitize_for_json(pending()))
+    stats["correlation"] = sanitize_for_json(correlation)
+    profile_cache.put(dataset_id, fingerprint, None, "columns", stats)
+
+    summary = merge_summaries(stats["columns"], columns)
+    meta_features = MetaFeatureExtractor.from_summaries(
+        n_instances=n_rows,
+        n_features=len(columns),
+        n_categorical=len(columns) - len(numeric_cols),
+        n_missing_values=summary["n_missing_values"],
+        moments=summary["moments"],
+        avg_corr=correlation["value"],
+        class_counts=None if class_counts is None else pd.Series(class_counts),
+    )
+
+    # Very wide tables get a sampled correlation estimate
+    n_numeric = meta_features["n_continuous"]
+    approximate_meta = [] if n_numeric < 2 or CorrelationEngine.is_exact(n_rows, n_numeric) else ["avg_feature_correlation"]
+
+    # Missing values summary (counted during meta-feature extraction)
+    total_missing = meta_features["n_missing_values"]
+
+    # Generate suggestions
+    suggestions = PreprocessingSuggester.get_suggestions(None, meta_features)
+
+    preview = df.head() if len(stale) == len(columns) else dataset_head(dataset_id)
+    return {
+        "rows": n_rows,
+        "columns": len(columns),
+        "total_missing_values": total_missing,
+        "column_info": summary["column_info"],
+        "descriptive_statistics": summary["descriptive_statistics"],
+        "meta_features": meta_features,
+        "preprocessing_suggestions": suggestions,
+        "preview": frame_records(preview),
+        "approximate": {"descriptive_statistics": summary["approximate"], "meta_features": approximate_meta},
+        "profiling_mode": "full",
+    }
 
-@router.get("/{dataset_id}")
-def get_profiling_info(dataset_id: str, target_column: str = None):
-    file_path = os.path.join(DATASET_DIR, f"{dataset_id}.csv")
 
+@router.get("/{dataset_id}")
+def get_profiling_info(dataset_id: str, target_column: str = None, mode: str = "auto"):
     # Check if dataset exists
-    if not os.path.exists(file_path):
+    if not dataset_exists(dataset_id):
         raise HTTPException(status_code=404, detail="Dataset not found.")
+    if mode not in PROFILING_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid mode. Use one of: {', '.join(PROFILING_MODES)}.")
 
     try:
-        # Load dataset
-        df = pd.read_csv(file_path)
+        # ⚡ Served from the profile cache when this exact dataset state was profiled before
+        fingerprint = dataset_fingerprint(dataset_id)
+        streaming = _use_streaming(dataset_id, mode)
+        kind = "profile-streaming" if streaming else "profile-full"
+        cached = profile_cache.get(dataset_id, fingerprint, target_column, kind)
+        # (returned as a response directly: already JSON-ready, so FastAPI's encoder pass is skipped)
+        if cached is not None:
+            return FastJSONResponse(cached)
 
-        # Column info (using your existing utility)
-        column_info = get_column_info(df).to_dict(orient="records")
+        # 🌊 Large datasets: chunked profiling with mergeable sketches
+        if streaming:
+            response_data = sanitize_for_json(_streaming_profile(dataset_id, target_column))
+            profile_cache.put(dataset_id, fingerprint, target_column, kind, response_data)
+            return FastJSONResponse(response_data)
 
-        # Descriptive statistics
-        descriptive_stats = df.describe(include="all").fillna("").to_dict()
+        response_data = _full_profile(dataset_id, fingerprint, target_column)
+        
+        response_data = sanitize_for_json(response_data)
+        profile_cache.put(dataset_id, fingerprint, target_column, kind, response_data)
+        return FastJSONResponse(response_data)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
-        # Missing values summary
-        total_missing = int(df.isnull().sum().sum())
 
-        # Meta-features
-        # Validate target_column exists in dataframe
-        if target_column and target_column not in df.columns:
-            print(f"Warning: target_column '{target_column}' not found in dataset. Ignoring.")
-            target_column = None
+@router.get("/{dataset_id}/summary")
+def get_profiling_summary(dataset_id: str, target_column: str = None, mode: str = "auto"):
+    """
+    Dataset-level part of the profile only: shape, missing values, meta-features and
+    preprocessing suggestions, without any per-column statistics. Cheap to render
+    however wide the dataset is; the columns are paged in with /{dataset_id}/columns.
+    """
+    if not dataset_exists(dataset_id):
+        raise HTTPException(status_code=404, detail="Dataset not found.")
+    if mode not in PROFILING_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid mode. Use one of: {', '.join(PROFILING_MODES)}.")
 
-        meta_features = MetaFeatureExtractor.extract(df, target_column)
-        
-        # Generate suggestions
-        suggestions = PreprocessingSuggester.get_suggestions(df, meta_features)
+    try:
+        fingerprint = dataset_fingerprint(dataset_id)
+        columns = dataset_columns(dataset_id)
+        meta_features, approximate_meta = None, []
+        # ⚡ Any earlier profile of this dataset state already holds the meta-features
+        for kind in ("meta", "profile-full", "profile-streaming"):
+            cached = profile_cache.get(dataset_id, fingerprint, target_column, kind)
+            if cached is not None:
+                meta_features = cached["meta_features"]
+                approximate_meta = cached.get("approximate", {}).get("meta_features", [])
+                break
 
-        from utils.json_sanitizer import sanitize_for_json
+        if meta_features is None:
+            if _use_streaming(dataset_id, mode):
+                # 🌊 Too large to load: the streaming profile computes them (and is cached whole)
+                profile = sanitize_for_json(_streaming_profile(dataset_id, target_column))
+                profile_cache.put(dataset_id, fingerprint, target_column, "profile-streaming", profile)
+                meta_features = profile["meta_features"]
+                approximate_meta = profile["approximate"]["meta_features"]
+            else:
+                df = load_dataset(dataset_id)
+                extract_target = target_column if target_column in df.columns else None
+                meta_features = sanitize_for_json(MetaFeatureExtractor.extract(df, extract_target))
+                n_numeric = meta_features["n_continuous"]
+                if n_numeric >= 2 and not CorrelationEngine.is_exact(len(df), n_numeric):
+                    approximate_meta = ["avg_feature_correlation"]
+                profile_cache.put(dataset_id, fingerprint, target_column, "meta",
+                                  {"meta_features": meta_features, "approximate": {"meta_features": approximate_meta}})
 
-        response_data = {
-            "rows": df.shape[0],
-            "columns": df.shape[1],
-            "total_missing_values": total_missing,
-            "column_info": column_info,
-            "descriptive_statistics": descriptive_stats,
+        return FastJSONResponse({
+            "rows": meta_features["n_instances"],
+            "columns": len(columns),
+            "column_names": columns,
+            "total_missing_values": meta_features["n_missing_values"],
             "meta_features": meta_features,
-            "preprocessing_suggestions": suggestions,
-            "preview": df.head().to_dict(orient="records")
-        }
-        
-        return sanitize_for_json(response_data)
+            "preprocessing_suggestions": PreprocessingSuggester.get_suggestions(None, meta_features),
+            "approximate": {"meta_features": approximate_meta},
+        })
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+
+@router.get("/{dataset_id}/columns")
+def get_column_profiles(dataset_id: str, offset: int = 0, limit: int = PROFILE_PAGE_COLUMNS,
+                        columns: list[str] = Query(None)):
+    """
+    `column_info`, `descriptive_statistics` and `preview` for a window of columns:
+    either `limit` columns starting at `offset` (in dataset order) or an explicit
+    `columns` list. Only the window's columns are loaded; their statistics are
+    shared with the full profile through the column cache.
+    """
+    if not dataset_exists(dataset_id):
+        raise HTTPException(status_code=404, detail="Dataset not found.")
+    if offset < 0 or not 0 < limit <= PROFILE_PAGE_MAX_COLUMNS:
+        raise HTTPException(status_code=400,
+                            detail=f"offset must be >= 0 and limit between 1 and {PROFILE_PAGE_MAX_COLUMNS}.")
+
+    all_columns = dataset_columns(dataset_id)
+    if columns:
+        known = set(all_columns)
+        unknown = [col for col in columns if col not in known]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(unknown)}")
+        if len(columns) > PROFILE_PAGE_MAX_COLUMNS:
+            raise HTTPException(status_code=400, detail=f"At most {PROFILE_PAGE_MAX_COLUMNS} columns per request.")
+        window = list(dict.fromkeys(columns))
+    else:
+        window = all_columns[offset:offset + limit]
+
+    try:
+        fingerprint = dataset_fingerprint(dataset_id)
+        n_rows = dataset_num_rows(dataset_id)
+        stats = _column_stats(dataset_id, fingerprint, n_rows)
+
+        # Summarize only the window's columns that are not cached yet
+        stale = [col for col in window if col not in stats["columns"]]
+        if stale:
+            df = load_dataset(dataset_id, columns=stale)
+            pending = start_column_summaries(df, columnar_path(dataset_id), pipeline=load_pipeline(dataset_id))
+            stats["columns"].update(sanitize_for_json(pending()))
+            profile_cache.put(dataset_id, fingerprint, None, "columns", stats)
+
+        summary = merge_summaries(stats["columns"], window)
+        return FastJSONResponse({
+            "rows": n_rows,
+            "columns": len(all_columns),
+            "offset": None if columns else offset,
+            "limit": None if columns else limit,
+            "column_names": window,
+            "column_info": summary["column_info"],
+            "descriptive_statistics": summary["descriptive_statistics"],
+            "preview": frame_records(dataset_head(dataset_id, columns=window)),
+            "approximate": {"descriptive_statistics": summary["approximate"]},
+        })
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -6,12 +6,15 @@ import random
 import numpy as np
 import pandas as pd
 import os
-import json
 
 # Import your existing ML logic
 from logic.selection.algorithm_recommender import recommend_algorithm
 from logic.selection.imbalance_checker import check_class_imbalance
 from logic.selection.imbalance_checker import check_class_imbalance
+from ml_engine.landmarker import Landmarker
+from services.dataset_store import dataset_exists, dataset_fingerprint, load_dataset
+from services.profile_cache import profile_cache
+from utils.json_sanitizer import dump_json, load_json
 
 
 SHAP_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "storage", "shap")
@@ -73,12 +76,10 @@ class RecommendationRequest(BaseModel):
 
 @router.post("/")
 def get_recommendation(req: RecommendationRequest):
-    file_path = os.path.join(DATASET_DIR, f"{req.dataset_id}.csv")
-
-    if not os.path.exists(file_path):
+    if not dataset_exists(req.dataset_id):
         raise HTTPException(status_code=404, detail="Dataset not found.")
 
-    df = pd.read_csv(file_path)
+    df = load_dataset(req.dataset_id)
 
     if req.target_column not in df.columns:
         raise HTTPException(status_code=400, detail="Invalid target column.")
@@ -99,13 +100,23 @@ def get_recommendation(req: RecommendationRequest):
     except Exception:
         imbalance_ratio = 1.0
 
+    # -------------------------
+    # Landmarking: quick proxy models under a time budget (cached per dataset state)
+    # -------------------------
+    fingerprint = dataset_fingerprint(req.dataset_id)
+    landmarks = profile_cache.get(req.dataset_id, fingerprint, req.target_column, "landmarks")
+    if landmarks is None:
+        landmarks = Landmarker.extract(df, req.target_column)
+        profile_cache.put(req.dataset_id, fingerprint, req.target_column, "landmarks", landmarks)
+
     # -------------------------
     # Meta-learning recommendation (real logic)
     # -------------------------
     results = recommend_algorithm(
         df,
         req.target_column,
-        imbalance_ratio
+        imbalance_ratio,
+        landmarks=landmarks
     )
 
     # -------------------------
@@ -114,7 +125,9 @@ def get_recommendation(req: RecommendationRequest):
     # -------------------------
     
     # helper to check if regression or classification
-    is_regression = df[req.target_column].dtype in [np.float64, np.float32] or (df[req.target_column].nunique() > 20 and df[req.target_column].dtype in [np.int64, np.int32])
+    # (dtype checks cover the downcast int8/int16/float32 columns from the dataset store)
+    target_dtype = df[req.target_column].dtype
+    is_regression = pd.api.types.is_float_dtype(target_dtype) or (df[req.target_column].nunique() > 20 and pd.api.types.is_integer_dtype(target_dtype))
 
     # 1. Real Feature Importance (Random Forest Proxy)
     # Using specific transformer logic or simple encoding for this quick step
@@ -169,8 +182,7 @@ def get_recommendation(req: RecommendationRequest):
     # --- SAVE to JSON for Explainability Page ---
     try:
         shap_path = os.path.join(SHAP_DIR, f"{req.dataset_id}_shap.json")
-        with open(shap_path, "w") as f:
-            json.dump(feature_importance, f)
+        dump_json(feature_importance, shap_path)
     except Exception as e:
         print(f"Failed to save SHAP data: {e}")
 
@@ -238,14 +250,14 @@ def get_recommendation(req: RecommendationRequest):
         "feature_importance": feature_importance,
         "simple_explanation": results["simple_explanation"],
         "reason_parts": results["reason_parts"],
+        "landmarks": landmarks,
         "target_column": req.target_column
     }
 
     # --- SAVE RESULTS PERSISTENTLY ---
     try:
         results_path = os.path.join(AUTOML_DIR, f"{req.dataset_id}_results.json")
-        with open(results_path, "w") as f:
-            json.dump(response_data, f)
+        dump_json(response_data, results_path)
     except Exception as e:
         print(f"Failed to save AutoML results: {e}")
 
@@ -263,27 +275,25 @@ def get_explanation(dataset_id: str):
     automl_path = os.path.join(AUTOML_DIR, f"{dataset_id}_results.json")
     if os.path.exists(automl_path):
         try:
-            with open(automl_path, "r") as f:
-                data = json.load(f)
-                return {
-                    "feature_importance": data.get("feature_importance", []),
-                    "reason_parts": data.get("reason_parts", []),
-                    "selection_reason": data.get("selection_reason", ""),
-                    "top_algorithm": data.get("best_algorithm", "N/A")
-                }
+            data = load_json(automl_path)
+            return {
+                "feature_importance": data.get("feature_importance", []),
+                "reason_parts": data.get("reason_parts", []),
+                "selection_reason": data.get("selection_reason", ""),
+                "top_algorithm": data.get("best_algorithm", "N/A")
+            }
         except Exception as e:
             print(f"Error loading automl results: {e}")
 
     # 2. Fallback to standalone SHAP (from Recommendation/Exploratory phase)
     shap_path = os.path.join(SHAP_DIR, f"{dataset_id}_shap.json")
     if os.path.exists(shap_path):
-        with open(shap_path, "r") as f:
-            # Standalone SHAP usually just has the list
-            return {
-                "feature_importance": json.load(f),
-                "reason_parts": ["Analysis based on preliminary feature scan."],
-                "selection_reason": "Preliminary analysis."
-            }
+        # Standalone SHAP usually just has the list
+        return {
+            "feature_importance": load_json(shap_path),
+            "reason_parts": ["Analysis based on preliminary feature scan."],
+            "selection_reason": "Preliminary analysis."
+        }
 
     # 3. No data
     return {
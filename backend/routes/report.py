@@ -2,12 +2,14 @@
 
 import os
 import json
-import pandas as pd
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 
 from services.report_generator import ReportGenerator
 from ml_engine.meta_feature_extractor import MetaFeatureExtractor
+from utils.json_sanitizer import sanitize_for_json
+from services.dataset_store import dataset_exists, dataset_fingerprint, load_dataset
+from services.profile_cache import profile_cache
 
 router = APIRouter(
     prefix="/report",
@@ -15,7 +17,6 @@ router = APIRouter(
 )
 
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-DATASET_DIR = os.path.join(BASE_DIR, "storage", "datasets")
 AUTOML_DIR = os.path.join(BASE_DIR, "storage", "automl")
 
 
@@ -34,27 +35,39 @@ def _load_automl_results(dataset_id: str) -> dict:
         raise HTTPException(status_code=500, detail=f"Failed to read results: {e}")
 
 
+def _meta_features(dataset_id: str, target_col: str = None) -> dict:
+    """
+    Meta-features for the current dataset state. Reuses whatever profiling already
+    computed for this target; the dataset is only loaded when nothing is cached.
+    """
+    fingerprint = dataset_fingerprint(dataset_id)
+    for kind in ("meta", "profile-full", "profile-streaming"):
+        cached = profile_cache.get(dataset_id, fingerprint, target_col, kind)
+        if cached is not None:
+            return cached["meta_features"]
+
+    df = load_dataset(dataset_id)
+    # Extract meta-features (handles target_column being optional)
+    extract_target = target_col if target_col in df.columns else None
+    meta_features = sanitize_for_json(MetaFeatureExtractor.extract(df, extract_target))
+    profile_cache.put(dataset_id, fingerprint, target_col, "meta", {"meta_features": meta_features})
+    return meta_features
+
+
 def _assemble_report_data(dataset_id: str, automl_data: dict) -> dict:
     """
     Assemble the full data dict expected by ReportGenerator.
     Merges AutoML results with live dataset metadata.
     """
-    # Load dataset for shape + meta features
-    dataset_path = os.path.join(DATASET_DIR, f"{dataset_id}.csv")
-    df = None
+    # Dataset shape + meta features (cached with the profiling results when possible)
     rows, columns = 0, 0
     meta_features = {}
 
-    if os.path.exists(dataset_path):
+    if dataset_exists(dataset_id):
         try:
-            df = pd.read_csv(dataset_path)
-            rows = df.shape[0]
-            columns = df.shape[1]
-            # Extract meta-features (handles target_column being optional)
-            target_col = automl_data.get("target_column")
-            if target_col and target_col not in df.columns:
-                target_col = None
-            meta_features = MetaFeatureExtractor.extract(df, target_col)
+            meta_features = _meta_features(dataset_id, automl_data.get("target_column"))
+            rows = meta_features.get("n_instances", 0)
+            columns = meta_features.get("n_features", 0)
         except Exception as e:
             print(f"Warning: Could not load dataset for report: {e}")
 
@@ -85,6 +98,8 @@ def _assemble_report_data(dataset_id: str, automl_data: dict) -> dict:
 
     reason_parts = automl_data.get("reason_parts", [])
     preprocessing_tips = automl_data.get("preprocessing_tips", [])
+    # Successive-halving schedule (None when the candidates were not raced)
+    racing = automl_data.get("racing")
 
     return {
         "dataset_name": dataset_name,
@@ -101,6 +116,7 @@ def _assemble_report_data(dataset_id: str, automl_data: dict) -> dict:
             "best_algorithm": best_algorithm,
             "reason_parts": reason_parts,
             "preprocessing_tips": preprocessing_tips,
+            "racing": racing,
         },
     }
 
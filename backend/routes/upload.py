@@ -1,70 +1,98 @@
 # routes/upload.py
 
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request
 import pandas as pd
-import numpy as np
 import os
 import uuid
+import shutil
+import tempfile
 
 # Import from your existing ML logic
 from logic.suggestions.target_suggester import suggest_target_column
+from services.csv_stream import StreamingCSVProfile
+from services.dataset_store import csv_path, columnar_path, schema_path, fingerprint_path, ingest_csv
+from utils.json_sanitizer import frame_records
 
 router = APIRouter(
     prefix="/upload",
     tags=["Upload"]
 )
 
-# 📁 Directory to store uploaded datasets
-BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-DATASET_DIR = os.path.join(BASE_DIR, "storage", "datasets")
-os.makedirs(DATASET_DIR, exist_ok=True)
+# Bytes read from the request per iteration; peak memory is a small multiple of this
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
 
 
-@router.post("/")
-async def upload_csv(file: UploadFile = File(...)):
-    # Validate file type
-    if not file.filename.endswith(".csv"):
-        raise HTTPException(status_code=400, detail="Only CSV files are allowed.")
-
-    # Generate unique dataset ID
+async def _ingest_stream(chunks) -> dict:
+    """
+    Write an async stream of CSV bytes to disk while profiling it incrementally,
+    then convert it into the columnar store. Nothing holds the whole file in memory,
+    and the file is parsed once: the parsed chunks are spooled to disk next to it.
+    """
     dataset_id = str(uuid.uuid4())
-    file_path = os.path.join(DATASET_DIR, f"{dataset_id}.csv")
+    file_path = csv_path(dataset_id)
+    spool_dir = tempfile.mkdtemp(prefix=f"{dataset_id}_", dir=os.path.dirname(file_path))
+    profile = StreamingCSVProfile(spool_dir=spool_dir)
 
-    # Save file
-    contents = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(contents)
-
-    # Load into pandas
     try:
-        df = pd.read_csv(file_path)
+        with open(file_path, "wb") as f:
+            async for chunk in chunks:
+                f.write(chunk)
+                profile.feed(chunk)
+        profile.close()
+
+        # Convert once into the typed columnar store; every other route reads that copy
+        # (numeric columns downcast, low-cardinality strings stored as categories)
+        ingest_csv(dataset_id, profile.dtypes, schema=profile.compact_schema(), batches=profile.spooled_batches())
     except Exception as e:
         # cleanup if failed
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        for path in (file_path, columnar_path(dataset_id), schema_path(dataset_id), fingerprint_path(dataset_id)):
+            if os.path.exists(path):
+                os.remove(path)
         raise HTTPException(status_code=400, detail=f"Invalid CSV file: {str(e)}")
+    finally:
+        shutil.rmtree(spool_dir, ignore_errors=True)
 
-    # Auto-detect categorical columns
-    categorical_cols = df.select_dtypes(
-        include=["object", "category"]
-    ).columns.tolist()
-
-    # Suggest target column
-    suggested_target = suggest_target_column(df)
+    # Suggest target column (only needs the header)
+    suggested_target = suggest_target_column(pd.DataFrame(columns=profile.columns))
 
     # ---------------------------------------------------------
     # 🔥 Fix: Sanitize DataFrame for JSON Serialization
-    # Replace Infinity with NaN, then NaN with None (which becomes null in JSON)
+    # NaN/Infinity become None (null in JSON), column by column in vectorized form
     # ---------------------------------------------------------
-    df.replace([np.inf, -np.inf], np.nan, inplace=True)
-    df = df.where(pd.notnull(df), None)
+    preview = frame_records(profile.preview)
 
     # Return structured response
     return {
         "dataset_id": dataset_id,
-        "rows": df.shape[0],
-        "columns": df.shape[1],
-        "categorical_columns": categorical_cols,
+        "rows": profile.rows,
+        "columns": len(profile.columns),
+        "categorical_columns": profile.categorical_columns(),
         "suggested_target": suggested_target,
-        "preview": df.head().to_dict(orient="records")
+        "preview": preview
     }
+
+
+async def _read_upload(file: UploadFile):
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        yield chunk
+
+
+@router.post("/")
+async def upload_csv(file: UploadFile = File(...)):
+    # Validate file type
+    if not file.filename.endswith(".csv"):
+        raise HTTPException(status_code=400, detail="Only CSV files are allowed.")
+
+    return await _ingest_stream(_read_upload(file))
+
+
+@router.put("/stream")
+async def upload_csv_stream(request: Request, filename: str):
+    """
+    Raw-body upload for very large files: the CSV is the request body itself,
+    so it is profiled and written to disk as the bytes arrive (no multipart spooling).
+    """
+    if not filename.endswith(".csv"):
+        raise HTTPException(status_code=400, detail="Only CSV files are allowed.")
+
+    return await _ingest_stream(request.stream())
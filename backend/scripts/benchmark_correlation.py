@@ -0,0 +1,79 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml_engine.correlation_engine import CorrelationEngine
+
+
+def legacy_mean_abs_correlation(numeric_df):
+    """What MetaFeatureExtractor did before the engine: full pandas corr() matrix."""
+    corr = numeric_df.corr().abs().values
+    return float(np.nanmean(corr[np.triu_indices(len(corr), k=1)]))
+
+
+def make_frame(rows, cols, factors=5, seed=0):
+    # Latent factors give a realistic spread of correlations
+    rng = np.random.default_rng(seed)
+    latent = rng.standard_normal((rows, factors)).astype(np.float32)
+    loadings = rng.standard_normal((factors, cols)).astype(np.float32)
+    data = latent @ loadings
+    data += rng.standard_normal((rows, cols), dtype=np.float32) * 2
+    return pd.DataFrame(data.astype(np.float64), columns=[f"g{i}" for i in range(cols)], copy=False)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the avg_feature_correlation meta-feature.")
+    parser.add_argument("--rows", type=int, default=5_000)
+    parser.add_argument("--widths", type=int, nargs="+", default=[50, 100, 500, 1000, 2000, 5000, 10000])
+    parser.add_argument("--max-pairs", type=int, nargs="+", default=[50_000, 500_000],
+                        help="Sampling budgets to compare (pairs evaluated)")
+    parser.add_argument("--legacy-max-p", type=int, default=1000, help="Skip pandas corr() above this width")
+    parser.add_argument("--exact-max-p", type=int, default=5000, help="Skip the exact engine above this width")
+    args = parser.parse_args()
+
+    header = f"{'p':>6} {'legacy':>9} {'exact':>9} " + " ".join(f"{f'sampled@{b}':>22}" for b in args.max_pairs)
+    print(f"rows={args.rows:,}; times in seconds, sampled error vs exact in brackets")
+    print(header)
+    for p in args.widths:
+        df = make_frame(args.rows, p)
+        legacy = exact = None
+        cells = []
+
+        if p <= args.legacy_max_p:
+            t, legacy = timed(legacy_mean_abs_correlation, df)
+            cells.append(f"{t:9.2f}")
+        else:
+            cells.append(f"{'-':>9}")
+
+        if p <= args.exact_max_p:
+            t, result = timed(CorrelationEngine.mean_abs_correlation, df, max_pairs=p * p)
+            exact = result["value"]
+            if legacy is not None:
+                assert abs(exact - legacy) < 1e-5, (exact, legacy)
+            cells.append(f"{t:9.2f}")
+        else:
+            cells.append(f"{'-':>9}")
+
+        for budget in args.max_pairs:
+            t, result = timed(CorrelationEngine.mean_abs_correlation, df, max_pairs=budget)
+            error = f"{abs(result['value'] - exact):.4f}" if exact is not None else "n/a"
+            tag = "" if result["strategy"] == "sampled" else "*"
+            cells.append(f"{t:9.2f}{tag:1} [{error:>7}]   ")
+        print(f"{p:>6} " + " ".join(cells))
+    print("* = budget covers every pair, so the exact strategy ran")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml_engine.describe_engine import DescribeEngine
+
+
+def make_frame(rows, numeric, categorical, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.standard_normal((rows, numeric)), columns=[f"n{i}" for i in range(numeric)])
+    df.iloc[::7, 0] = np.nan
+    for i in range(categorical):
+        values = rng.choice([f"v{j}" for j in range(50 * (i + 1))], rows)
+        df[f"c{i}"] = pd.Categorical(values) if i % 2 else values.astype(object)
+    return df
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark descriptive statistics: pandas describe vs DescribeEngine.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--numeric", type=int, default=10)
+    parser.add_argument("--categorical", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'pandas':>9} {'engine':>9} {'speedup':>8}")
+    for rows in args.rows:
+        df = make_frame(rows, args.numeric, args.categorical)
+        t_pandas, _ = timed(lambda: df.describe(include="all").fillna("").to_dict())
+        t_engine, _ = timed(lambda: {col: DescribeEngine.describe_column(df[col])[0] for col in df.columns})
+        print(f"{rows:>10,} {t_pandas:9.2f} {t_engine:9.2f} {t_pandas / t_engine:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from scipy.stats import skew, kurtosis
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml_engine.moment_kernel import column_moments
+
+
+def legacy_moments(numeric_df):
+    """The per-statistic passes MetaFeatureExtractor used before the moment kernel."""
+    return {
+        "mean_features": numeric_df.mean().mean(),
+        "std_features": numeric_df.std().mean(),
+        "skewness": numeric_df.apply(lambda x: skew(x, nan_policy='omit')).mean(),
+        "kurtosis": numeric_df.apply(lambda x: kurtosis(x, nan_policy='omit')).mean(),
+        "n_missing_values": int(numeric_df.isnull().sum().sum()),
+    }
+
+
+def kernel_moments(numeric_df):
+    moments = column_moments(numeric_df)
+    return {
+        "mean_features": pd.Series(moments.means()).mean(),
+        "std_features": pd.Series(moments.stds()).mean(),
+        "skewness": pd.Series(moments.skewness()).mean(),
+        "kurtosis": pd.Series(moments.kurtosis()).mean(),
+        "n_missing_values": int(moments.nan_count.sum()),
+    }
+
+
+def make_frame(rows, cols, missing, seed=0):
+    # Filled a few columns at a time so 1M x 200 fits without full-size temporaries
+    rng = np.random.default_rng(seed)
+    data = np.empty((rows, cols), dtype=np.float64, order="F")
+    for start in range(0, cols, 10):
+        part = rng.standard_normal((rows, min(10, cols - start)))
+        part *= rng.uniform(1, 100, part.shape[1])
+        part += rng.uniform(-50, 50, part.shape[1])
+        if start % 30 == 0:
+            part[:, 0] = np.exp(part[:, 0] / 100)  # some skewed columns
+        if missing:
+            part[rng.random(part.shape) < missing] = np.nan
+        data[:, start:start + part.shape[1]] = part
+    return pd.DataFrame(data, columns=[f"f{i}" for i in range(cols)], copy=False)
+
+
+def best_of(fn, df, repeat):
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(df)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark meta-feature moment computation.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--cols", type=int, default=200)
+    parser.add_argument("--missing", type=float, default=0.01, help="Fraction of values set to NaN")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, args.cols, args.missing)
+    print(f"Frame: {args.rows:,} x {args.cols} ({df.memory_usage().sum() / 1e6:.0f} MB)")
+
+    legacy_time, legacy = best_of(legacy_moments, df, args.repeat)
+    kernel_time, kernel = best_of(kernel_moments, df, args.repeat)
+
+    for key in legacy:
+        print(f"  {key:<18} legacy={legacy[key]:.6f}  kernel={kernel[key]:.6f}")
+        assert np.isclose(legacy[key], kernel[key], rtol=1e-6, atol=1e-9), key
+    print(f"legacy {legacy_time:.2f}s  kernel {kernel_time:.2f}s  speedup {legacy_time / kernel_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# services/chunked_preprocessor.py
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+from ml_engine.categorical_encoder import CategoricalEncoder
+from ml_engine.moment_kernel import BlockMoments, column_moments
+from ml_engine.outlier_engine import IQR_MULTIPLIER, OutlierEngine
+from ml_engine.sketches import KLLSketch
+from services.dtype_optimizer import DtypeStats
+from services.preprocessing_pipeline import (
+    STEPS, PreprocessingPipeline, _is_categorical, _python, categorical_features, numeric_features,
+)
+
+# Outlier detectors that can be fitted from per-batch statistics: z-score bounds exactly
+# (merged moments), IQR bounds from KLL quantile sketches (exact until a column outgrows
+# the sketch, then within its rank error). MAD and the isolation forest need all rows.
+CHUNKED_OUTLIER_METHODS = {"zscore", "iqr"}
+
+
+# ---------------------------------------------------------
+# Streaming fits: the parameters of the in-memory fits (preprocessing_pipeline),
+# accumulated one batch at a time. Columns are chosen from the first batch,
+# whose dtypes every batch of the columnar store shares.
+# ---------------------------------------------------------
+
+class _MissingFit:
+    # Running sums and counts for the means, merged value counts for the modes
+    def __init__(self, target_column: str, categorical_columns: list):
+        self.categorical_columns = categorical_columns
+        self.numeric = self.categorical = None
+
+    def update(self, df: pd.DataFrame) -> None:
+        if self.numeric is None:
+            self.numeric = {col: [0.0, 0, False] for col in numeric_features(df)}
+            self.categorical = {col: [None, False] for col in categorical_features(df, self.categorical_columns)}
+        if self.numeric:
+            values = df[list(self.numeric)]
+            gaps = values.isna().any()
+            for col, total, count in zip(self.numeric, values.sum().to_numpy(), values.count().to_numpy()):
+                acc = self.numeric[col]
+                acc[0] += float(total)
+                acc[1] += int(count)
+                acc[2] = acc[2] or bool(gaps[col])
+        for col, acc in self.categorical.items():
+            counts = df[col].value_counts(sort=False)
+            acc[0] = counts if acc[0] is None else acc[0].add(counts, fill_value=0)
+            acc[1] = acc[1] or bool(df[col].isna().any())
+
+    def params(self) -> dict:
+        fill = {col: total / count for col, (total, count, gaps) in (self.numeric or {}).items() if gaps and count}
+        for col, (counts, gaps) in (self.categorical or {}).items():
+            if gaps and col not in fill and counts is not None and counts.max() > 0:
+                # Series.mode: the smallest of the most frequent values
+                fill[col] = _python(counts[counts == counts.max()].index.sort_values()[0])
+        return {"fill": fill}
+
+
+class _EncodingFit:
+    # Union of the distinct string labels of each column (the label-encoder classes)
+    def __init__(self, target_column: str, categorical_columns: list):
+        self.target_column = target_column
+        self.categorical_columns = categorical_columns
+        self.labels = None
+
+    def update(self, df: pd.DataFrame) -> None:
+        if self.labels is None:
+            columns = categorical_features(df, self.categorical_columns)
+            if self.target_column in df.columns and self.target_column not in columns and _is_categorical(df[self.target_column]):
+                columns.append(self.target_column)
+            self.labels = {col: set() for col in columns}
+        for col, labels in self.labels.items():
+            labels.update(CategoricalEncoder.factorize(df[col])[1].tolist())
+
+    def params(self) -> dict:
+        return {"classes": {col: sorted(labels) for col, labels in (self.labels or {}).items()}}
+
+
+class _ScalingFit:
+    def __init__(self, target_column: str, categorical_columns: list, skip: set = frozenset()):
+        self.target_column = target_column
+        self.skip = skip
+        self.columns = None
+        self.scaler = StandardScaler()
+
+    def update(self, df: pd.DataFrame) -> None:
+        if self.columns is None:
+            self.columns = [col for col in numeric_features(df, self.target_column) if col not in self.skip]
+        if self.columns and len(df):
+            self.scaler.partial_fit(df[self.columns])
+
+    def params(self) -> dict:
+        if not self.columns or not hasattr(self.scaler, "mean_"):
+            return {"mean": {}, "scale": {}}
+        return {
+            "mean": dict(zip(self.columns, self.scaler.mean_.tolist())),
+            "scale": dict(zip(self.columns, self.scaler.scale_.tolist())),
+        }
+
+
+class _OutliersFit:
+    # z-score bounds from moments merged across batches, IQR bounds from one KLL sketch per column
+    def __init__(self, target_column: str, categorical_columns: list, method: str = "iqr"):
+        if method not in CHUNKED_OUTLIER_METHODS:
+            raise ValueError(f"Outlier method '{method}' cannot be fitted batch by batch.")
+        self.target_column = target_column
+        self.method = method
+        self.columns = self.moments = self.sketches = None
+
+    def update(self, df: pd.DataFrame) -> None:
+        if self.columns is None:
+            self.columns = numeric_features(df, self.target_column)
+            self.moments = BlockMoments.empty(len(self.columns))
+            self.sketches = {col: KLLSketch() for col in self.columns}
+        if not self.columns:
+            return
+        if self.method == "zscore":
+            self.moments = self.moments.merge(column_moments(df[self.columns]))
+        else:
+            for col, sketch in self.sketches.items():
+                sketch.update(df[col].to_numpy(dtype=np.float64, na_value=np.nan))
+
+    def params(self) -> dict | None:
+        if not self.columns:
+            return None
+        if self.method == "zscore":
+            return {"method": "zscore", "bounds": OutlierEngine.zscore_bounds(self.columns, self.moments)}
+        bounds = {}
+        for col, sketch in self.sketches.items():
+            if sketch.n == 0:
+                bounds[col] = [None, None]  # as in memory: nothing is within the bounds of an empty column
+                continue
+            q1, q3 = sketch.quantiles((0.25, 0.75))
+            bounds[col] = [q1 - IQR_MULTIPLIER * (q3 - q1), q3 + IQR_MULTIPLIER * (q3 - q1)]
+        return {"method": "iqr", "bounds": bounds}
+
+
+STREAMING_FITS = {
+    "missing": _MissingFit,
+    "encoding": _EncodingFit,
+    "scaling": _ScalingFit,
+    "outliers": _OutliersFit,
+}
+
+
+def chunkable(action: str, outlier_method: str = "iqr") -> bool:
+    """Whether `action` can be fitted batch by batch (see CHUNKED_OUTLIER_METHODS for the outlier bounds)."""
+    return action in STREAMING_FITS and (action != "outliers" or outlier_method in CHUNKED_OUTLIER_METHODS)
+
+
+def fit_step_chunked(pipeline: PreprocessingPipeline, action: str, batches, target_column: str = None,
+                     categorical_columns: list = None, **fit_options) -> dict | None:
+    """
+    Out-of-core PreprocessingPipeline.fit_step. `batches()` streams the output of
+    the pipeline's current steps (e.g. dataset_store.iter_dataset_batches with
+    `pipeline`), and is read twice:
+    1. the step's parameters are accumulated batch by batch (STREAMING_FITS);
+    2. the step is applied batch by batch to record its output dtypes and row count
+       (and the outlier counts of a row filter).
+    Only one batch is resident at a time. The step is appended and returned (None
+    if there was nothing to do); reads then apply it like any other step.
+    """
+    fit = STREAMING_FITS[action](target_column, categorical_columns, **fit_options)
+    for batch in batches():
+        fit.update(batch)
+    step = {"action": action, "params": fit.params()}
+    if not step["params"] or not any(step["params"].values()):
+        return None
+
+    stats, dtypes, rows = DtypeStats(), None, 0
+    counts = {}
+    for batch in batches():
+        if action == "outliers":
+            keep, batch_counts = OutlierEngine.inlier_mask(batch, step["params"], with_counts=True)
+            out = batch[keep].reset_index(drop=True)
+            counts = {col: counts.get(col, 0) + n for col, n in batch_counts.items()}
+        else:
+            out = STEPS[action][1](batch, step["params"])
+        stats.update(out)
+        dtypes = dtypes or out.dtypes.to_dict()
+        rows += len(out)
+    if action == "outliers":
+        step["params"]["counts"] = counts
+    # The same schema optimize_dtypes would pick on the whole output (DtypeStats is cumulative)
+    step["schema"] = stats.schema(dtypes or {})
+    step["rows"] = rows
+    pipeline.steps.append(step)
+    return step
@@ -0,0 +1,163 @@
+# services/csv_stream.py
+
+import io
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+from utils.file_ops.csv_loader import arrow_type, load_csv
+from services.dtype_optimizer import DtypeStats
+
+
+def _last_record_end(data: bytes) -> int:
+    """
+    Index of the last newline that ends a complete CSV record, or -1.
+    A newline inside a quoted field is skipped (odd number of quotes before it).
+    """
+    idx = data.rfind(b"\n")
+    while idx != -1 and data.count(b'"', 0, idx) % 2:
+        idx = data.rfind(b"\n", 0, idx)
+    return idx
+
+
+def _first_records_end(data: bytes, n: int = 1) -> int:
+    """Index of the newline ending the first `n` CSV records, or -1."""
+    idx = -1
+    for _ in range(n):
+        idx = data.find(b"\n", idx + 1)
+        while idx != -1 and data.count(b'"', 0, idx) % 2:
+            idx = data.find(b"\n", idx + 1)
+        if idx == -1:
+            break
+    return idx
+
+
+def _widen(current, new):
+    """Smallest dtype that can hold values of both block dtypes (mirrors a whole-file read)."""
+    if current is None or current == new:
+        return new
+    numeric = (pd.api.types.is_numeric_dtype(current) and not pd.api.types.is_bool_dtype(current)
+               and pd.api.types.is_numeric_dtype(new) and not pd.api.types.is_bool_dtype(new))
+    if numeric:
+        return np.dtype("float64")
+    return np.dtype("object")
+
+
+def _retype(array: pa.Array, to_type) -> pa.Array:
+    """A chunk's column as the whole-file type; ValueError if that would change its values."""
+    if array.type == to_type:
+        return array
+    if pa.types.is_string(to_type):
+        # Numbers or booleans in a column that resolves to text read differently as text;
+        # an all-missing chunk column is the only safe case
+        if not pc.all(pc.is_null(array, nan_is_null=True)).as_py():
+            raise ValueError("Chunk column cannot be converted to text losslessly.")
+        return pa.nulls(len(array), to_type)
+    return pc.cast(array, to_type)
+
+
+class StreamingCSVProfile:
+    """
+    Incrementally parses a CSV byte stream as it arrives.
+    Only complete records are parsed; a partial trailing record is carried over to the next chunk,
+    so memory stays bounded by the chunk size no matter how large the file is.
+    Tracks the header, row count, preview rows and the dtype of every column over the whole file,
+    plus the value ranges / distinct counts needed to pick compact dtypes (`compact_schema`).
+    Call `close()` after the last chunk; `preview` is only available after that.
+    With `spool_dir`, every parsed chunk is also kept there (Arrow files), so the
+    columnar store can be built from `spooled_batches()` without parsing the CSV again.
+    """
+
+    def __init__(self, preview_rows: int = 5, engine: str = None, spool_dir: str = None):
+        self.preview_rows = preview_rows
+        self.engine = engine
+        self.spool_dir = spool_dir
+        self._spooled = [] if spool_dir else None
+        self.columns = []
+        self.dtypes = {}
+        self.rows = 0
+        self.preview = None
+        self.dtype_stats = DtypeStats()
+        self._header = None
+        self._preview_bytes = b""
+        self._pending = b""
+
+    def feed(self, chunk: bytes) -> None:
+        data = self._pending + chunk
+        end = _last_record_end(data)
+        if end == -1:
+            self._pending = data
+            return
+        self._pending = data[end + 1:]
+        self._parse(data[:end + 1])
+
+    def close(self) -> None:
+        """Parse whatever is left after the final chunk (a last line without a newline)."""
+        if self._pending.strip():
+            self._parse(self._pending)
+        self._pending = b""
+        if self._header is None:
+            raise ValueError("No columns to parse from file")
+        if not self.dtypes:
+            # Header only: same result as reading the file in one go
+            self.dtypes = dict(pd.read_csv(io.BytesIO(self._header)).dtypes.items())
+
+        # Re-parse the first records with the whole-file dtypes so the preview
+        # matches what a single read would have produced
+        self.preview = pd.read_csv(io.BytesIO(self._header + self._preview_bytes), dtype=self.dtypes)
+
+    def categorical_columns(self) -> list[str]:
+        return [col for col in self.columns if self.dtypes[col] == object]
+
+    def compact_schema(self) -> dict:
+        return self.dtype_stats.schema(self.dtypes)
+
+    def spooled_batches(self):
+        """
+        The spooled chunks as record batches typed like `iter_csv(path, dtypes=self.dtypes)`
+        would parse them. Raises ValueError if there is no spool, or a chunk cannot be
+        converted without changing values (e.g. numbers in a column that resolves to text):
+        the CSV then has to be parsed again.
+        """
+        if self._spooled is None:
+            raise ValueError("No spooled chunks to read.")
+        types = [arrow_type(self.dtypes[col]) for col in self.columns]
+        for path in self._spooled:
+            for batch in feather.read_table(path, memory_map=True).to_batches():
+                yield pa.RecordBatch.from_arrays(
+                    [_retype(batch.column(col), to_type) for col, to_type in zip(self.columns, types)],
+                    names=self.columns,
+                )
+
+    def _spool(self, chunk_df: pd.DataFrame) -> None:
+        path = os.path.join(self.spool_dir, f"{len(self._spooled)}.arrow")
+        try:
+            feather.write_feather(chunk_df, path, compression="uncompressed")
+            self._spooled.append(path)
+        except (pa.ArrowException, ValueError, TypeError):
+            # e.g. mixed-type object column from the pandas fallback: no spool, the CSV is parsed again
+            self._spooled = None
+
+    def _parse(self, block: bytes) -> None:
+        if self._header is None:
+            header_end = _first_records_end(block)
+            self._header = block[:header_end + 1] if header_end != -1 else block + b"\n"
+            block = block[header_end + 1:] if header_end != -1 else b""
+            self.columns = pd.read_csv(io.BytesIO(self._header), nrows=0).columns.tolist()
+
+        if not block.strip():
+            return
+
+        chunk_df = load_csv(io.BytesIO(self._header + block), engine=self.engine)
+        if self.rows < self.preview_rows:
+            end = _first_records_end(block, self.preview_rows - self.rows)
+            self._preview_bytes += block[:end + 1] if end != -1 else block
+        self.rows += len(chunk_df)
+        self.dtype_stats.update(chunk_df)
+        if self._spooled is not None:
+            self._spool(chunk_df)
+
+        for col, dtype in chunk_df.dtypes.items():
+            self.dtypes[col] = _widen(self.dtypes.get(col), dtype)
@@ -0,0 +1,463 @@
+# services/dataset_store.py
+
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from services.frame_cache import frame_cache, sample_cache
+from services.profile_cache import profile_cache
+from services.dtype_optimizer import RecordBatchCaster, optimize_dtypes
+from services.preprocessing_pipeline import PreprocessingPipeline
+from services.version_log import VersionLog
+from utils.file_ops.csv_loader import iter_csv
+from utils.json_sanitizer import dump_json, dumps, load_json
+
+# 📁 Uploaded datasets live here. The CSV is kept as the original source;
+# every route reads the typed columnar copy written next to it.
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+DATASET_DIR = os.path.join(BASE_DIR, "storage", "datasets")
+os.makedirs(DATASET_DIR, exist_ok=True)
+
+
+def csv_path(dataset_id: str) -> str:
+    """Path of the original uploaded CSV."""
+    return os.path.join(DATASET_DIR, f"{dataset_id}.csv")
+
+
+def columnar_path(dataset_id: str) -> str:
+    """Path of the Arrow IPC (Feather v2) copy used for all reads."""
+    return os.path.join(DATASET_DIR, f"{dataset_id}.arrow")
+
+
+def schema_path(dataset_id: str) -> str:
+    """Path of the JSON record of the compact dtypes chosen at ingest."""
+    return os.path.join(DATASET_DIR, f"{dataset_id}.schema.json")
+
+
+def _write_schema(dataset_id: str, schema: dict) -> None:
+    with open(schema_path(dataset_id), "w") as f:
+        json.dump(schema, f)
+
+
+def load_schema(dataset_id: str) -> dict:
+    path = schema_path(dataset_id)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def pipeline_path(dataset_id: str) -> str:
+    """Path of the JSON version log of the fitted preprocessing steps applied on top of the columnar copy."""
+    return os.path.join(DATASET_DIR, f"{dataset_id}.pipeline.json")
+
+
+# Parsed version logs, keyed by the stat of their file: (mtime, size, log)
+_logs = {}
+
+
+def load_version_log(dataset_id: str) -> VersionLog:
+    """The dataset's version log (only the raw version when no action was applied)."""
+    try:
+        st = os.stat(pipeline_path(dataset_id))
+    except FileNotFoundError:
+        return VersionLog()
+    cached = _logs.get(dataset_id)
+    if cached is None or cached[:2] != (st.st_mtime_ns, st.st_size):
+        cached = (st.st_mtime_ns, st.st_size, VersionLog.from_dict(load_json(pipeline_path(dataset_id))))
+        _logs[dataset_id] = cached
+    return cached[2].copy()
+
+
+def load_pipeline(dataset_id: str, version: int = None) -> PreprocessingPipeline:
+    """The preprocessing pipeline of a version of the dataset (default: its current one)."""
+    return load_version_log(dataset_id).pipeline(version)
+
+
+def _write_log(dataset_id: str, log: VersionLog) -> None:
+    # Cached frames, samples and profiles are keyed by version: the other versions' entries stay valid
+    dump_json(log.to_dict(), pipeline_path(dataset_id))
+    _write_fingerprint(dataset_id)
+
+
+def save_pipeline(dataset_id: str, pipeline: PreprocessingPipeline, df: pd.DataFrame = None) -> None:
+    """
+    Record the steps fitted on top of the current version (as returned by
+    load_pipeline) as new versions, the last one becoming current; the columnar copy
+    is not rewritten. `df`, if given, is the pipeline's output (as returned by fit_step)
+    and seeds the frame cache, so the next load does not replay the steps.
+    """
+    log = load_version_log(dataset_id)
+    log.commit(pipeline)
+    _write_log(dataset_id, log)
+    if df is not None:
+        frame_cache.put(dataset_id, dataset_version(dataset_id), df)
+
+
+def set_current_version(dataset_id: str, version: int) -> VersionLog:
+    """
+    Make `version` the one reads return (undo, redo, checkout). Nothing is replayed
+    here: the version's frame comes from the cache, or from its closest cached
+    ancestor plus the steps after it, on the next load.
+    """
+    log = load_version_log(dataset_id)
+    if version not in log:
+        raise KeyError(f"Version {version} of dataset '{dataset_id}' not found.")
+    if version != log.head:
+        log.head = version
+        _write_log(dataset_id, log)
+    return log
+
+
+def _drop_pipeline(dataset_id: str) -> None:
+    # A rewritten columnar copy already contains whatever was applied to it
+    if os.path.exists(pipeline_path(dataset_id)):
+        os.remove(pipeline_path(dataset_id))
+
+
+def fingerprint_path(dataset_id: str) -> str:
+    """Path of the JSON record of the columnar copy's content hash and version."""
+    return os.path.join(DATASET_DIR, f"{dataset_id}.fingerprint.json")
+
+
+def dataset_exists(dataset_id: str) -> bool:
+    return os.path.exists(columnar_path(dataset_id)) or os.path.exists(csv_path(dataset_id))
+
+
+def _raw_version(dataset_id: str) -> tuple:
+    st = os.stat(columnar_path(dataset_id))
+    return st.st_mtime_ns, st.st_size
+
+
+def dataset_version(dataset_id: str, version: int = None) -> tuple:
+    """
+    Version stamp of the data reads return: the columnar copy's stat and the version
+    in its log (default: the current one). Changes on every rewrite, applied action,
+    undo or redo, and is the same again whenever the same version is current.
+    """
+    return *_raw_version(dataset_id), load_version_log(dataset_id).head if version is None else version
+
+
+def _write_fingerprint(dataset_id: str) -> dict:
+    version = list(dataset_version(dataset_id))
+    # The columnar copy is only re-hashed when it was rewritten, not when just the pipeline changed
+    try:
+        with open(fingerprint_path(dataset_id), "r") as f:
+            previous = json.load(f)
+        raw_hash = previous["raw_hash"] if previous["raw_version"] == version[:2] else None
+    except (OSError, ValueError, KeyError):
+        raw_hash = None
+    if raw_hash is None:
+        digest = hashlib.blake2b(digest_size=32)
+        with open(columnar_path(dataset_id), "rb") as f:
+            for block in iter(lambda: f.read(8 * 1024 * 1024), b""):
+                digest.update(block)
+        raw_hash = digest.hexdigest()
+
+    content_hash = raw_hash
+    pipeline = load_pipeline(dataset_id)
+    if pipeline.steps:
+        # The current version's steps only: the same data hashes the same whatever else the log holds
+        content_hash = hashlib.blake2b(raw_hash.encode() + dumps(pipeline.to_dict()), digest_size=32).hexdigest()
+    fingerprint = {"content_hash": content_hash, "version": version, "raw_hash": raw_hash, "raw_version": version[:2]}
+    with open(fingerprint_path(dataset_id), "w") as f:
+        json.dump(fingerprint, f)
+    return fingerprint
+
+
+def dataset_fingerprint(dataset_id: str) -> dict:
+    """
+    Content hash + version of the stored dataset, for keying derived results.
+    Recorded when the dataset is written, so reading it costs a stat and a tiny JSON file;
+    it is recomputed only if the record is missing or belongs to an older version.
+    """
+    _ensure_columnar(dataset_id)
+    version = list(dataset_version(dataset_id))
+    try:
+        with open(fingerprint_path(dataset_id), "r") as f:
+            fingerprint = json.load(f)
+        if fingerprint["version"] == version:
+            return fingerprint
+    except (OSError, ValueError, KeyError):
+        pass
+    return _write_fingerprint(dataset_id)
+
+
+def _invalidate_derived(dataset_id: str) -> None:
+    """Drop everything computed from the previous contents of a rewritten dataset."""
+    frame_cache.invalidate(dataset_id)
+    sample_cache.invalidate(dataset_id)
+    profile_cache.invalidate(dataset_id)
+    _write_fingerprint(dataset_id)
+
+
+def save_dataset(dataset_id: str, df: pd.DataFrame) -> None:
+    """
+    Persist a frame as the dataset's columnar copy.
+    Columns are stored in their most compact lossless dtype (see dtype_optimizer) and the
+    chosen schema is recorded next to the dataset. The index is dropped just like
+    `to_csv(index=False)` did. The file is replaced atomically so concurrent readers
+    never see a partial write.
+    """
+    df, schema = optimize_dtypes(df.reset_index(drop=True))
+    path = columnar_path(dataset_id)
+    tmp_path = f"{path}.tmp"
+    feather.write_feather(df, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+    _write_schema(dataset_id, schema)
+    _drop_pipeline(dataset_id)
+    _invalidate_derived(dataset_id)
+
+
+def _write_batches(path: str, batches) -> bool:
+    """Write record batches to an Arrow IPC file; False if there were none."""
+    writer = None
+    try:
+        for batch in batches:
+            if writer is None:
+                writer = pa.ipc.new_file(path, batch.schema)
+            writer.write_batch(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    return writer is not None
+
+
+def ingest_csv(dataset_id: str, dtypes: dict = None, schema: dict = None, engine: str = None,
+               batches=None) -> None:
+    """
+    Convert the uploaded CSV into the columnar store without loading it whole.
+    `dtypes` should be resolved over the entire file (see StreamingCSVProfile) so that
+    every batch is written with one schema; `schema` is the compact dtype choice from
+    DtypeStats and is applied to each batch on the way to disk.
+    `batches` are the file's records already parsed (StreamingCSVProfile.spooled_batches),
+    written instead of parsing the CSV again unless they are rejected.
+    Parsed batches go straight to disk (no pandas round trip); if the fast parser rejects
+    the file part-way through, the conversion is redone with the pandas parser.
+    """
+    path = columnar_path(dataset_id)
+    tmp_path = f"{path}.tmp"
+    source = csv_path(dataset_id)
+
+    # Already parsed batches first; then the fast parser; then pandas; finally pandas
+    # without the compact schema (a value outside the recorded categories or ranges must never be lost)
+    attempts = [(engine, schema), ("pandas", schema), ("pandas", None)]
+    if batches is not None:
+        attempts.insert(0, (batches, schema))
+    for attempt, (parsed, attempt_schema) in enumerate(attempts, 1):
+        caster = RecordBatchCaster(attempt_schema or {})
+        if parsed is None or isinstance(parsed, str):
+            parsed = iter_csv(source, engine=parsed, dtypes=dtypes)
+        try:
+            written = _write_batches(tmp_path, (caster.cast(batch) for batch in parsed))
+            schema = attempt_schema
+            break
+        except ValueError:  # includes pa.ArrowInvalid
+            if attempt == len(attempts):
+                raise
+
+    if not written:
+        # Header-only CSV: no batches, write the empty frame
+        save_dataset(dataset_id, pd.read_csv(source, dtype=dtypes))
+        return
+    os.replace(tmp_path, path)
+    if schema:
+        _write_schema(dataset_id, schema)
+    _drop_pipeline(dataset_id)
+    _invalidate_derived(dataset_id)
+
+
+def _ensure_columnar(dataset_id: str) -> str:
+    """Path of the columnar copy, converting a pre-store CSV upload first if needed."""
+    path = columnar_path(dataset_id)
+    if not os.path.exists(path):
+        source = csv_path(dataset_id)
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"Dataset '{dataset_id}' not found.")
+        save_dataset(dataset_id, pd.read_csv(source))
+    return path
+
+
+def load_dataset(dataset_id: str, columns: list[str] = None, version: int = None) -> pd.DataFrame:
+    """
+    Load a dataset from the columnar store, with the preprocessing pipeline of its
+    current version (or of `version`) applied.
+    Full frames are served from the in-process cache when the stored version is unchanged;
+    a version that is not cached is derived from its closest cached ancestor, replaying
+    only the steps after it (under copy-on-write, the columns those steps do not rewrite
+    are shared with the ancestor, in memory and in the cache's accounting).
+    The returned frame is the caller's own (see frame_cache), so callers may modify it freely.
+    Datasets uploaded before the store existed are converted from their CSV once.
+    """
+    path = _ensure_columnar(dataset_id)
+    log = load_version_log(dataset_id)
+    version = log.head if version is None else version
+    raw = _raw_version(dataset_id)
+    lineage = [0] + log.chain(version)
+    found = frame_cache.nearest(dataset_id, [(*raw, v) for v in reversed(lineage)])
+    if found is not None and found[0][2] == version:
+        return found[1][columns] if columns is not None else found[1]
+
+    pipeline = log.pipeline(version)
+    if found is None:
+        df, start = None, 0
+    else:
+        df, start = found[1], lineage.index(found[0][2])
+    if columns is not None:
+        if df is None:
+            df = feather.read_feather(path, columns=pipeline.input_columns(columns))
+        else:
+            df = df[pipeline.input_columns(columns)]
+        return pipeline.transform(df, start)[columns]
+
+    if df is None:
+        df = feather.read_feather(path)
+    return frame_cache.put(dataset_id, (*raw, version), pipeline.transform(df, start))
+
+
+def _raw_num_rows(dataset_id: str) -> int:
+    with pa.memory_map(_ensure_columnar(dataset_id)) as source:
+        reader = pa.ipc.open_file(source)
+        return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+
+
+def dataset_num_rows(dataset_id: str) -> int:
+    """Row count read from the batch headers of the columnar copy (no column data is touched)."""
+    pipeline = load_pipeline(dataset_id)
+    if pipeline.steps:
+        # Recorded when the steps were fitted (outlier removal changes it)
+        return pipeline.rows
+    return _raw_num_rows(dataset_id)
+
+
+def dataset_versions(dataset_id: str) -> dict:
+    """The version log: every version's action, rewritten columns and row count, and where undo/redo go."""
+    log = load_version_log(dataset_id)
+    raw_rows = _raw_num_rows(dataset_id)
+    return {
+        "current": log.head,
+        "undo": log.undo_target(),
+        "redo": log.redo_target(),
+        "versions": [log.describe(v, raw_rows) for v in range(len(log.versions))],
+    }
+
+
+def compare_versions(dataset_id: str, a: int, b: int) -> dict:
+    """How two versions differ, read from the log alone (see VersionLog.compare)."""
+    log = load_version_log(dataset_id)
+    for version in (a, b):
+        if version not in log:
+            raise KeyError(f"Version {version} of dataset '{dataset_id}' not found.")
+    return log.compare(a, b, _raw_num_rows(dataset_id))
+
+
+def dataset_columns(dataset_id: str) -> list[str]:
+    """Column names of the columnar copy, read from the file schema."""
+    with pa.memory_map(_ensure_columnar(dataset_id)) as source:
+        return list(pa.ipc.open_file(source).schema.names)
+
+
+def dataset_head(dataset_id: str, n: int = 5, columns: list[str] = None) -> pd.DataFrame:
+    """First `n` rows (of `columns`, default all), converted from the leading record batches only."""
+    pipeline = load_pipeline(dataset_id)
+    if pipeline.filters_rows():
+        # Rows of the leading batches may be filtered out: take batches until enough survive
+        frames, rows = [], 0
+        for frame in iter_dataset_batches(dataset_id, columns):
+            frames.append(frame)
+            rows += len(frame)
+            if rows >= n:
+                break
+        return pd.concat(frames, ignore_index=True).head(n) if frames else load_dataset(dataset_id, columns).head(n)
+    with pa.memory_map(_ensure_columnar(dataset_id)) as source:
+        reader = pa.ipc.open_file(source)
+        batches, rows = [], 0
+        for i in range(reader.num_record_batches):
+            if rows >= n:
+                break
+            batches.append(reader.get_batch(i))
+            rows += batches[-1].num_rows
+        table = pa.Table.from_batches(batches, schema=reader.schema).slice(0, n)
+        return pipeline.transform((table.select(columns) if columns is not None else table).to_pandas())
+
+
+def _strata(dataset_id: str, column: str) -> pd.Index | None:
+    """Classes of a class-label column (for stratified sampling), None for a continuous one."""
+    counts = None
+    for frame in iter_dataset_batches(dataset_id, [column]):
+        batch_counts = frame[column].value_counts(dropna=False, sort=False)
+        counts = batch_counts if counts is None else counts.add(batch_counts, fill_value=0)
+        # Same rule as AutoMLRunner: numeric targets with 20+ distinct values are continuous
+        if len(counts) >= 20 and pd.api.types.is_numeric_dtype(frame[column].dtype):
+            return None
+    return counts
+
+
+def dataset_sample(dataset_id: str, n: int, stratify: str = None, seed: int = 0) -> pd.DataFrame:
+    """
+    A uniform random sample of `n` rows, stratified by the classes of `stratify`
+    (proportional allocation, at least one row per class), in dataset order.
+    Taken batch by batch, keeping the rows with the smallest random keys of each
+    class, so the dataset is never loaded whole; cached per dataset version.
+    """
+    version = (dataset_version(dataset_id), n, stratify, seed)
+    cached = sample_cache.get(dataset_id, version)
+    if cached is not None:
+        return cached
+    total = dataset_num_rows(dataset_id)
+    if total <= n:
+        return sample_cache.put(dataset_id, version, load_dataset(dataset_id))
+
+    counts = _strata(dataset_id, stratify) if stratify in dataset_columns(dataset_id) else None
+    if counts is None:
+        classes, quota = None, np.array([n])
+    else:
+        classes = counts.index
+        quota = np.minimum(np.maximum(np.round(counts.to_numpy() * n / total), 1), counts.to_numpy()).astype(np.int64)
+
+    rng = np.random.default_rng(seed)
+    kept, keys, strata, offset = None, np.empty(0), np.empty(0, dtype=np.int64), 0
+    for frame in iter_dataset_batches(dataset_id):
+        frame.index = pd.RangeIndex(offset, offset + len(frame))
+        offset += len(frame)
+        frame_strata = np.zeros(len(frame), dtype=np.int64) if classes is None \
+            else classes.get_indexer(frame[stratify])
+        candidates = frame if kept is None else pd.concat([kept, frame])
+        keys = np.concatenate([keys, rng.random(len(frame))])
+        strata = np.concatenate([strata, frame_strata])
+        # The `quota` smallest keys of each class: rank within the class after sorting by (class, key)
+        order = np.lexsort((keys, strata))
+        sorted_strata = strata[order]
+        rank = np.arange(len(order)) - np.searchsorted(sorted_strata, sorted_strata)
+        keep = np.sort(order[rank < quota[sorted_strata]])
+        kept, keys, strata = candidates.iloc[keep], keys[keep], strata[keep]
+    return sample_cache.put(dataset_id, version, kept.reset_index(drop=True))
+
+
+def iter_dataset_batches(dataset_id: str, columns: list[str] = None, pipeline: PreprocessingPipeline = None):
+    """
+    Stream a dataset as pandas frames, one stored record batch at a time.
+    The file is memory-mapped, so only the batch being converted is resident;
+    use this instead of load_dataset for datasets that may not fit in memory.
+    The preprocessing pipeline is applied to each batch (its steps are row-local);
+    `pipeline` replaces the recorded one (e.g. while steps are being fitted).
+    """
+    pipeline = load_pipeline(dataset_id) if pipeline is None else pipeline
+    read_columns = pipeline.input_columns(columns) if columns is not None else None
+    with pa.memory_map(_ensure_columnar(dataset_id)) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if read_columns is not None:
+                batch = batch.select(read_columns)
+            frame = batch.to_pandas()
+            if pipeline.steps:
+                frame = pipeline.transform(frame)
+                if columns is not None:
+                    frame = frame[columns]
+                if frame.empty and pipeline.filters_rows():
+                    continue
+            yield frame
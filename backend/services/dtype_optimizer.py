@@ -0,0 +1,148 @@
+# services/dtype_optimizer.py
+
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Object columns with at most this many distinct values become `category`...
+MAX_CATEGORIES = int(os.getenv("MAX_CATEGORIES", "1000"))
+# ...as long as the distinct values are at most this fraction of the non-null rows
+MAX_CATEGORY_RATIO = 0.5
+
+_INT_TYPES = [np.int8, np.int16, np.int32, np.int64]
+
+
+def _smallest_int(lo, hi) -> str:
+    for int_type in _INT_TYPES:
+        info = np.iinfo(int_type)
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(int_type).name
+    return "int64"
+
+
+def _float32_lossless(values: np.ndarray) -> bool:
+    with np.errstate(over="ignore", invalid="ignore"):
+        return bool(np.array_equal(values.astype(np.float32).astype(np.float64), values, equal_nan=True))
+
+
+class DtypeStats:
+    """
+    Running per-column facts needed to pick the most compact lossless dtype.
+    Fed one frame (or upload chunk) at a time, so it also works on streamed files.
+    """
+
+    def __init__(self, max_categories: int = MAX_CATEGORIES):
+        self.max_categories = max_categories
+        self._stats = {}
+
+    def update(self, df: pd.DataFrame) -> None:
+        for col in df.columns:
+            series = df[col]
+            st = self._stats.setdefault(col, {
+                "kinds": set(), "min": None, "max": None, "float32": True, "values": set(), "non_null": 0,
+            })
+            dtype = series.dtype
+
+            if pd.api.types.is_bool_dtype(dtype):
+                st["kinds"].add("bool")
+            elif pd.api.types.is_numeric_dtype(dtype):
+                st["kinds"].add("int" if pd.api.types.is_integer_dtype(dtype) else "float")
+                values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+                if len(values) and not np.isnan(values).all():
+                    lo, hi = np.nanmin(values), np.nanmax(values)
+                    st["min"] = lo if st["min"] is None else min(st["min"], lo)
+                    st["max"] = hi if st["max"] is None else max(st["max"], hi)
+                if st["float32"]:
+                    st["float32"] = _float32_lossless(values)
+            elif dtype == object or isinstance(dtype, pd.CategoricalDtype):
+                st["kinds"].add("object")
+                st["non_null"] += int(series.count())
+                if st["values"] is not None:
+                    st["values"].update(series.dropna().unique())
+                    if len(st["values"]) > self.max_categories:
+                        st["values"] = None
+            else:
+                st["kinds"].add("other")
+
+    def schema(self, dtypes: dict) -> dict:
+        """
+        Chosen dtype per column, given the dtypes the whole data resolves to.
+        Entries are JSON-serialisable so the schema can be stored next to the dataset.
+        """
+        schema = {}
+        for col, dtype in dtypes.items():
+            st = self._stats.get(col)
+            spec = {"dtype": str(dtype), "source_dtype": str(dtype)}
+
+            if st is None:
+                pass
+            elif pd.api.types.is_integer_dtype(dtype) and st["min"] is not None:
+                spec["dtype"] = _smallest_int(st["min"], st["max"])
+            elif (pd.api.types.is_float_dtype(dtype) and st["float32"]
+                  and st["kinds"] <= {"int", "float"} and str(dtype) != "float32"):
+                spec["dtype"] = "float32"
+            elif ((dtype == object or isinstance(dtype, pd.CategoricalDtype))
+                  and st["kinds"] == {"object"} and st["values"] is not None and st["non_null"]
+                  and len(st["values"]) <= MAX_CATEGORY_RATIO * st["non_null"]):
+                spec["dtype"] = "category"
+                spec["categories"] = sorted(st["values"], key=str)
+
+            schema[col] = spec
+        return schema
+
+
+def apply_schema(df: pd.DataFrame, schema: dict) -> pd.DataFrame:
+    changes = {}
+    for col, spec in schema.items():
+        if col not in df.columns:
+            continue
+        if spec["dtype"] == "category":
+            changes[col] = pd.CategoricalDtype(spec["categories"])
+        elif spec["dtype"] != str(df[col].dtype):
+            changes[col] = spec["dtype"]
+    return df.astype(changes) if changes else df
+
+
+def optimize_dtypes(df: pd.DataFrame, max_categories: int = MAX_CATEGORIES) -> tuple[pd.DataFrame, dict]:
+    """
+    Downcast numeric columns to the smallest lossless width and turn
+    low-cardinality object columns into `category`. Returns the frame and the chosen schema.
+    """
+    stats = DtypeStats(max_categories)
+    stats.update(df)
+    schema = stats.schema(df.dtypes.to_dict())
+    return apply_schema(df, schema), schema
+
+
+class RecordBatchCaster:
+    """Applies a schema to Arrow record batches so every batch lands with identical types."""
+
+    def __init__(self, schema: dict):
+        self.types = {}
+        self.dictionaries = {}
+        for col, spec in schema.items():
+            if spec["dtype"] == spec["source_dtype"]:
+                continue
+            if spec["dtype"] == "category":
+                dictionary = pa.array(spec["categories"], type=pa.string())
+                self.dictionaries[col] = dictionary
+                self.types[col] = pa.from_numpy_dtype(np.dtype(_smallest_int(-1, len(dictionary))))
+            else:
+                self.types[col] = pa.from_numpy_dtype(np.dtype(spec["dtype"]))
+
+    def cast(self, batch: pa.RecordBatch) -> pa.RecordBatch:
+        arrays = []
+        for name, array in zip(batch.schema.names, batch.columns):
+            if name in self.dictionaries:
+                dictionary = self.dictionaries[name]
+                indices = pc.index_in(array, value_set=dictionary)
+                if indices.null_count != array.null_count:
+                    raise ValueError(f"Column '{name}' has values outside its recorded categories.")
+                array = pa.DictionaryArray.from_arrays(indices.cast(self.types[name]), dictionary)
+            elif name in self.types:
+                array = pc.cast(array, self.types[name])
+            arrays.append(array)
+        # Drop pandas metadata: it would describe the pre-cast types
+        return pa.RecordBatch.from_arrays(arrays, names=batch.schema.names)
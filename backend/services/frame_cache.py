@@ -0,0 +1,163 @@
+# services/frame_cache.py
+
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# 🧠 Byte budget for cached frames (configurable via env)
+DATASET_CACHE_MAX_MB = int(os.getenv("DATASET_CACHE_MAX_MB", "1024"))
+
+# Versions of one dataset kept side by side (undo/redo hits; unchanged columns are shared)
+DATASET_CACHE_VERSIONS = int(os.getenv("DATASET_CACHE_VERSIONS", "8"))
+
+# Byte budget for the row samples that preprocessing previews run on
+SAMPLE_CACHE_MAX_MB = int(os.getenv("SAMPLE_CACHE_MAX_MB", "256"))
+
+
+def _handout(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The caller's copy of a cached frame. Under copy-on-write (enabled by the API
+    process, see main.py) a shallow copy: reads share memory and any write lands in
+    the caller's copy. Without it, a deep copy, so the cached entry is never modified.
+    """
+    return df.copy(deep=not pd.options.mode.copy_on_write)
+
+
+def _column_buffers(df: pd.DataFrame) -> dict:
+    """
+    Bytes of each column keyed by the address and size of its values. Frames
+    derived under copy-on-write share the columns they did not rewrite, and a shared
+    column has the same key in both, so it is counted once. Values without a numpy
+    buffer of their own (Arrow-backed) get a private key.
+    """
+    buffers = {}
+    for i in range(df.shape[1]):
+        series = df.iloc[:, i]
+        values = series.array
+        data = values.codes if isinstance(values, pd.Categorical) else values
+        nbytes = int(series.memory_usage(index=False, deep=True))
+        if isinstance(data, (np.ndarray, pd.arrays.NumpyExtensionArray)):
+            key = (np.asarray(data).__array_interface__["data"][0], nbytes)
+        else:
+            key = ("private", id(df), i)
+        buffers[key] = nbytes
+    buffers[("index", id(df))] = int(df.index.memory_usage(deep=True))
+    return buffers
+
+
+class FrameCache:
+    """
+    Process-wide LRU cache of loaded DataFrames keyed by (dataset_id, version).
+    The version changes whenever a dataset is rewritten, so stale entries are never served.
+    Up to `versions_per_dataset` versions of a dataset are kept; memory is accounted
+    per column buffer, so versions sharing columns are charged for them once.
+    """
+
+    def __init__(self, max_bytes: int, versions_per_dataset: int = 1):
+        self.max_bytes = max_bytes
+        self.versions_per_dataset = versions_per_dataset
+        self._entries = OrderedDict()  # (dataset_id, version) -> (df, buffer keys, frame bytes)
+        self._buffers = {}  # buffer key -> [entries holding it, bytes]
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.frame_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+
+    def get(self, dataset_id: str, version) -> pd.DataFrame | None:
+        found = self.nearest(dataset_id, [version])
+        return None if found is None else found[1]
+
+    def nearest(self, dataset_id: str, versions: list) -> tuple | None:
+        """
+        The first of `versions` that is cached, as (version, frame); counted as one
+        hit or miss. Lets a version be derived from its closest cached ancestor.
+        """
+        with self._lock:
+            for version in versions:
+                entry = self._entries.get((dataset_id, version))
+                if entry is not None:
+                    self._entries.move_to_end((dataset_id, version))
+                    self.hits += 1
+                    break
+            else:
+                self.misses += 1
+                return None
+        return version, _handout(entry[0])
+
+    def versions(self, dataset_id: str) -> list:
+        with self._lock:
+            return [key[1] for key in self._entries if key[0] == dataset_id]
+
+    def put(self, dataset_id: str, version, df: pd.DataFrame) -> pd.DataFrame:
+        """Cache a frame and return the caller's copy of it (see _handout)."""
+        buffers = _column_buffers(df)
+        nbytes = sum(buffers.values())
+        if nbytes > self.max_bytes:
+            return df
+
+        with self._lock:
+            self._remove((dataset_id, version))
+            # Keep the dataset's most recently used versions only
+            others = [key for key in self._entries if key[0] == dataset_id]
+            for key in others[:max(len(others) - self.versions_per_dataset + 1, 0)]:
+                self._remove(key)
+            for key, size in buffers.items():
+                holders = self._buffers.setdefault(key, [0, size])
+                if holders[0] == 0:
+                    self.current_bytes += size
+                holders[0] += 1
+            self._entries[(dataset_id, version)] = (df, list(buffers), nbytes)
+            self.frame_bytes += nbytes
+            while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+                freed = self._remove(next(iter(self._entries)))
+                self.evictions += 1
+                self.evicted_bytes += freed
+        return _handout(df)
+
+    def invalidate(self, dataset_id: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == dataset_id]:
+                self._remove(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                # Bytes the cached frames would take without shared columns
+                "shared_bytes": self.frame_bytes - self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "evicted_bytes": self.evicted_bytes,
+            }
+
+    def _remove(self, key) -> int:
+        """Drop an entry (if cached); returns the bytes freed (buffers no other entry holds)."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return 0
+        _, buffers, nbytes = entry
+        self.frame_bytes -= nbytes
+        freed = 0
+        for buffer in buffers:
+            holders = self._buffers[buffer]
+            holders[0] -= 1
+            if holders[0] == 0:
+                freed += holders[1]
+                del self._buffers[buffer]
+        self.current_bytes -= freed
+        return freed
+
+
+frame_cache = FrameCache(DATASET_CACHE_MAX_MB * 1024 * 1024, DATASET_CACHE_VERSIONS)
+# (keyed by (dataset version, sample spec): one sample per dataset is kept)
+sample_cache = FrameCache(SAMPLE_CACHE_MAX_MB * 1024 * 1024)
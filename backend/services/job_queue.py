@@ -0,0 +1,243 @@
+# services/job_queue.py
+
+import os
+import time
+import uuid
+import socket
+import sqlite3
+import threading
+import traceback
+from contextlib import contextmanager
+from utils.json_sanitizer import dumps, loads
+
+# 📁 Background jobs live in a local SQLite file: queued and interrupted jobs survive a restart
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join(BASE_DIR, "storage", "jobs.sqlite3"))
+
+# 🧵 Worker threads per server process that run queued jobs
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+
+# Seconds an idle worker waits before looking for new jobs again
+JOB_POLL_INTERVAL_S = float(os.getenv("JOB_POLL_INTERVAL_S", "1.0"))
+
+# Runs of a job interrupted by a restart before it is marked failed instead of requeued
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "2"))
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+FINISHED_STATUSES = {"succeeded", "failed", "cancelled"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress TEXT NOT NULL DEFAULT '{}',
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, created_at);
+"""
+
+_JSON_FIELDS = ("params", "progress", "result")
+
+
+class JobCancelled(Exception):
+    """Raised (from a progress report) inside a job whose cancellation was requested."""
+
+
+class JobQueue:
+    """
+    Persistent FIFO of background jobs in SQLite, run by worker threads of the
+    server process. A job is a kind (with a registered handler), JSON parameters,
+    a status and a JSON progress record. Handlers are called as
+    handler(job, report), with the job's record (id, params, created_at...), where
+    report(progress) stores the job's progress and raises JobCancelled once a
+    cancellation was requested: cancelling is cooperative, a running job stops at
+    its next report. Whatever the handler
+    returns (JSON-ready) is the job's result. A job that fails or is cancelled gets
+    its status as its progress "stage", since its last report is no longer current.
+    Jobs are claimed atomically, so several server processes can share the file;
+    a job whose worker process is gone is requeued when workers start.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.handlers = {}
+        self._threads = []
+        self._lock = threading.Lock()
+        self._worker = f"{socket.gethostname()}:{os.getpid()}"
+        self._ready = False
+
+    @contextmanager
+    def _connect(self):
+        # A short-lived autocommit connection per operation (each statement is its own transaction)
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            if not self._ready:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.executescript(_SCHEMA)
+                self._ready = True
+            db.row_factory = sqlite3.Row
+            yield db
+        finally:
+            db.close()
+
+    @staticmethod
+    def _job(row: sqlite3.Row | None) -> dict | None:
+        if row is None:
+            return None
+        job = dict(row)
+        for field in _JSON_FIELDS:
+            job[field] = loads(job[field]) if job[field] is not None else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def register(self, kind: str, handler) -> None:
+        self.handlers[kind] = handler
+
+    def submit(self, kind: str, params: dict) -> dict:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind '{kind}'.")
+        job_id = str(uuid.uuid4())
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO jobs (id, kind, params, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, kind, dumps(params).decode(), time.time()),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> dict | None:
+        with self._connect() as db:
+            return self._job(db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def recent(self, kind: str = None, limit: int = 50) -> list[dict]:
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT * FROM jobs WHERE ? IS NULL OR kind = ? ORDER BY created_at DESC LIMIT ?",
+                (kind, kind, limit),
+            ).fetchall()
+        return [self._job(row) for row in rows]
+
+    def cancel(self, job_id: str) -> dict | None:
+        """A queued job is cancelled at once; a running one is asked to stop at its next report."""
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = 'cancelled', cancel_requested = 1, finished_at = ?, "
+                "progress = json_set(progress, '$.stage', 'cancelled') WHERE id = ? AND status = 'queued'", (now, job_id),
+            )
+            db.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,))
+        return self.get(job_id)
+
+    def _claim(self) -> dict | None:
+        # One statement: a job is claimed by exactly one worker, whichever process it runs in
+        with self._connect() as db:
+            row = db.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, worker = ?, attempts = attempts + 1 "
+                "WHERE id = (SELECT id FROM jobs WHERE status = 'queued' AND kind IN ({}) "
+                "ORDER BY created_at LIMIT 1) RETURNING *".format(",".join("?" * len(self.handlers))),
+                (time.time(), self._worker, *self.handlers),
+            ).fetchone()
+        return self._job(row)
+
+    def _report(self, job_id: str, progress: dict) -> None:
+        with self._connect() as db:
+            row = db.execute(
+                "UPDATE jobs SET progress = ? WHERE id = ? RETURNING cancel_requested",
+                (dumps(progress).decode(), job_id),
+            ).fetchone()
+        if row is not None and row["cancel_requested"]:
+            raise JobCancelled(job_id)
+
+    def _finish(self, job_id: str, status: str, result=None, error: str = None) -> None:
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, "
+                "progress = CASE WHEN ? = 'succeeded' THEN progress ELSE json_set(progress, '$.stage', ?) END "
+                "WHERE id = ?",
+                (status, dumps(result).decode() if result is not None else None, error, time.time(),
+                 status, status, job_id),
+            )
+
+    def run_job(self, job: dict) -> None:
+        try:
+            result = self.handlers[job["kind"]](job, lambda progress: self._report(job["id"], progress))
+            self._finish(job["id"], "succeeded", result)
+        except JobCancelled:
+            self._finish(job["id"], "cancelled")
+        except Exception as e:
+            traceback.print_exc()
+            self._finish(job["id"], "failed", error=str(e))
+
+    def _work(self) -> None:
+        while True:
+            try:
+                job = self._claim()
+            except sqlite3.Error:
+                traceback.print_exc()
+                job = None
+            if job is None:
+                time.sleep(JOB_POLL_INTERVAL_S)
+                continue
+            self.run_job(job)
+
+    def _recover(self) -> None:
+        """
+        Requeue the running jobs of this host's workers that no longer exist (e.g. before
+        a restart). Jobs claimed on other hosts are left alone: their liveness cannot be
+        checked from here, and each host recovers its own when its server starts again.
+        """
+        host = socket.gethostname()
+        with self._connect() as db:
+            for row in db.execute("SELECT id, worker, attempts, cancel_requested FROM jobs WHERE status = 'running'").fetchall():
+                worker_host, _, pid = (row["worker"] or "").rpartition(":")
+                if worker_host != host:
+                    continue
+                # (this process has not claimed anything yet: a job under its name is a previous
+                # process's with the same pid, as after a container restart)
+                if row["worker"] != self._worker and pid.isdigit() and _alive(int(pid)):
+                    continue
+                if row["cancel_requested"]:
+                    status, error = "cancelled", None
+                elif row["attempts"] >= JOB_MAX_ATTEMPTS:
+                    status, error = "failed", "Interrupted too many times (server restarts)."
+                else:
+                    status, error = "queued", None
+                db.execute(
+                    "UPDATE jobs SET status = ?, error = ?, worker = NULL, finished_at = ?, "
+                    "progress = CASE WHEN ? = 'queued' THEN progress ELSE json_set(progress, '$.stage', ?) END "
+                    "WHERE id = ? AND status = 'running'",
+                    (status, error, time.time() if status != "queued" else None, status, status, row["id"]),
+                )
+
+    def start(self, workers: int = JOB_WORKERS) -> None:
+        """Recover interrupted jobs and start the worker threads (once per process)."""
+        with self._lock:
+            if self._threads:
+                return
+            self._recover()
+            for i in range(workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+job_queue = JobQueue(JOB_DB_PATH)
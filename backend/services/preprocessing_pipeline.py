@@ -0,0 +1,289 @@
+# services/preprocessing_pipeline.py
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.preprocessing import StandardScaler
+from ml_engine.categorical_encoder import ENCODING_HASH_FEATURES, CategoricalEncoder
+from ml_engine.outlier_engine import OutlierEngine
+from services.dtype_optimizer import apply_schema, optimize_dtypes
+
+ID_COLUMN_NAMES = ["id", "index", "row_id", "observation_id"]
+
+# Actions whose fitted step drops rows instead of rewriting values
+ROW_FILTER_ACTIONS = {"outliers"}
+
+
+def _is_id_column(col) -> bool:
+    # Same rule as the ml-logic transforms: ID-like columns are never imputed, encoded or scaled
+    name = str(col).lower()
+    return name.endswith("id") or name in ID_COLUMN_NAMES
+
+
+def _python(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _is_categorical(series: pd.Series) -> bool:
+    return series.dtype == "object" or isinstance(series.dtype, pd.CategoricalDtype)
+
+
+def numeric_features(df: pd.DataFrame, target_column: str = None) -> list:
+    """Non-ID numeric columns other than the target (imputed, scaled and checked for outliers)."""
+    return [
+        col for col in df.select_dtypes(include=[np.number]).columns
+        if col != target_column and not _is_id_column(col)
+    ]
+
+
+def categorical_features(df: pd.DataFrame, categorical_columns: list) -> list:
+    """The requested categorical columns that exist and are not ID-like."""
+    return [col for col in categorical_columns or [] if col in df.columns and not _is_id_column(col)]
+
+
+# ---------------------------------------------------------
+# Fitting: each function learns the parameters of one /preprocess/ action
+# from the current frame, with the same column rules as the ml-logic transforms
+# (handle_missing, encode_data, scale_data, and the outlier detectors of OutlierEngine)
+# ---------------------------------------------------------
+
+def _fit_missing(df: pd.DataFrame, target_column: str, categorical_columns: list) -> dict:
+    fill = {}
+    # Mean of non-ID numeric columns (only the ones that have gaps need a value)
+    gaps = [col for col in numeric_features(df) if df[col].isna().any()]
+    if gaps:
+        means = df[gaps].mean()
+        fill.update({col: float(means[col]) for col in gaps if pd.notna(means[col])})
+    # Mode of the categorical columns
+    for col in categorical_features(df, categorical_columns):
+        if col not in fill and df[col].isna().any():
+            mode_values = df[col].mode()
+            if not mode_values.empty:
+                fill[col] = _python(mode_values[0])
+    return {"fill": fill}
+
+
+def _fit_encoding(df: pd.DataFrame, target_column: str, categorical_columns: list, strategy: str = "ordinal") -> dict:
+    columns = categorical_features(df, categorical_columns)
+    target = df[target_column] if target_column and target_column in df.columns else None
+    params = {"classes": {}}
+    if strategy == "auto":
+        # Training: each feature column gets the encoding its cardinality calls for
+        usable = target is not None and CategoricalEncoder.target_usable(target)
+        y = None
+        for col in columns:
+            labels = CategoricalEncoder.factorize(df[col])[1]
+            chosen = CategoricalEncoder.choose_strategy(len(labels), usable)
+            if chosen == "ordinal":
+                params["classes"][col] = labels.tolist()
+            elif chosen == "target":
+                if y is None:
+                    y = CategoricalEncoder.factorize(target)[0] if _is_categorical(target) else target.to_numpy(np.float64)
+                params.setdefault("target", {})[col] = CategoricalEncoder.fit_target(df[col], y)
+            else:
+                params.setdefault("hashed", {"columns": [], "n_features": ENCODING_HASH_FEATURES})["columns"].append(col)
+    else:
+        params["classes"] = {col: CategoricalEncoder.classes(df[col]) for col in columns}
+    # The target is always label encoded
+    if target is not None and target_column not in params["classes"] and _is_categorical(target):
+        params["classes"][target_column] = CategoricalEncoder.classes(target)
+    return params
+
+
+def _fit_scaling(df: pd.DataFrame, target_column: str, categorical_columns: list, skip: set = frozenset()) -> dict:
+    columns = [col for col in numeric_features(df, target_column) if col not in skip]
+    if not columns:
+        return {"mean": {}, "scale": {}}
+    scaler = StandardScaler().fit(df[columns])
+    return {
+        "mean": dict(zip(columns, scaler.mean_.tolist())),
+        "scale": dict(zip(columns, scaler.scale_.tolist())),
+    }
+
+
+def _fit_outliers(df: pd.DataFrame, target_column: str, categorical_columns: list, method: str = "iqr") -> dict | None:
+    columns = numeric_features(df, target_column)
+    # Every detector is fitted on the whole frame (see OutlierEngine)
+    return OutlierEngine.fit(df, columns, method)
+
+
+# ---------------------------------------------------------
+# Applying: row-local given the fitted parameters, so a step can be applied
+# to the whole frame, a column subset or a single record batch alike
+# ---------------------------------------------------------
+
+def _apply_missing(df: pd.DataFrame, params: dict) -> pd.DataFrame:
+    fill = {col: value for col, value in params["fill"].items() if col in df.columns}
+    return df.fillna(fill) if fill else df
+
+
+def _apply_encoding(df: pd.DataFrame, params: dict) -> pd.DataFrame:
+    ordinal = [col for col in params["classes"] if col in df.columns]
+    target = [col for col in params.get("target", {}) if col in df.columns]
+    if not ordinal and not target:
+        return df
+    df = df.copy(deep=False)
+    for col in ordinal:
+        df[col] = CategoricalEncoder.ordinal(df[col], params["classes"][col])
+    for col in target:
+        df[col] = CategoricalEncoder.target(df[col], params["target"][col])
+    # (hashed columns stay as they are: they only exist as sparse model features, see model_matrix)
+    return df
+
+
+def _apply_scaling(df: pd.DataFrame, params: dict) -> pd.DataFrame:
+    columns = [col for col in params["mean"] if col in df.columns]
+    if not columns:
+        return df
+    # (float dtype: parameters of all-NaN columns are stored as null)
+    mean = np.array([params["mean"][col] for col in columns], dtype=np.float64)
+    scale = np.array([params["scale"][col] for col in columns], dtype=np.float64)
+    df = df.copy(deep=False)
+    df[columns] = (df[columns].to_numpy(dtype=np.float64, na_value=np.nan) - mean) / scale
+    return df
+
+
+def _apply_outliers(df: pd.DataFrame, params: dict) -> pd.DataFrame:
+    # One inlier mask over all the detector's columns, one filter
+    return df[OutlierEngine.inlier_mask(df, params)].reset_index(drop=True)
+
+
+STEPS = {
+    "missing": (_fit_missing, _apply_missing),
+    "encoding": (_fit_encoding, _apply_encoding),
+    "scaling": (_fit_scaling, _apply_scaling),
+    "outliers": (_fit_outliers, _apply_outliers),
+}
+
+
+def step_columns(step: dict) -> list:
+    """Columns whose values a step rewrites (row filters rewrite none)."""
+    params = step["params"]
+    if step["action"] == "missing":
+        return list(params["fill"])
+    if step["action"] == "encoding":
+        return list(params["classes"]) + list(params.get("target", {}))
+    if step["action"] == "scaling":
+        return list(params["mean"])
+    return []
+
+
+class PreprocessingPipeline:
+    """
+    The /preprocess/ actions applied to a dataset, as fitted steps over its raw
+    columnar data: imputation values, label-encoder classes, scaler means and
+    scales, outlier detectors. Each step also records the compact dtypes of its output
+    (what rewriting the dataset used to store) and the row count after it.
+    A dataset's pipeline is the chain of steps of a version in its VersionLog.
+    """
+
+    def __init__(self, steps: list = None):
+        self.steps = list(steps or [])
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PreprocessingPipeline":
+        return cls(data.get("steps", []))
+
+    def to_dict(self) -> dict:
+        return {"steps": self.steps}
+
+    def copy(self) -> "PreprocessingPipeline":
+        return PreprocessingPipeline(self.steps)
+
+    @property
+    def actions(self) -> list[str]:
+        return [step["action"] for step in self.steps]
+
+    @property
+    def rows(self) -> int | None:
+        """Row count after the last step (None for an empty pipeline)."""
+        return self.steps[-1]["rows"] if self.steps else None
+
+    def filters_rows(self) -> bool:
+        return any(step["action"] in ROW_FILTER_ACTIONS for step in self.steps)
+
+    def input_columns(self, columns: list) -> list:
+        """Raw columns needed to produce `columns`: row filters also read the columns they test."""
+        needed = list(columns)
+        for step in self.steps:
+            if step["action"] in ROW_FILTER_ACTIONS:
+                needed += [col for col in OutlierEngine.columns(step["params"]) if col not in needed]
+        return needed
+
+    def fit_step(self, action: str, df: pd.DataFrame, target_column: str = None,
+                 categorical_columns: list = None, **fit_options) -> pd.DataFrame:
+        """
+        Fit `action` on `df` (the output of the steps so far), append it and return
+        the transformed frame, identical to what `transform` produces from raw data.
+        """
+        if action not in STEPS:
+            raise ValueError(f"Unknown preprocessing action '{action}'.")
+        fit, _ = STEPS[action]
+        step = {"action": action, "params": fit(df, target_column, categorical_columns, **fit_options)}
+        if not step["params"] or not any(step["params"].values()):
+            # Nothing to impute, encode, scale or bound: no step, no rewrite
+            return df
+        # Dtypes are fixed at fit time, so every batch transformed later gets the same ones
+        out, step["schema"] = optimize_dtypes(self._apply(step, df))
+        step["rows"] = len(out)
+        self.steps.append(step)
+        return out
+
+    @staticmethod
+    def _apply(step: dict, df: pd.DataFrame) -> pd.DataFrame:
+        return STEPS[step["action"]][1](df, step["params"])
+
+    def transform(self, df: pd.DataFrame, start: int = 0) -> pd.DataFrame:
+        """
+        Apply the fitted steps to raw data (a whole frame, columns of it, or one batch).
+        With `start`, `df` is the output of the first `start` steps and only the rest are applied.
+        """
+        for step in self.steps[start:]:
+            df = apply_schema(self._apply(step, df), step["schema"])
+        return df
+
+    def extend_for_training(self, df: pd.DataFrame, target_column: str, categorical_columns: list) -> pd.DataFrame:
+        """
+        Fit the imputation, encoding and scaling that model training needs on top of
+        the recorded steps, reusing them: only columns that still have gaps are
+        imputed, still-categorical columns encoded, and columns not already scaled
+        (and not rewritten since) scaled. Categorical features are encoded by
+        cardinality (see CategoricalEncoder). Returns the model-ready frame.
+        """
+        scaled = set()
+        for step in self.steps:
+            rewritten = set(step_columns(step))
+            scaled = (scaled - rewritten) | (rewritten if step["action"] == "scaling" else set())
+
+        df = self.fit_step("missing", df, target_column, categorical_columns)
+        n_steps = len(self.steps)
+        encoded = self.fit_step("encoding", df, target_column, categorical_columns, strategy="auto")
+        if len(self.steps) > n_steps and self.steps[-1]["params"].get("target"):
+            # The training rows themselves are target encoded out of fold (new rows,
+            # through transform, get the all-rows means)
+            y = encoded[target_column].to_numpy(np.float64)
+            encoded = encoded.copy(deep=False)
+            for col in self.steps[-1]["params"]["target"]:
+                encoded[col] = CategoricalEncoder.target_out_of_fold(df[col], y).astype(encoded[col].dtype)
+        return self.fit_step("scaling", encoded, target_column, categorical_columns, skip=scaled)
+
+    def model_matrix(self, df: pd.DataFrame, target_column: str) -> tuple:
+        """
+        Features of a model-ready frame and their names. Columns the encoding step
+        hashed are added as a sparse block, and then the whole matrix is a CSR
+        matrix (the dense columns are not duplicated as a dense array); otherwise
+        it is the frame itself.
+        """
+        hashed = {}
+        for step in self.steps:
+            if step["action"] == "encoding" and "hashed" in step["params"]:
+                hashed = step["params"]["hashed"]
+        features = df.drop(columns=[target_column] + hashed.get("columns", []))
+        if not hashed:
+            return features, list(features.columns)
+        matrix = sp.hstack([
+            sp.csr_matrix(features.to_numpy(dtype=np.float64, na_value=np.nan)),
+            CategoricalEncoder.hashed(df, hashed["columns"], hashed["n_features"]),
+        ], format="csr")
+        names = list(features.columns) + [f"hash_{i}" for i in range(hashed["n_features"])]
+        return matrix, names
@@ -0,0 +1,149 @@
+# services/profile_cache.py
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from utils.json_sanitizer import dump_json, load_json
+
+# 📁 Persisted profiling results (one JSON file per dataset state + target)
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+PROFILE_DIR = os.path.join(BASE_DIR, "storage", "profiles")
+os.makedirs(PROFILE_DIR, exist_ok=True)
+
+# 🧠 Results kept in memory (they are small; the disk copy survives restarts)
+PROFILE_CACHE_ENTRIES = int(os.getenv("PROFILE_CACHE_ENTRIES", "256"))
+
+# Versions of one dataset whose results are kept (undo/redo/checkout move between them)
+PROFILE_CACHE_VERSIONS = int(os.getenv("PROFILE_CACHE_VERSIONS", "8"))
+
+
+class ProfileCache:
+    """
+    Two-level (memory LRU + disk) cache of JSON-ready profiling results.
+    Entries are keyed by the dataset's content fingerprint (raw data hash, content hash
+    and version, see dataset_store.dataset_fingerprint) plus the target column and a
+    result kind, so a rewritten dataset can never be served a stale result.
+    The results of up to `versions_per_dataset` versions of a dataset are kept (the most
+    recently used); all of them are dropped once the raw data is replaced.
+    """
+
+    def __init__(self, directory: str, max_entries: int, versions_per_dataset: int = 1):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.versions_per_dataset = versions_per_dataset
+        self._entries = OrderedDict()  # (dataset_id, file name) -> result
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _file_name(fingerprint: dict, target_column: str | None, kind: str) -> str:
+        # <raw hash>_<content hash>_<version>_<target digest>_<kind>.json (kind must not contain "_")
+        target = hashlib.blake2b((target_column or "").encode(), digest_size=8).hexdigest()
+        version = "-".join(str(part) for part in fingerprint["version"])
+        raw = fingerprint.get("raw_hash", fingerprint["content_hash"])
+        return f"{raw[:16]}_{fingerprint['content_hash'][:32]}_{version}_{target}_{kind}.json"
+
+    @staticmethod
+    def _version_of(name: str) -> str:
+        # (raw hash, content hash and version: one dataset version)
+        return "_".join(name.split("_")[:3])
+
+    def _dataset_dir(self, dataset_id: str) -> str:
+        return os.path.join(self.directory, dataset_id)
+
+    def get(self, dataset_id: str, fingerprint: dict, target_column: str | None, kind: str) -> dict | None:
+        name = self._file_name(fingerprint, target_column, kind)
+        with self._lock:
+            result = self._entries.get((dataset_id, name))
+            if result is not None:
+                self._entries.move_to_end((dataset_id, name))
+                self.hits += 1
+        path = os.path.join(self._dataset_dir(dataset_id), name)
+        if result is not None:
+            self._touch(path)
+            return result
+
+        try:
+            result = load_json(path)
+            self._touch(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            self._remember((dataset_id, name), result)
+        return result
+
+    def put(self, dataset_id: str, fingerprint: dict, target_column: str | None, kind: str, result: dict) -> None:
+        name = self._file_name(fingerprint, target_column, kind)
+        directory = self._dataset_dir(dataset_id)
+        os.makedirs(directory, exist_ok=True)
+
+        # Results computed from replaced raw data can never be requested again; the other
+        # versions' results stay until more than `versions_per_dataset` versions have some
+        raw, version = name.split("_")[0] + "_", self._version_of(name)
+        files = os.listdir(directory)
+        stale = {old for old in files if not old.startswith(raw)}
+        last_used = {}
+        for old in files:
+            if old not in stale and self._version_of(old) != version:
+                try:
+                    mtime = os.stat(os.path.join(directory, old)).st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                last_used[self._version_of(old)] = max(mtime, last_used.get(self._version_of(old), 0))
+        evicted = set(sorted(last_used, key=last_used.get, reverse=True)[max(self.versions_per_dataset - 1, 0):])
+        stale.update(old for old in files if self._version_of(old) in evicted)
+        for old in stale:
+            try:
+                os.remove(os.path.join(directory, old))
+            except FileNotFoundError:
+                pass
+
+        dump_json(result, os.path.join(directory, name))
+
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == dataset_id and k[1] in stale]:
+                del self._entries[key]
+            self._remember((dataset_id, name), result)
+
+    def invalidate(self, dataset_id: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == dataset_id]:
+                del self._entries[key]
+        directory = self._dataset_dir(dataset_id)
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                os.remove(os.path.join(directory, name))
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    @staticmethod
+    def _touch(path: str) -> None:
+        # The file's mtime is its version's last use (eviction order in put)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _remember(self, key, result: dict) -> None:
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+profile_cache = ProfileCache(PROFILE_DIR, PROFILE_CACHE_ENTRIES, PROFILE_CACHE_VERSIONS)
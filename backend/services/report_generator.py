@@ -25,6 +25,41 @@ def _safe(value, decimals: int = 4) -> str:
     return str(value)
 
 
+def _algorithm_label(model: dict) -> str:
+    """Leaderboard name; a candidate eliminated by racing says how much data it saw."""
+    name = model.get("name", "Unknown")
+    if model.get("eliminated"):
+        return f"{name} (eliminated at {model.get('trained_rows', 0):,} rows)"
+    return name
+
+
+RACING_HEADERS = ["Rung", "Rows", "Algorithm", "Score", "Outcome"]
+
+
+def _racing_summary(racing: dict) -> str:
+    return (
+        f"Successive halving (eta = {racing.get('eta')}): each rung keeps the best 1/{racing.get('eta')} "
+        f"of the candidates, scored on {racing.get('eval_rows', 0):,} test rows. "
+        f"Finalists, trained on all {racing.get('train_rows', 0):,} training rows: "
+        f"{', '.join(racing.get('finalists', [])) or 'none'}."
+    )
+
+
+def _racing_rows(racing: dict) -> list[list[str]]:
+    """One row per candidate per rung: rung, training rows, candidate, score, outcome."""
+    rows = []
+    for i, rung in enumerate(racing.get("rungs", []), 1):
+        for candidate in rung.get("candidates", []):
+            rows.append([
+                str(i),
+                f"{rung.get('rows', 0):,}",
+                candidate.get("name", "Unknown"),
+                _safe(candidate.get("score")) if candidate.get("score") is not None else "failed",
+                "promoted" if candidate.get("promoted") else "eliminated",
+            ])
+    return rows
+
+
 def _chart_to_tmp(buf: io.BytesIO) -> str | None:
     """Write a chart BytesIO to a temp PNG file; return path or None."""
     import tempfile
@@ -98,7 +133,7 @@ class ReportGenerator:
             for i, m in enumerate(models, 1):
                 row = tbl.add_row().cells
                 row[0].text = str(i)
-                row[1].text = m.get("name", "Unknown")
+                row[1].text = _algorithm_label(m)
                 row[2].text = f"{m.get('accuracy', 0)}%"
                 row[3].text = f"{m.get('f1_score', 'N/A')}%"
                 row[4].text = _safe(m.get("training_time", 0))
@@ -110,6 +145,19 @@ class ReportGenerator:
                     doc.add_picture(plot_buf, width=Inches(6))
             except Exception as e:
                 doc.add_paragraph(f"[Chart error: {e}]")
+
+            racing = automl.get("racing")
+            if racing and racing.get("rungs"):
+                doc.add_heading("Candidate Racing", level=2)
+                doc.add_paragraph(_racing_summary(racing))
+                tbl = doc.add_table(rows=1, cols=len(RACING_HEADERS))
+                tbl.style = "Table Grid"
+                for i, h in enumerate(RACING_HEADERS):
+                    tbl.rows[0].cells[i].text = h
+                for values in _racing_rows(racing):
+                    row = tbl.add_row().cells
+                    for i, value in enumerate(values):
+                        row[i].text = value
         else:
             doc.add_paragraph("No model results found.")
 
@@ -291,7 +339,7 @@ class ReportGenerator:
             for i, m in enumerate(models, 1):
                 rows.append([
                     p(str(i)),
-                    p(m.get("name", "Unknown")),
+                    p(_algorithm_label(m)),
                     p(f"{m.get('accuracy', 0)}%"),
                     p(f"{m.get('f1_score', 'N/A')}%"),
                     p(_safe(m.get("training_time", 0))),
@@ -313,6 +361,17 @@ class ReportGenerator:
                         story.append(Spacer(1, 6))
             except Exception:
                 pass
+
+            racing = automl.get("racing")
+            if racing and racing.get("rungs"):
+                story.append(h("Candidate Racing", h2_style))
+                story.append(p(_racing_summary(racing)))
+                rows = [[Paragraph(f"<b>{h_}</b>", body) for h_ in RACING_HEADERS]]
+                rows += [[p(value) for value in values] for values in _racing_rows(racing)]
+                tbl = Table(rows, colWidths=[1.5 * cm, 2.5 * cm, 5.5 * cm, 2.5 * cm, 3 * cm])
+                tbl.setStyle(base_table_style())
+                story.append(tbl)
+                story.append(Spacer(1, 6))
         else:
             story.append(p("No model results found."))
         story.append(Spacer(1, 8))
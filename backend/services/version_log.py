@@ -0,0 +1,122 @@
+# services/version_log.py
+
+import time
+from services.preprocessing_pipeline import ROW_FILTER_ACTIONS, PreprocessingPipeline, step_columns
+
+
+class VersionLog:
+    """
+    Append-only history of a dataset's preprocessing. Version 0 is the raw columnar
+    copy; every applied action adds a version that holds its one fitted step and a
+    link to its parent, so a version's data is its chain of steps replayed over the
+    raw columns and what a version stores grows with the columns its step rewrites.
+    `head` is the version reads return: undo moves it to its parent, redo to its
+    latest child, and an action applied after an undo starts a new branch (the
+    undone versions are kept, and stay addressable for comparisons).
+    Serialized as JSON next to the dataset (see dataset_store).
+    """
+
+    def __init__(self, versions: list = None, head: int = 0):
+        self.versions = list(versions or [{"id": 0, "parent": None, "step": None, "created_at": None}])
+        self.head = head
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "VersionLog":
+        if "versions" in data:
+            return cls(data["versions"], data["head"])
+        # A pipeline recorded before versions were: one linear chain
+        log = cls()
+        log.commit(PreprocessingPipeline.from_dict(data), timestamped=False)
+        return log
+
+    def to_dict(self) -> dict:
+        return {"versions": self.versions, "head": self.head}
+
+    def copy(self) -> "VersionLog":
+        # (versions are never modified once appended: sharing them is safe)
+        return VersionLog(self.versions, self.head)
+
+    def __contains__(self, version) -> bool:
+        return isinstance(version, int) and 0 <= version < len(self.versions)
+
+    def chain(self, version: int = None) -> list[int]:
+        """Versions from the first step to `version` (default: the head); [] for the raw data."""
+        version = self.head if version is None else version
+        chain = []
+        while version:
+            chain.append(version)
+            version = self.versions[version]["parent"]
+        return chain[::-1]
+
+    def pipeline(self, version: int = None) -> PreprocessingPipeline:
+        """The steps that produce `version` (default: the head) from the raw columns."""
+        return PreprocessingPipeline([self.versions[v]["step"] for v in self.chain(version)])
+
+    def commit(self, pipeline: PreprocessingPipeline, timestamped: bool = True) -> int:
+        """
+        Append the steps of `pipeline` after the head's own (it is the head's pipeline
+        with steps fitted on top, see load_pipeline) as new versions, each a child of
+        the previous one; the last becomes the head, which is returned.
+        """
+        for step in pipeline.steps[len(self.chain()):]:
+            self.versions.append({
+                "id": len(self.versions),
+                "parent": self.head,
+                "step": step,
+                "created_at": time.time() if timestamped else None,
+            })
+            self.head = len(self.versions) - 1
+        return self.head
+
+    def undo_target(self) -> int | None:
+        return self.versions[self.head]["parent"]
+
+    def redo_target(self) -> int | None:
+        # The most recently created child: the branch that was last worked on
+        children = [v["id"] for v in self.versions if v["parent"] == self.head]
+        return max(children) if children else None
+
+    def common_ancestor(self, a: int, b: int) -> int:
+        ancestors = set(self.chain(a))
+        for version in reversed(self.chain(b)):
+            if version in ancestors:
+                return version
+        return 0
+
+    def describe(self, version: int, raw_rows: int = None) -> dict:
+        """Summary of a version: its action, the columns it rewrote and its row count."""
+        entry = self.versions[version]
+        step = entry["step"]
+        return {
+            "version": version,
+            "parent": entry["parent"],
+            "action": step["action"] if step else None,
+            "columns": step_columns(step) if step else [],
+            "rows": step["rows"] if step else raw_rows,
+            "created_at": entry["created_at"],
+            "head": version == self.head,
+        }
+
+    def compare(self, a: int, b: int, raw_rows: int = None) -> dict:
+        """
+        How versions `a` and `b` differ, from the log alone: the steps each has beyond
+        their common ancestor, and the columns those steps rewrote. When either side
+        filtered rows, every column differs.
+        """
+        base = self.common_ancestor(a, b)
+        sides = {}
+        for name, version in (("a", a), ("b", b)):
+            chain = self.chain(version)
+            sides[name] = [self.versions[v]["step"] for v in chain[chain.index(base) + 1 if base else 0:]]
+        changed = set()
+        for step in sides["a"] + sides["b"]:
+            changed.update(step_columns(step))
+        return {
+            "a": self.describe(a, raw_rows),
+            "b": self.describe(b, raw_rows),
+            "common_ancestor": base,
+            "actions_only_in_a": [step["action"] for step in sides["a"]],
+            "actions_only_in_b": [step["action"] for step in sides["b"]],
+            "rows_differ": any(step["action"] in ROW_FILTER_ACTIONS for step in sides["a"] + sides["b"]),
+            "changed_columns": sorted(changed, key=str),
+        }
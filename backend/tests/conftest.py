@@ -0,0 +1,47 @@
+import os
+import sys
+import uuid
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ML_LOGIC_DIR = os.path.join(os.path.dirname(BACKEND_DIR), "ml-logic")
+for path in (ML_LOGIC_DIR, BACKEND_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import pandas as pd  # noqa: E402
+
+# As in main.py: cached frames are shared with the callers that load them
+pd.set_option("mode.copy_on_write", True)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """services.dataset_store writing under a temporary directory (datasets and cached profiles)."""
+    from services import dataset_store
+    from services.profile_cache import profile_cache
+
+    datasets = tmp_path / "datasets"
+    datasets.mkdir()
+    monkeypatch.setattr(dataset_store, "DATASET_DIR", str(datasets))
+    monkeypatch.setattr(profile_cache, "directory", str(tmp_path / "profiles"))
+    return dataset_store
+
+
+@pytest.fixture
+def dataset_id():
+    return str(uuid.uuid4())
+
+
+@pytest.fixture
+def client(store):
+    """A TestClient over the routers that need no optional ML dependencies, on the temporary store."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from routes import upload, profiling, preprocess, recommendation, report
+    from utils.json_sanitizer import FastJSONResponse
+
+    app = FastAPI(default_response_class=FastJSONResponse)
+    for route in (upload, profiling, preprocess, recommendation, report):
+        app.include_router(route.router)
+    return TestClient(app)
@@ -0,0 +1,116 @@
+import math
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("xgboost")
+
+from ml_engine import candidate_racing  # noqa: E402
+from ml_engine.candidate_racing import race_candidates, stratified_order  # noqa: E402
+
+
+def test_every_prefix_of_the_order_is_stratified():
+    y = np.repeat(["a", "b", "c"], [600, 300, 100])
+    order = stratified_order(y, seed=1)
+
+    assert sorted(order) == list(range(len(y)))
+    shares = {"a": 0.6, "b": 0.3, "c": 0.1}
+    for prefix in (10, 37, 100, 333, 1000):
+        counts = pd.Series(y[order[:prefix]]).value_counts()
+        for label, share in shares.items():
+            assert abs(counts.get(label, 0) - share * prefix) <= 1.5
+    assert sorted(stratified_order(y, stratify=False)) == list(range(len(y)))
+
+
+def _fake_training(scores, failing=(), calls=None):
+    """train_candidates stand-in: candidate scores by name, `failing` candidates raise."""
+    def train(algorithms, task_type, X_train, y_train, X_test, y_test, on_result=None, poll=None):
+        if calls is not None:
+            calls.append((list(algorithms), len(X_train)))
+        outcomes = []
+        for k, name in enumerate(algorithms):
+            outcome = ValueError(name) if name in failing else \
+                {"metrics": {"accuracy": scores[name]}, "training_time": 0.0, "model": name}
+            outcomes.append(outcome)
+            if on_result:
+                on_result(k, outcome)
+        return outcomes
+    return train
+
+
+def _data(n=1000):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(n, 2)), columns=["a", "b"])
+    y = pd.Series(rng.choice([0, 1], n))
+    return X, y, X.iloc[:200], y.iloc[:200]
+
+
+SCORES = {f"m{i}": float(i) for i in range(9)}  # m8 is the best
+
+
+def test_successive_halving_schedule(monkeypatch):
+    calls = []
+    monkeypatch.setattr(candidate_racing, "train_candidates", _fake_training(SCORES, calls=calls))
+    finals, rungs = {}, []
+
+    outcomes, schedule = race_candidates(list(SCORES), "classification", *_data(), min_rows=50, eta=3, eval_rows=100,
+                                         on_result=finals.__setitem__,
+                                         on_rung_result=lambda i, rows, outcome: rungs.append((i, rows)))
+
+    assert [(len(names), rows) for names, rows in calls] == [(9, 50), (3, 150), (1, 1000)]
+    assert [rung["rows"] for rung in schedule["rungs"]] == [50, 150]
+    assert [c["name"] for c in schedule["rungs"][0]["candidates"] if c["promoted"]] == ["m8", "m7", "m6"]
+    assert schedule["finalists"] == ["m8"] and schedule["eval_rows"] == 100 and schedule["train_rows"] == 1000
+    assert outcomes[8]["trained_rows"] == 1000 and "eliminated" not in outcomes[8]
+    assert outcomes[0]["eliminated"] and outcomes[0]["trained_rows"] == 50
+    assert outcomes[7]["eliminated"] and outcomes[7]["trained_rows"] == 150
+    assert sorted(finals) == list(range(9))
+    assert len(rungs) == 9 + 3
+
+
+def test_failed_candidates_are_never_promoted(monkeypatch):
+    failing = {"m8", "m7", "m6", "m5", "m4", "m3", "m2", "m1"}
+    monkeypatch.setattr(candidate_racing, "train_candidates", _fake_training(SCORES, failing=failing))
+
+    outcomes, schedule = race_candidates(list(SCORES), "classification", *_data(), min_rows=50, eta=2)
+
+    first = schedule["rungs"][0]["candidates"]
+    assert [c["name"] for c in first if c["promoted"]] == ["m0"]
+    assert all(c["score"] is None and not c["promoted"] for c in first if c["name"] in failing)
+    assert schedule["finalists"] == ["m0"]
+    assert all(isinstance(outcomes[i], ValueError) for i in range(1, 9))
+
+
+def test_a_rung_where_every_candidate_fails_ends_the_race(monkeypatch):
+    monkeypatch.setattr(candidate_racing, "train_candidates", _fake_training(SCORES, failing=set(SCORES)))
+
+    outcomes, schedule = race_candidates(list(SCORES), "classification", *_data(), min_rows=50)
+
+    assert schedule["finalists"] == [] and len(schedule["rungs"]) == 1
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+
+
+def test_small_splits_skip_straight_to_the_full_data(monkeypatch):
+    calls = []
+    monkeypatch.setattr(candidate_racing, "train_candidates", _fake_training(SCORES, calls=calls))
+
+    outcomes, schedule = race_candidates(["m1", "m2"], "classification", *_data(n=40), min_rows=100)
+
+    assert schedule["rungs"] == [] and schedule["finalists"] == ["m1", "m2"]
+    assert calls == [(["m1", "m2"], 40)]
+    assert all(outcome["trained_rows"] == 40 for outcome in outcomes)
+
+
+def test_race_with_real_models():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(3000, 3)), columns=list("abc"))
+    y = pd.Series((X["a"] - X["b"] > 0).astype(int))
+    algorithms = ["Decision Tree", "Logistic Regression", "No Such Model"]
+
+    outcomes, schedule = race_candidates(algorithms, "classification", X.iloc[:2400], y.iloc[:2400],
+                                         X.iloc[2400:], y.iloc[2400:], min_rows=200, eta=3, eval_rows=300)
+
+    assert schedule["finalists"] == ["Logistic Regression"]
+    assert isinstance(outcomes[2], Exception)
+    assert outcomes[1]["metrics"]["accuracy"] > 95 and outcomes[1]["trained_rows"] == 2400
+    assert not math.isinf(schedule["rungs"][0]["candidates"][0]["score"])
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+from logic.preprocessing.feature_transformer import _label_encode
+from ml_engine import categorical_encoder
+from ml_engine.categorical_encoder import CategoricalEncoder
+
+
+@pytest.mark.parametrize("series", [
+    pd.Series(["b", "a", None, "c", "a", 10]),
+    pd.Series([3, 1, 2, 3]),
+    pd.Series(["x", "y", None], dtype="category"),
+])
+def test_factorize_matches_label_encoder(series):
+    encoder = LabelEncoder()
+    expected = encoder.fit_transform(series.astype(str))
+
+    codes, labels = CategoricalEncoder.factorize(series)
+
+    np.testing.assert_array_equal(codes, expected)
+    assert labels.tolist() == encoder.classes_.tolist()
+    np.testing.assert_array_equal(np.asarray(_label_encode(series)), expected)
+
+
+def test_ordinal_uses_the_fitted_classes():
+    classes = CategoricalEncoder.classes(pd.Series(["b", "a", "c"]))
+    encoded = CategoricalEncoder.ordinal(pd.Series(["c", "a", "zzz", "c"]), classes)
+    assert encoded.tolist() == [2, 0, -1, 2]
+
+
+def test_target_encoding_is_the_smoothed_category_mean():
+    series = pd.Series(["a", "a", "b", "b", "b", "c"])
+    y = np.array([1.0, 0.0, 1.0, 1.0, 1.0, 0.0])
+    prior = y.mean()
+
+    params = CategoricalEncoder.fit_target(series, y, smoothing=2)
+
+    expected = {label: (y[series == label].sum() + 2 * prior) / ((series == label).sum() + 2) for label in "abc"}
+    assert dict(zip(params["labels"], params["values"])) == pytest.approx(expected)
+    encoded = CategoricalEncoder.target(pd.Series(["b", "new"]), params)
+    assert encoded.tolist() == pytest.approx([expected["b"], prior])
+
+
+def test_out_of_fold_encoding_never_sees_the_rows_own_fold():
+    rng = np.random.default_rng(0)
+    series = pd.Series(rng.choice([f"k{i}" for i in range(40)], 600))
+    y = rng.random(600)
+
+    encoded = CategoricalEncoder.target_out_of_fold(series, y, smoothing=5, folds=4, seed=1)
+
+    fold = np.random.default_rng(1).permutation(600) % 4
+    for row in (0, 17, 599):
+        rest = fold != fold[row]
+        same = rest & (series == series[row]).to_numpy()
+        prior = y[rest].mean()
+        assert encoded[row] == pytest.approx((y[same].sum() + 5 * prior) / (same.sum() + 5))
+
+
+def test_hashed_columns_are_sparse_and_stable():
+    df = pd.DataFrame({"u": [f"user{i % 500}" for i in range(2000)], "v": ["p", "q"] * 1000})
+
+    matrix = CategoricalEncoder.hashed(df, ["u", "v"], n_features=256)
+
+    assert matrix.shape == (2000, 256) and matrix.format == "csr"
+    np.testing.assert_array_equal(np.asarray(matrix.sum(axis=1)).ravel(), 2.0)
+    assert matrix.nnz <= 2 * 2000
+    # Same value, same bucket, whatever the batch
+    first = CategoricalEncoder.hashed(df.iloc[:1], ["u"], n_features=256).indices
+    assert first.tolist() == CategoricalEncoder.hashed(df.iloc[500:501], ["u"], n_features=256).indices.tolist()
+
+
+def test_strategy_by_cardinality():
+    limit = categorical_encoder.ENCODING_ORDINAL_MAX_CARDINALITY
+    assert CategoricalEncoder.choose_strategy(limit, True) == "ordinal"
+    assert CategoricalEncoder.choose_strategy(limit + 1, True) == "target"
+    assert CategoricalEncoder.choose_strategy(limit + 1, False) == "hashing"
+    assert CategoricalEncoder.target_usable(pd.Series(["a", "b", "a"]))
+    assert not CategoricalEncoder.target_usable(pd.Series(["a", "b", "c"]))
+    assert CategoricalEncoder.target_usable(pd.Series(np.arange(50.0)))
+
+
+def test_training_pipeline_encodes_by_cardinality():
+    from services.preprocessing_pipeline import PreprocessingPipeline
+
+    rng = np.random.default_rng(0)
+    n = 1000
+    df = pd.DataFrame({
+        "small": rng.choice(["a", "b"], n),
+        "wide": [f"w{i}" for i in rng.integers(0, 300, n)],
+        "y": rng.choice(["yes", "no"], n),
+    })
+    pipeline = PreprocessingPipeline()
+
+    out = pipeline.extend_for_training(df, "y", ["small", "wide"])
+
+    encoding = next(step for step in pipeline.steps if step["action"] == "encoding")["params"]
+    assert set(encoding["classes"]) == {"small", "y"} and set(encoding["target"]) == {"wide"}
+    assert out["wide"].dtype.kind == "f"
+    # Training rows are encoded out of fold; new rows get the all-rows means
+    assert not np.allclose(out["wide"], pipeline.transform(df)["wide"])
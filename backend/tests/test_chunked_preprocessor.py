@@ -0,0 +1,81 @@
+import uuid
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.chunked_preprocessor import chunkable, fit_step_chunked
+from services.preprocessing_pipeline import PreprocessingPipeline
+
+
+def _frame(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "x": rng.normal(size=n),
+        "z": rng.exponential(size=n) * 10,
+        "city": rng.choice(["paris", "rome", "oslo"], n),
+        "y": rng.choice(["yes", "no"], n),
+    })
+    df.loc[::7, "x"] = np.nan
+    df.loc[::11, "city"] = None
+    return df
+
+
+def _fit_both(raw, actions, batch_rows=400, **options):
+    in_memory, chunked = PreprocessingPipeline(), PreprocessingPipeline()
+    df = raw
+    for action in actions:
+        df = in_memory.fit_step(action, df, "y", ["city"], **options.get(action, {}))
+        batches = lambda: (chunked.transform(raw.iloc[start:start + batch_rows])
+                           for start in range(0, len(raw), batch_rows))
+        fit_step_chunked(chunked, action, batches, "y", ["city"], **options.get(action, {}))
+    return in_memory, chunked
+
+
+def test_chunked_fits_match_in_memory():
+    raw = _frame()
+    actions = ["missing", "encoding", "scaling", "outliers"]
+
+    in_memory, chunked = _fit_both(raw, actions, outliers={"method": "zscore"})
+
+    assert chunked.actions == in_memory.actions == actions
+    for mem_step, chunk_step in zip(in_memory.steps, chunked.steps):
+        assert chunk_step["schema"] == mem_step["schema"]
+        assert chunk_step["rows"] == mem_step["rows"]
+    assert chunked.steps[0]["params"]["fill"]["city"] == in_memory.steps[0]["params"]["fill"]["city"]
+    assert chunked.steps[3]["params"]["counts"] == in_memory.steps[3]["params"]["counts"]
+    pd.testing.assert_frame_equal(chunked.transform(raw), in_memory.transform(raw), rtol=1e-9)
+
+
+def test_chunked_iqr_bounds_are_exact_for_small_columns_and_close_otherwise():
+    small = _frame(n=150)
+    in_memory, chunked = _fit_both(small, ["outliers"], batch_rows=40)
+    assert chunked.steps[0]["params"]["bounds"] == pytest.approx(in_memory.steps[0]["params"]["bounds"])
+
+    large = _frame(n=20000, seed=1)
+    in_memory, chunked = _fit_both(large, ["outliers"], batch_rows=3000)
+    for col, (lo, hi) in in_memory.steps[0]["params"]["bounds"].items():
+        spread = large[col].std()
+        assert chunked.steps[0]["params"]["bounds"][col] == pytest.approx([lo, hi], abs=0.1 * spread)
+
+
+def test_chunkable_actions():
+    assert chunkable("missing") and chunkable("outliers", "zscore")
+    assert not chunkable("outliers", "mad") and not chunkable("outliers", "isolation_forest")
+
+
+@pytest.mark.parametrize("outlier_method", ["zscore", "mad"])
+def test_out_of_core_endpoint_matches_in_memory(client, store, monkeypatch, outlier_method):
+    from routes import preprocess
+
+    in_memory, out_of_core = str(uuid.uuid4()), str(uuid.uuid4())
+    for dataset_id in (in_memory, out_of_core):
+        store.save_dataset(dataset_id, _frame())
+    body = {"target_column": "y", "categorical_columns": ["city"], "outlier_method": outlier_method,
+            "actions": ["missing", "encoding", "outliers", "scaling"]}
+
+    client.post("/preprocess/batch", json={"dataset_id": in_memory, **body})
+    monkeypatch.setattr(preprocess, "CHUNKED_PREPROCESS_MIN_MB", 0)
+    response = client.post("/preprocess/batch", json={"dataset_id": out_of_core, **body})
+
+    assert response.status_code == 200
+    pd.testing.assert_frame_equal(store.load_dataset(out_of_core), store.load_dataset(in_memory), rtol=1e-9)
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml_engine.correlation_engine import CorrelationEngine
+
+
+def _reference(df: pd.DataFrame) -> float:
+    corr = df.corr().abs().to_numpy()
+    values = corr[np.triu_indices(len(corr), k=1)]
+    return float(np.nanmean(values))
+
+
+def _frame(n=2000, p=12, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=(n, 3))
+    mix = rng.normal(size=(3, p))
+    return pd.DataFrame(base @ mix + rng.normal(scale=0.5, size=(n, p)), columns=[f"c{i}" for i in range(p)])
+
+
+def test_exact_matches_pandas():
+    df = _frame()
+
+    result = CorrelationEngine.mean_abs_correlation(df)
+
+    assert result["strategy"] == "exact" and result["exact"]
+    assert result["pairs"] == 12 * 11 // 2
+    assert result["value"] == pytest.approx(_reference(df), abs=1e-5)
+
+
+def test_missing_values_use_pairwise_complete_rows():
+    df = _frame(seed=1)
+    rng = np.random.default_rng(1)
+    df = df.mask(rng.random(df.shape) < 0.2)
+    df["constant"] = 3.0
+    df["empty"] = np.nan
+
+    result = CorrelationEngine.mean_abs_correlation(df)
+
+    assert result["pairs"] == 12 * 11 // 2  # pairs with the constant/empty columns are undefined
+    assert result["value"] == pytest.approx(_reference(df), abs=1e-5)
+
+
+def test_sampled_estimate_is_close_for_wide_frames(monkeypatch):
+    from ml_engine import correlation_engine
+
+    monkeypatch.setattr(correlation_engine, "SAMPLE_GROUP_COLUMNS", 20)
+    df = _frame(n=500, p=100, seed=2)
+
+    result = CorrelationEngine.mean_abs_correlation(df, max_pairs=400)
+
+    assert result["strategy"] == "sampled" and not result["exact"]
+    assert result["pairs"] < 100 * 99 // 2
+    assert result["value"] == pytest.approx(_reference(df), rel=0.1)
+
+
+def test_row_sampling_and_small_inputs():
+    df = _frame(n=5000)
+    result = CorrelationEngine.mean_abs_correlation(df, max_rows=1000)
+    assert result["rows"] == 1000 and not result["exact"]
+    assert result["value"] == pytest.approx(_reference(df), abs=0.05)
+
+    assert CorrelationEngine.mean_abs_correlation(df[["c0"]])["value"] == 0.0
+    assert CorrelationEngine.is_exact(10 ** 6, 50) and not CorrelationEngine.is_exact(10, 1000, max_pairs=10)
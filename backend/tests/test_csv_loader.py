@@ -0,0 +1,73 @@
+import io
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from utils.file_ops.csv_loader import _read_sample, arrow_type, get_parser, iter_csv, load_csv
+
+
+def _csv(n=3000, seed=0) -> bytes:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "id": np.arange(n),
+        "x": rng.normal(size=n).round(6),
+        "label": rng.choice(["a", "b", "NA", ""], n),
+        "ok": rng.random(n) > 0.5,
+    })
+    return df.to_csv(index=False).encode()
+
+
+def _assert_same(a: pd.DataFrame, b: pd.DataFrame) -> None:
+    # Arrow hands missing strings back as None, pandas as NaN: both are missing
+    text = a.select_dtypes("object").columns
+    pd.testing.assert_frame_equal(a.fillna({col: "<missing>" for col in text}),
+                                  b.fillna({col: "<missing>" for col in text}))
+
+
+@pytest.mark.parametrize("engine", ["arrow", "pandas"])
+def test_engines_match_read_csv(engine):
+    data = _csv()
+    _assert_same(load_csv(io.BytesIO(data), engine=engine), pd.read_csv(io.BytesIO(data)))
+
+
+@pytest.mark.parametrize("engine,options", [("arrow", {"block_size": 4096}), ("pandas", {"chunk_rows": 500})])
+def test_iter_csv_chunks_concatenate_to_the_whole_file(engine, options):
+    data = _csv()
+    batches = list(iter_csv(io.BytesIO(data), engine=engine, **options))
+
+    assert len(batches) > 1
+    assert len({batch.schema for batch in batches}) == 1
+    _assert_same(pa.Table.from_batches(batches).to_pandas(), pd.read_csv(io.BytesIO(data)))
+
+
+def test_explicit_dtypes_are_used():
+    data = b"a,b\n1,x\n2,y\n"
+    df = load_csv(io.BytesIO(data), engine="arrow", dtypes={"a": np.dtype("float64"), "b": np.dtype("object")})
+    assert df["a"].dtype == np.float64
+
+
+def test_arrow_falls_back_to_pandas_when_the_sample_is_wrong():
+    # The sample says integers, the rest of the file has text
+    data = b"a\n" + b"1\n" * 50 + b"text\n"
+    df = load_csv(io.BytesIO(data), engine="arrow", sample_bytes=16)
+    pd.testing.assert_frame_equal(df, pd.read_csv(io.BytesIO(data)))
+
+
+def test_read_sample_never_cuts_inside_a_quoted_field():
+    data = b'a,b\n1,"x\ny\nz"\n2,w\n'
+    for size in range(5, len(data)):
+        sample = _read_sample(io.BytesIO(data), size)
+        assert sample.count(b'"') % 2 == 0 or sample == data[:size]
+
+
+def test_arrow_type():
+    assert arrow_type(np.dtype("bool")) == pa.bool_()
+    assert arrow_type(np.dtype("int8")) == pa.int64()
+    assert arrow_type(np.dtype("float32")) == pa.float64()
+    assert arrow_type(np.dtype("object")) == pa.string()
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        get_parser("nope")
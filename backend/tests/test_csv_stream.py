@@ -0,0 +1,102 @@
+import io
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from services.csv_stream import StreamingCSVProfile, _retype
+
+
+CSV = (
+    b'id,name,score,note\n'
+    b'1,alice,1.5,"multi\nline"\n'
+    b'2,bob,,plain\n'
+    b'3,"carol, jr",2,"quoted ""text"""\n'
+    b'4,dave,7,\n'
+    b'5,eve,3.25,last'
+)
+
+
+def _feed(data: bytes, chunk_size: int, **kwargs) -> StreamingCSVProfile:
+    profile = StreamingCSVProfile(**kwargs)
+    for start in range(0, len(data), chunk_size):
+        profile.feed(data[start:start + chunk_size])
+    profile.close()
+    return profile
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 4096])
+def test_chunked_profile_matches_single_read(chunk_size):
+    expected = pd.read_csv(io.BytesIO(CSV))
+
+    profile = _feed(CSV, chunk_size, preview_rows=3)
+
+    assert profile.columns == list(expected.columns)
+    assert profile.rows == len(expected)
+    assert profile.dtypes == dict(expected.dtypes.items())
+    pd.testing.assert_frame_equal(profile.preview, expected.head(3))
+    assert profile.categorical_columns() == ["name", "note"]
+
+
+def test_column_type_widens_across_chunks():
+    data = b"a,b\n" + b"".join(b"%d,x\n" % i for i in range(50)) + b"1.5,2\n"
+    expected = pd.read_csv(io.BytesIO(data))
+
+    profile = _feed(data, 16)
+
+    assert profile.dtypes == dict(expected.dtypes.items())
+
+
+def test_header_only_and_empty_input():
+    profile = _feed(b"a,b\n", 2)
+    assert profile.columns == ["a", "b"] and profile.rows == 0
+
+    with pytest.raises(ValueError):
+        _feed(b"", 2)
+
+
+def test_spooled_batches_match_a_reparse(store, dataset_id, tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "n": np.arange(2000),
+        "x": rng.normal(size=2000).round(4),
+        "city": rng.choice(["paris", "rome"], 2000),
+    })
+    data = df.to_csv(index=False).encode()
+    spool = tmp_path / "spool"
+    spool.mkdir()
+
+    profile = _feed(data, 5000, spool_dir=str(spool))
+    store.ingest_csv(dataset_id, profile.dtypes, schema=profile.compact_schema(), batches=profile.spooled_batches())
+
+    pd.testing.assert_frame_equal(store.load_dataset(dataset_id).astype({"city": object}), df,
+                                  check_dtype=False)
+
+
+def test_spooled_batches_without_spool():
+    with pytest.raises(ValueError):
+        next(_feed(CSV, 64).spooled_batches())
+
+
+def test_retype_refuses_lossy_text_conversion():
+    assert _retype(pa.array([None, None], pa.int64()), pa.string()).null_count == 2
+    assert _retype(pa.array([1, 2]), pa.float64()).type == pa.float64()
+    with pytest.raises(ValueError):
+        _retype(pa.array([1, 2]), pa.string())
+
+
+def test_upload_endpoint(client, store):
+    response = client.post("/upload/", files={"file": ("data.csv", CSV, "text/csv")})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["rows"] == 5 and body["columns"] == 4
+    assert body["preview"][1]["score"] is None
+    columns = ["id", "name", "score"]
+    pd.testing.assert_frame_equal(store.load_dataset(body["dataset_id"], columns=columns).astype({"name": object}),
+                                  pd.read_csv(io.BytesIO(CSV))[columns], check_dtype=False)
+
+
+def test_upload_rejects_invalid_files(client):
+    assert client.post("/upload/", files={"file": ("data.txt", b"a\n1", "text/plain")}).status_code == 400
+    assert client.put("/upload/stream?filename=data.csv", content=b"").status_code == 400
@@ -0,0 +1,94 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _frame(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "id": np.arange(n),
+        "x": rng.normal(size=n),
+        "city": rng.choice(["paris", "rome", "oslo"], n),
+        "flag": rng.random(n) > 0.5,
+    })
+
+
+def _same_values(a: pd.DataFrame, b: pd.DataFrame) -> None:
+    # The store picks compact dtypes: compare values, not dtypes
+    pd.testing.assert_frame_equal(a.reset_index(drop=True), b.reset_index(drop=True),
+                                  check_dtype=False, check_categorical=False)
+
+
+def test_save_then_load_round_trips_values(store, dataset_id):
+    df = _frame()
+    store.save_dataset(dataset_id, df)
+
+    assert store.dataset_exists(dataset_id)
+    _same_values(store.load_dataset(dataset_id).astype({"city": object}), df)
+    assert store.dataset_columns(dataset_id) == list(df.columns)
+    assert store.dataset_num_rows(dataset_id) == len(df)
+
+
+def test_load_selected_columns(store, dataset_id):
+    df = _frame()
+    store.save_dataset(dataset_id, df)
+
+    loaded = store.load_dataset(dataset_id, columns=["x", "id"])
+    assert list(loaded.columns) == ["x", "id"]
+    _same_values(loaded, df[["x", "id"]])
+
+
+def test_head_reads_leading_rows(store, dataset_id):
+    df = _frame()
+    store.save_dataset(dataset_id, df)
+
+    _same_values(store.dataset_head(dataset_id, 7).astype({"city": object}), df.head(7))
+
+
+def test_loaded_frame_is_the_callers_own(store, dataset_id):
+    store.save_dataset(dataset_id, _frame())
+
+    first = store.load_dataset(dataset_id)
+    first["x"] = 0.0
+    assert (store.load_dataset(dataset_id)["x"] != 0.0).any()
+
+
+def test_rewrite_changes_version_and_is_never_served_stale(store, dataset_id):
+    store.save_dataset(dataset_id, _frame(seed=0))
+    before = store.dataset_version(dataset_id)
+    fingerprint = store.dataset_fingerprint(dataset_id)
+    store.load_dataset(dataset_id)  # cached
+
+    replacement = _frame(n=300, seed=1)
+    store.save_dataset(dataset_id, replacement)
+
+    assert store.dataset_version(dataset_id) != before
+    assert store.dataset_fingerprint(dataset_id)["content_hash"] != fingerprint["content_hash"]
+    _same_values(store.load_dataset(dataset_id).astype({"city": object}), replacement)
+
+
+def test_ingest_csv_matches_read_csv(store, dataset_id):
+    df = _frame()
+    df.to_csv(store.csv_path(dataset_id), index=False)
+
+    store.ingest_csv(dataset_id)
+
+    _same_values(store.load_dataset(dataset_id).astype({"city": object}), pd.read_csv(store.csv_path(dataset_id)))
+
+
+def test_csv_only_dataset_is_converted_on_first_read(store, dataset_id):
+    df = _frame(n=50)
+    df.to_csv(store.csv_path(dataset_id), index=False)
+    assert not os.path.exists(store.columnar_path(dataset_id))
+
+    loaded = store.load_dataset(dataset_id)
+
+    assert os.path.exists(store.columnar_path(dataset_id))
+    _same_values(loaded.astype({"city": object}), df)
+
+
+def test_missing_dataset(store, dataset_id):
+    assert not store.dataset_exists(dataset_id)
+    with pytest.raises(FileNotFoundError):
+        store.load_dataset(dataset_id)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml_engine.describe_engine import DescribeEngine
+
+
+def _expected(series: pd.Series) -> dict:
+    return series.describe().to_dict()
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 10, 1001])
+def test_numeric_matches_pandas(n):
+    rng = np.random.default_rng(n)
+    series = pd.Series(rng.normal(size=n))
+    series.iloc[::4] = np.nan
+
+    stats, approximate = DescribeEngine.describe_column(series)
+
+    assert approximate == []
+    expected = _expected(series)
+    assert list(stats) == list(expected)
+    for stat, value in expected.items():
+        assert stats[stat] == pytest.approx(value, rel=1e-12, nan_ok=True)
+
+
+@pytest.mark.parametrize("dtype", ["int8", "int64", "float32", "Int64"])
+def test_numeric_dtypes(dtype):
+    series = pd.Series([5, 1, 4, 4, 2, 9, 7], dtype=dtype)
+    stats, _ = DescribeEngine.describe_column(series)
+    assert stats == pytest.approx(_expected(series.astype("float64")))
+
+
+def test_quantiles_match_numpy_with_ties():
+    values = np.random.default_rng(0).integers(0, 5, 999).astype(float)
+    qs = [0.0, 0.1, 0.25, 0.5, 0.75, 0.99, 1.0]
+    assert DescribeEngine.quantiles(values, qs) == pytest.approx(list(np.quantile(values, qs)))
+    assert DescribeEngine.quantiles(values, [0.5], with_extremes=True) == pytest.approx([0.0, np.median(values), 4.0])
+
+
+def test_large_columns_get_sampled_quartiles():
+    series = pd.Series(np.random.default_rng(0).normal(size=50_000))
+
+    stats, approximate = DescribeEngine.describe_column(series, approx_min_rows=10_000, sample_rows=20_000)
+
+    assert approximate == ["25%", "50%", "75%"]
+    expected = _expected(series)
+    assert stats["min"] == expected["min"] and stats["max"] == expected["max"]
+    assert stats["50%"] == pytest.approx(expected["50%"], abs=0.05)
+
+
+@pytest.mark.parametrize("series", [
+    pd.Series(["b", "a", None, "b", "c", "b"]),
+    pd.Series(["b", "a", None, "b", "c", "b"], dtype="category"),
+    pd.Series([True, False, False]),
+    pd.Series(["x", "y", "y"], dtype="string"),
+])
+def test_categorical_matches_pandas(series):
+    stats, approximate = DescribeEngine.describe_column(series)
+    assert approximate == []
+    assert stats == _expected(series)
+
+
+def test_empty_columns():
+    stats, _ = DescribeEngine.describe_column(pd.Series([None, None], dtype=object))
+    assert stats["count"] == 0 and stats["unique"] == 0
+    stats, _ = DescribeEngine.describe_column(pd.Series([np.nan, np.nan]))
+    assert stats["count"] == 0 and np.isnan(stats["mean"])
+
+
+def test_datetimes_fall_back_to_pandas():
+    series = pd.Series(pd.date_range("2024-01-01", periods=5))
+    stats, _ = DescribeEngine.describe_column(series)
+    assert stats == _expected(series)
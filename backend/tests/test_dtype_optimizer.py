@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from services.dtype_optimizer import DtypeStats, RecordBatchCaster, apply_schema, optimize_dtypes
+
+
+def _frame(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "small": rng.integers(-100, 100, n),
+        "wide": rng.integers(0, 100_000, n),
+        "halves": rng.integers(0, 8, n) / 2.0,
+        "precise": rng.normal(size=n),
+        "city": pd.Series(rng.choice(["paris", "rome", "oslo", ""], n)).replace("", np.nan),
+        "uid": [f"u{i}" for i in range(n)],
+        "flag": rng.random(n) > 0.5,
+    })
+
+
+def test_optimize_dtypes_is_lossless_and_compact():
+    df = _frame()
+
+    optimized, schema = optimize_dtypes(df)
+
+    assert optimized["small"].dtype == np.int8
+    assert optimized["wide"].dtype == np.int32
+    assert optimized["halves"].dtype == np.float32
+    assert optimized["precise"].dtype == np.float64
+    assert isinstance(optimized["city"].dtype, pd.CategoricalDtype)
+    assert optimized["uid"].dtype == object  # all distinct: stays text
+    assert optimized["flag"].dtype == bool
+    assert optimized.memory_usage(deep=True).sum() < df.memory_usage(deep=True).sum()
+    pd.testing.assert_frame_equal(optimized.astype(df.dtypes.to_dict()), df)
+    assert schema["city"]["categories"] == ["oslo", "paris", "rome"]
+
+
+def test_stats_over_chunks_match_the_whole_frame():
+    df = _frame()
+    whole = DtypeStats()
+    whole.update(df)
+    chunked = DtypeStats()
+    for start in range(0, len(df), 300):
+        chunked.update(df.iloc[start:start + 300])
+
+    dtypes = df.dtypes.to_dict()
+    assert chunked.schema(dtypes) == whole.schema(dtypes)
+
+
+def test_category_limit():
+    df = pd.DataFrame({"c": [f"v{i % 20}" for i in range(100)]})
+    assert optimize_dtypes(df, max_categories=10)[0]["c"].dtype == object
+    assert isinstance(optimize_dtypes(df, max_categories=20)[0]["c"].dtype, pd.CategoricalDtype)
+
+
+def test_record_batch_caster_matches_apply_schema():
+    df = _frame()
+    _, schema = optimize_dtypes(df)
+    caster = RecordBatchCaster(schema)
+
+    batches = [caster.cast(pa.RecordBatch.from_pandas(df.iloc[start:start + 500], preserve_index=False))
+               for start in range(0, len(df), 500)]
+
+    assert len({batch.schema for batch in batches}) == 1
+    result = pa.Table.from_batches(batches).to_pandas()
+    expected = apply_schema(df, schema)
+    pd.testing.assert_frame_equal(result.astype({"city": object}), expected.astype({"city": object}))
+
+
+def test_record_batch_caster_rejects_unknown_categories():
+    _, schema = optimize_dtypes(pd.DataFrame({"c": ["a", "b"] * 10}))
+    with pytest.raises(ValueError):
+        RecordBatchCaster(schema).cast(pa.RecordBatch.from_pydict({"c": ["a", "z"]}))
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from services.frame_cache import FrameCache
+
+
+def _frame(n=1000, value=0.0):
+    return pd.DataFrame({"a": np.full(n, value), "b": np.arange(n)})
+
+
+def _nbytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def test_get_after_put_and_stats():
+    cache = FrameCache(max_bytes=10 ** 7)
+    assert cache.get("d", 1) is None
+
+    cache.put("d", 1, _frame())
+    pd.testing.assert_frame_equal(cache.get("d", 1), _frame())
+    assert cache.get("d", 2) is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 1)
+    assert stats["hit_rate"] == round(1 / 3, 4)
+
+
+def test_handouts_never_modify_the_cached_frame():
+    cache = FrameCache(max_bytes=10 ** 7)
+    handout = cache.put("d", 1, _frame())
+    handout["a"] = 5.0
+    other = cache.get("d", 1)
+    other.loc[0, "b"] = -1
+
+    pd.testing.assert_frame_equal(cache.get("d", 1), _frame())
+
+
+def test_least_recently_used_frame_is_evicted_first():
+    size = _nbytes(_frame())
+    cache = FrameCache(max_bytes=int(size * 2.5))
+    cache.put("x", 1, _frame(value=1))
+    cache.put("y", 1, _frame(value=2))
+    cache.get("x", 1)  # y is now the least recently used
+
+    cache.put("z", 1, _frame(value=3))
+
+    assert cache.get("y", 1) is None
+    assert cache.get("x", 1) is not None and cache.get("z", 1) is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.current_bytes <= cache.max_bytes
+
+
+def test_frame_larger_than_budget_is_not_cached():
+    cache = FrameCache(max_bytes=100)
+    cache.put("d", 1, _frame())
+    assert cache.get("d", 1) is None and cache.current_bytes == 0
+
+
+def test_versions_per_dataset_and_nearest():
+    cache = FrameCache(max_bytes=10 ** 7, versions_per_dataset=2)
+    for version in (1, 2, 3):
+        cache.put("d", version, _frame(value=version))
+
+    assert cache.versions("d") == [2, 3]
+    version, frame = cache.nearest("d", [4, 2, 3])
+    assert version == 2 and (frame["a"] == 2).all()
+    assert cache.nearest("d", [1, 5]) is None
+
+
+def test_shared_columns_are_counted_once():
+    base = _frame()
+    derived = base.assign(a=base["a"] + 1)  # shares column b under copy-on-write
+    cache = FrameCache(max_bytes=10 ** 7, versions_per_dataset=2)
+    cache.put("d", 1, base)
+    alone = cache.current_bytes
+
+    cache.put("d", 2, derived)
+
+    assert cache.stats()["shared_bytes"] == base["b"].memory_usage(index=False, deep=True)
+    assert cache.current_bytes < 2 * alone
+    cache.invalidate("d")
+    assert cache.current_bytes == 0 and cache.frame_bytes == 0 and cache.versions("d") == []
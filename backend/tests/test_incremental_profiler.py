@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml_engine.incremental_profiler import carry_forward, touched_columns
+
+
+def _frame(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "a": rng.normal(size=n),
+        "b": rng.normal(size=n) * 10,
+        "gap": rng.normal(size=n),
+        "city": rng.choice(["paris", "rome"], n),
+        "y": rng.choice(["yes", "no"], n),
+    })
+    df.loc[::5, "gap"] = np.nan
+    return df
+
+
+def _stats(df):
+    return {
+        "rows": len(df),
+        "columns": {col: {"dtype": str(dtype)} for col, dtype in df.dtypes.items()},
+        "class_counts": {"y": {"yes": 1, "no": 2}},
+        "correlation": {"numeric_columns": ["a", "b", "gap"], "value": 0.1},
+    }
+
+
+def test_touched_columns_per_action():
+    df = _frame()
+    assert touched_columns("scaling", df, "y") == ["a", "b", "gap"]
+    assert touched_columns("encoding", df, "y", ["city"]) == ["city", "y"]
+    assert touched_columns("missing", df, "y") == ["gap"]
+    assert touched_columns("outliers", df, "y") is None
+
+
+def test_carry_forward_keeps_only_valid_entries():
+    df = _frame()
+    dtypes = {col: str(dtype) for col, dtype in df.dtypes.items()}
+
+    kept = carry_forward(_stats(df), ["gap"], len(df), dtypes)
+    assert set(kept["columns"]) == {"a", "b", "city", "y"}
+    assert kept["correlation"] is None and kept["class_counts"] == {"y": {"yes": 1, "no": 2}}
+
+    scaled = carry_forward(_stats(df), ["a", "b", "gap"], len(df), dtypes, preserves_correlation=True)
+    assert scaled["correlation"] is not None
+
+    encoded = carry_forward(_stats(df), ["y"], len(df), dict(dtypes, y="int8"))
+    assert "y" not in encoded["columns"] and encoded["class_counts"] == {}
+
+    assert carry_forward(_stats(df), None, len(df) - 1, dtypes) is None
+    assert carry_forward(None, [], len(df), dtypes) is None
+
+
+@pytest.mark.parametrize("action", ["missing", "scaling", "encoding", "outliers"])
+def test_incremental_profile_equals_a_fresh_one(client, store, dataset_id, action):
+    from services.profile_cache import profile_cache
+
+    store.save_dataset(dataset_id, _frame())
+    params = {"target_column": "y"}
+    client.get(f"/profiling/{dataset_id}", params=params)
+    response = client.post("/preprocess/", json={"dataset_id": dataset_id, "target_column": "y",
+                                                 "action": action, "categorical_columns": ["city"]})
+    assert response.status_code == 200
+
+    incremental = client.get(f"/profiling/{dataset_id}", params=params).json()
+    profile_cache.invalidate(dataset_id)
+    fresh = client.get(f"/profiling/{dataset_id}", params=params).json()
+
+    assert incremental["column_info"] == fresh["column_info"]
+    for col, stats in fresh["descriptive_statistics"].items():
+        assert incremental["descriptive_statistics"][col] == pytest.approx(stats)
+    assert incremental["meta_features"] == pytest.approx(fresh["meta_features"])
@@ -0,0 +1,138 @@
+import os
+import socket
+import subprocess
+import threading
+import time
+import pytest
+
+from services import job_queue as job_queue_module
+from services.job_queue import JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    queue.register("echo", lambda job, report: {"echo": job["params"]["value"]})
+    return queue
+
+
+def _run_next(queue):
+    job = queue._claim()
+    queue.run_job(job)
+    return queue.get(job["id"])
+
+
+def _set_running(queue, job_id, worker, attempts=1, cancel_requested=0):
+    with queue._connect() as db:
+        db.execute("UPDATE jobs SET status = 'running', worker = ?, attempts = ?, cancel_requested = ? WHERE id = ?",
+                   (worker, attempts, cancel_requested, job_id))
+
+
+def _dead_pid() -> int:
+    process = subprocess.Popen(["true"])
+    process.wait()
+    return process.pid
+
+
+def test_jobs_run_in_submission_order(queue):
+    first = queue.submit("echo", {"value": 1})
+    second = queue.submit("echo", {"value": 2})
+    assert first["status"] == "queued" and first["params"] == {"value": 1}
+
+    done = _run_next(queue)
+
+    assert done["id"] == first["id"] and done["status"] == "succeeded"
+    assert done["result"] == {"echo": 1} and done["attempts"] == 1
+    assert queue.get(second["id"])["status"] == "queued"
+    assert [job["id"] for job in queue.recent("echo")] == [second["id"], first["id"]]
+    with pytest.raises(ValueError):
+        queue.submit("unknown", {})
+
+
+def test_progress_and_terminal_stages(queue):
+    def steps(job, report):
+        report({"stage": "training", "done": 1})
+        if job["params"]["fail"]:
+            raise RuntimeError("boom")
+        report({"stage": "done"})
+        return {}
+
+    queue.register("steps", steps)
+    queue.submit("steps", {"fail": False})
+    broken = queue.submit("steps", {"fail": True})
+
+    assert _run_next(queue)["progress"] == {"stage": "done"}
+    failed = _run_next(queue)
+    assert failed["id"] == broken["id"] and failed["status"] == "failed" and failed["error"] == "boom"
+    assert failed["progress"] == {"stage": "failed", "done": 1}
+
+
+def test_cancel_queued_job(queue):
+    job = queue.submit("echo", {"value": 1})
+
+    cancelled = queue.cancel(job["id"])
+
+    assert cancelled["status"] == "cancelled" and cancelled["progress"] == {"stage": "cancelled"}
+    assert queue._claim() is None
+
+
+def test_cancel_running_job_stops_at_its_next_report(queue):
+    started, reports = threading.Event(), []
+
+    def long_job(job, report):
+        started.set()
+        while True:
+            report({"stage": "training"})
+            reports.append(1)
+            time.sleep(0.01)
+
+    queue.register("long", long_job)
+    job = queue.submit("long", {})
+    runner = threading.Thread(target=queue.run_job, args=(queue._claim(),))
+    runner.start()
+    started.wait(5)
+
+    assert queue.cancel(job["id"])["status"] == "running"
+    runner.join(5)
+
+    final = queue.get(job["id"])
+    assert final["status"] == "cancelled" and final["progress"]["stage"] == "cancelled"
+    assert not runner.is_alive()
+
+
+def test_recover_requeues_only_this_hosts_dead_workers(queue, monkeypatch):
+    monkeypatch.setattr(job_queue_module, "JOB_MAX_ATTEMPTS", 2)
+    host = socket.gethostname()
+    dead = queue.submit("echo", {"value": 1})
+    alive = queue.submit("echo", {"value": 2})
+    elsewhere = queue.submit("echo", {"value": 3})
+    exhausted = queue.submit("echo", {"value": 4})
+    cancelling = queue.submit("echo", {"value": 5})
+    _set_running(queue, dead["id"], f"{host}:{_dead_pid()}")
+    _set_running(queue, alive["id"], f"{host}:{os.getppid()}")
+    _set_running(queue, elsewhere["id"], f"another-host:{_dead_pid()}")
+    _set_running(queue, exhausted["id"], f"{host}:{_dead_pid()}", attempts=2)
+    _set_running(queue, cancelling["id"], f"{host}:{_dead_pid()}", cancel_requested=1)
+
+    queue._recover()
+
+    assert queue.get(dead["id"])["status"] == "queued" and queue.get(dead["id"])["worker"] is None
+    assert queue.get(alive["id"])["status"] == "running"
+    assert queue.get(elsewhere["id"])["status"] == "running"
+    assert queue.get(exhausted["id"])["status"] == "failed"
+    assert queue.get(exhausted["id"])["progress"] == {"stage": "failed"}
+    assert queue.get(cancelling["id"])["status"] == "cancelled"
+
+
+def test_worker_threads_run_submitted_jobs(queue, monkeypatch):
+    monkeypatch.setattr(job_queue_module, "JOB_POLL_INTERVAL_S", 0.01)
+    queue.start(workers=1)
+    queue.start(workers=1)  # once per process
+    job = queue.submit("echo", {"value": "hi"})
+
+    deadline = time.time() + 5
+    while queue.get(job["id"])["status"] != "succeeded" and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert queue.get(job["id"])["result"] == {"echo": "hi"}
+    assert len(queue._threads) == 1
@@ -0,0 +1,81 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import json_sanitizer
+from utils.json_sanitizer import dump_json, dumps, frame_records, load_json, loads, sanitize_for_json
+
+
+def _payload():
+    return {
+        "ints": np.arange(3),
+        "floats": np.array([1.5, np.nan, np.inf]),
+        "scalars": [np.int64(7), np.float32(0.5), np.bool_(True), np.float64("nan"), None],
+        "series": pd.Series([1.0, None]),
+        "nested": {1: {"k": (np.int32(2), "s")}, np.int64(3): pd.NaT},
+        "when": pd.Timestamp("2024-05-01 12:00"),
+        "frame": pd.DataFrame({"a": [1, 2], "b": [np.nan, 0.25], "c": pd.Categorical(["x", None])}),
+    }
+
+
+EXPECTED = {
+    "ints": [0, 1, 2],
+    "floats": [1.5, None, None],
+    "scalars": [7, 0.5, True, None, None],
+    "series": [1.0, None],
+    "nested": {"1": {"k": [2, "s"]}, "3": None},
+    "when": "2024-05-01T12:00:00",
+    "frame": [{"a": 1, "b": None, "c": "x"}, {"a": 2, "b": 0.25, "c": None}],
+}
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(json_sanitizer, "orjson", None)
+    elif json_sanitizer.orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+
+def test_dumps_writes_json_safe_values(backend):
+    assert json.loads(dumps(_payload())) == EXPECTED
+    assert loads(dumps(_payload())) == EXPECTED
+
+
+def test_sanitize_for_json_matches_dumps():
+    assert json.loads(json.dumps(sanitize_for_json(_payload()), allow_nan=False)) == EXPECTED
+
+
+def test_frame_records_match_to_dict():
+    df = pd.DataFrame({
+        "i": [1, 2, 3],
+        "f": [0.5, np.nan, -np.inf],
+        "s": ["a", None, "c"],
+        "n": pd.array([1, None, 3], dtype="Int64"),
+        "t": pd.to_datetime(["2024-01-01", None, "2024-01-03"]),
+    })
+
+    records = frame_records(df)
+
+    assert records == [
+        {"i": 1, "f": 0.5, "s": "a", "n": 1, "t": "2024-01-01T00:00:00.000000000"},
+        {"i": 2, "f": None, "s": None, "n": None, "t": None},
+        {"i": 3, "f": None, "s": "c", "n": 3, "t": "2024-01-03T00:00:00.000000000"},
+    ]
+    assert [type(v) for v in records[0].values()][:2] == [int, float]
+
+
+def test_dump_json_round_trips_atomically(tmp_path, backend):
+    path = str(tmp_path / "result.json")
+    dump_json(_payload(), path)
+
+    assert load_json(path) == EXPECTED
+    assert not (tmp_path / "result.json.tmp").exists()
+
+
+def test_unserializable_values_raise():
+    pytest.importorskip("orjson")
+    with pytest.raises(TypeError):
+        dumps({"x": object()})
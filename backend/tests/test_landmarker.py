@@ -0,0 +1,72 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml_engine import landmarker
+from ml_engine.landmarker import Landmarker
+
+
+def _classification(n=1500, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=n)
+    return pd.DataFrame({
+        "x": x,
+        "noise": rng.normal(size=n),
+        "city": rng.choice(["paris", "rome", None], n),
+        "y": np.where(x + rng.normal(scale=0.3, size=n) > 0, "yes", "no"),
+    })
+
+
+def test_classification_landmarks_are_deterministic_scores():
+    df = _classification()
+
+    first = Landmarker.extract(df, "y", budget_s=30)
+    second = Landmarker.extract(df, "y", budget_s=30)
+
+    for name in ("stump", "naive_bayes", "1nn", "linear"):
+        assert 0.5 < first[f"landmark_{name}"] <= 1.0
+        assert first[f"landmark_{name}"] == second[f"landmark_{name}"]
+    assert first["landmark_linear"] > 0.85  # the target is almost linear in x
+
+
+def test_regression_skips_classifier_only_landmarkers():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=500)
+    df = pd.DataFrame({"x": x, "y": 3 * x + rng.normal(scale=0.1, size=500)})
+
+    scores = Landmarker.extract(df, "y", budget_s=30)
+
+    assert scores["landmark_naive_bayes"] is None
+    assert scores["landmark_linear"] > 0.95
+
+
+def test_budget_bounds_the_stage(monkeypatch):
+    def slow_score(make_model, X, y, folds, deadline):
+        time.sleep(1.0)
+        return 1.0
+
+    monkeypatch.setattr(Landmarker, "_score", staticmethod(slow_score))
+
+    scores = Landmarker.extract(_classification(), "y", budget_s=0.2)
+
+    assert scores["landmark_time_s"] < 0.9
+    assert all(scores[f"landmark_{name}"] is None for name in landmarker.LANDMARKERS)
+
+
+def test_subsample_is_stratified_and_bounded():
+    df = _classification(n=5000)
+    X, y, task_type, folds = Landmarker._prepare(df, "y", sample_rows=1000, seed=0)
+
+    assert task_type == "classification" and X.shape == (1000, 3)
+    assert not np.isnan(X).any()
+    shares = sorted(np.bincount(y) / len(y))
+    assert shares == pytest.approx(sorted(df["y"].value_counts(normalize=True)), abs=0.01)
+    assert len(folds) == landmarker.LANDMARK_FOLDS
+
+
+def test_unusable_targets():
+    df = _classification()
+    assert Landmarker._prepare(df, "missing", 100, 0) is None
+    assert Landmarker._prepare(df.assign(y="same"), "y", 100, 0) is None
+    assert set(Landmarker.extract(df, "missing")) == {f"landmark_{name}" for name in landmarker.LANDMARKERS} | {"landmark_time_s"}
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from ml_engine.moment_kernel import BlockMoments, column_moments
+
+
+def _frame(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "normal": rng.normal(10, 3, n),
+        "skewed": rng.exponential(2, n),
+        "large": 1e6 + rng.normal(size=n),
+        "ints": rng.integers(0, 50, n),
+        "constant": np.full(n, 4.0),
+    })
+    df.loc[rng.random(n) < 0.1, "normal"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("block_bytes", [64, 8 * 1024, 4 * 1024 * 1024])
+def test_blocked_moments_match_scipy(block_bytes):
+    df = _frame()
+    values = df.to_numpy(dtype=np.float64)
+
+    moments = column_moments(df, block_bytes=block_bytes)
+
+    np.testing.assert_array_equal(moments.count, df.count().to_numpy())
+    np.testing.assert_array_equal(moments.nan_count, df.isna().sum().to_numpy())
+    np.testing.assert_allclose(moments.means(), np.nanmean(values, axis=0), rtol=1e-12)
+    np.testing.assert_allclose(moments.stds(), np.nanstd(values, axis=0, ddof=1), rtol=1e-9)
+    measured = slice(0, 4)  # the constant column has no defined skew/kurtosis
+    np.testing.assert_allclose(moments.skewness()[measured],
+                               stats.skew(values[:, measured], nan_policy="omit"), rtol=1e-8)
+    np.testing.assert_allclose(moments.kurtosis()[measured],
+                               stats.kurtosis(values[:, measured], nan_policy="omit"), rtol=1e-8)
+    assert np.isnan(moments.skewness()[4]) and np.isnan(moments.kurtosis()[4])
+
+
+def test_merged_blocks_equal_a_single_pass():
+    values = _frame().to_numpy(dtype=np.float64)
+    single = BlockMoments.from_block(values)
+
+    merged = BlockMoments.empty(values.shape[1])
+    for part in np.array_split(values, 7):
+        merged = merged.merge(BlockMoments.from_block(part))
+
+    for name in ("count", "nan_count", "mean", "m2", "m3", "m4"):
+        np.testing.assert_allclose(getattr(merged, name), getattr(single, name), rtol=1e-9, atol=1e-6)
+    np.testing.assert_allclose(merged.sum_of_squares, np.nansum(values ** 2, axis=0), rtol=1e-9)
+
+
+def test_merge_with_empty_side_is_identity():
+    block = BlockMoments.from_block(np.array([[1.0], [2.0], [4.0]]))
+    for merged in (block.merge(BlockMoments.empty(1)), BlockMoments.empty(1).merge(block)):
+        np.testing.assert_allclose(merged.m2, block.m2)
+        np.testing.assert_allclose(merged.m4, block.m4)
+
+
+def test_all_missing_column():
+    moments = column_moments(pd.DataFrame({"a": [np.nan, np.nan]}))
+    assert moments.count[0] == 0 and moments.nan_count[0] == 2
+    assert np.isnan(moments.means()[0]) and np.isnan(moments.stds()[0]) and np.isnan(moments.skewness()[0])
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import IsolationForest
+
+from ml_engine.outlier_engine import OutlierEngine
+
+COLUMNS = ["a", "b"]
+
+
+def _frame(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"a": rng.normal(size=n), "b": rng.standard_t(3, size=n), "c": rng.choice(["u", "v"], n)})
+    df.loc[::50, "a"] = 12.0
+    df.loc[::97, "b"] = np.nan
+    return df
+
+
+def _reference_mask(df, method):
+    keep = pd.Series(True, index=df.index)
+    for col in COLUMNS:
+        values = df[col]
+        if method == "iqr":
+            q1, q3 = values.quantile(0.25), values.quantile(0.75)
+            lo, hi = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+        elif method == "zscore":
+            lo, hi = values.mean() - 3 * values.std(ddof=0), values.mean() + 3 * values.std(ddof=0)
+        else:
+            median = values.median()
+            mad = (values - median).abs().median()
+            lo, hi = median - 3.5 * mad / 0.6745, median + 3.5 * mad / 0.6745
+        keep &= values.between(lo, hi)
+    return keep.to_numpy()
+
+
+@pytest.mark.parametrize("method", ["iqr", "zscore", "mad"])
+def test_bounds_match_the_reference_filters(method):
+    df = _frame()
+
+    params = OutlierEngine.fit(df, COLUMNS, method)
+    keep, counts = OutlierEngine.inlier_mask(df, params, with_counts=True)
+
+    np.testing.assert_array_equal(keep, _reference_mask(df, method))
+    assert counts == params["counts"]
+    assert counts["a"] >= 20  # the planted outliers
+    assert counts["b"] >= df["b"].isna().sum()  # gaps are never within bounds
+
+
+@pytest.mark.parametrize("method", ["iqr", "zscore", "mad", "isolation_forest"])
+def test_masks_are_row_local(method):
+    df = _frame()
+    params = OutlierEngine.fit(df, COLUMNS, method)
+
+    whole = OutlierEngine.inlier_mask(df, params)
+    batched = np.concatenate([OutlierEngine.inlier_mask(df.iloc[start:start + 130], params)
+                              for start in range(0, len(df), 130)])
+
+    np.testing.assert_array_equal(batched, whole)
+
+
+def test_exported_forest_scores_like_sklearn():
+    df = _frame().dropna()
+
+    params = OutlierEngine.fit(df, COLUMNS, "isolation_forest", seed=3)
+    forest = IsolationForest(n_estimators=len(params["trees"]), random_state=3).fit(df[COLUMNS].to_numpy())
+
+    np.testing.assert_array_equal(OutlierEngine.inlier_mask(df, params), forest.predict(df[COLUMNS].to_numpy()) == 1)
+    assert OutlierEngine.columns(params) == COLUMNS
+
+
+def test_nothing_to_bound():
+    df = pd.DataFrame({"a": [1.0] * 10 + [2.0]})
+    assert OutlierEngine.fit(df, [], "iqr") is None
+    assert OutlierEngine.fit(df, ["a"], "mad") is None  # zero MAD
+    with pytest.raises(ValueError):
+        OutlierEngine.fit(df, ["a"], "nope")
@@ -0,0 +1,90 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml_engine import parallel_profiler
+from ml_engine.parallel_profiler import merge_summaries, shard_columns, start_column_summaries, summarize_columns
+
+
+def _frame(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "a": rng.normal(size=n),
+        "b": rng.integers(0, 9, n),
+        "city": rng.choice(["paris", "rome"], n),
+        "c": rng.exponential(size=n),
+        "flag": rng.random(n) > 0.5,
+    })
+    df.loc[::7, "a"] = np.nan
+    return df
+
+
+@pytest.fixture
+def stored(store, dataset_id):
+    store.save_dataset(dataset_id, _frame())
+    return store.load_dataset(dataset_id), store.columnar_path(dataset_id)
+
+
+@pytest.fixture
+def pool():
+    from ml_engine import worker_pool
+
+    yield
+    if worker_pool._executor is not None:
+        worker_pool.retire_executor(worker_pool._executor)
+
+
+def test_shards_cover_every_column_once():
+    columns = list("abcdefg")
+    shards = shard_columns(columns, 3)
+    assert len(shards) == 3 and sorted(sum(shards, [])) == columns
+    assert shard_columns(columns[:2], 8) == [["a"], ["b"]]
+
+
+def test_parallel_summaries_equal_serial(stored, pool, monkeypatch):
+    df, path = stored
+    monkeypatch.setattr(parallel_profiler, "PARALLEL_PROFILE_MIN_CELLS", 0)
+
+    entries = start_column_summaries(df, path, workers=2)()
+
+    assert list(entries) == list(df.columns)
+    assert entries == summarize_columns(df)
+
+
+def test_worker_failure_falls_back_to_in_process(stored, monkeypatch):
+    df, path = stored
+    monkeypatch.setattr(parallel_profiler, "PARALLEL_PROFILE_MIN_CELLS", 0)
+    discarded = []
+
+    class BrokenPool:
+        def submit(self, *args):
+            future = Future()
+            future.set_exception(BrokenProcessPool("worker died"))
+            return future
+
+    monkeypatch.setattr(parallel_profiler, "get_executor", BrokenPool)
+    monkeypatch.setattr(parallel_profiler, "discard_executor", discarded.append)
+
+    assert start_column_summaries(df, path, workers=2)() == summarize_columns(df)
+    assert len(discarded) == 1
+
+
+def test_merged_summaries_match_describe():
+    df = _frame()
+    entries = {}
+    for shard in shard_columns(list(df.columns), 3):
+        entries.update(summarize_columns(df[shard]))
+
+    merged = merge_summaries(entries, list(df.columns))
+
+    expected = df.describe(include="all")
+    assert list(merged["descriptive_statistics"]["a"]) == list(expected.index)
+    for col in ("a", "b", "c"):
+        for stat in ("count", "mean", "std", "min", "max"):
+            assert merged["descriptive_statistics"][col][stat] == pytest.approx(expected.loc[stat, col])
+    assert merged["descriptive_statistics"]["city"]["unique"] == 2
+    assert merged["numeric_columns"] == ["a", "b", "c"]
+    assert merged["n_missing_values"] == int(df.isna().sum().sum())
+    np.testing.assert_allclose(merged["moments"].means(), df[["a", "b", "c"]].mean().to_numpy())
@@ -0,0 +1,117 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("xgboost")
+
+from ml_engine import parallel_trainer  # noqa: E402
+from ml_engine.parallel_trainer import train_candidates  # noqa: E402
+
+ALGORITHMS = ["Logistic Regression", "Decision Tree", "No Such Model"]
+
+
+def _split(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n, 4)), columns=list("abcd"))
+    y = (X["a"] + rng.normal(scale=0.5, size=n) > 0).astype(int)
+    return X.iloc[:300], y.iloc[:300], X.iloc[300:], y.iloc[300:]
+
+
+@pytest.fixture
+def parallel(monkeypatch):
+    from ml_engine import worker_pool
+
+    monkeypatch.setattr(parallel_trainer, "PARALLEL_TRAIN_MIN_CELLS", 0)
+    monkeypatch.setattr(parallel_trainer, "ML_POOL_WORKERS", 2)
+    yield
+    if worker_pool._executor is not None:
+        worker_pool.retire_executor(worker_pool._executor)
+
+
+class InlinePool:
+    """Runs submitted work at once; submissions of the `dying` algorithms fail as if their worker died."""
+
+    def __init__(self, dying=()):
+        self.dying = dying
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append(args[0])
+        future = Future()
+        if args[0] in self.dying:
+            future.set_exception(BrokenProcessPool("worker died"))
+        else:
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+        return future
+
+
+def _assert_same_outcomes(a, b):
+    for left, right in zip(a, b):
+        if isinstance(right, Exception):
+            assert type(left) is type(right)
+        else:
+            assert left["metrics"] == right["metrics"]
+
+
+def test_parallel_outcomes_equal_serial(parallel):
+    split = _split()
+    serial = train_candidates(ALGORITHMS, "classification", *split, workers=1)
+    finished = []
+
+    outcomes = train_candidates(ALGORITHMS, "classification", *split, workers=2,
+                                on_result=lambda i, outcome: finished.append(i))
+
+    assert isinstance(serial[2], ValueError)
+    _assert_same_outcomes(outcomes, serial)
+    assert sorted(finished) == [0, 1, 2]
+    assert serial[0]["metrics"]["accuracy"] > 0.7
+
+
+def test_dead_worker_is_retried_once_on_a_new_pool(parallel, monkeypatch):
+    pools = [InlinePool(dying=[ALGORITHMS[0]]), InlinePool()]
+    discarded = []
+    monkeypatch.setattr(parallel_trainer, "get_executor", lambda: pools[min(len(discarded), 1)])
+    monkeypatch.setattr(parallel_trainer, "discard_executor", discarded.append)
+
+    outcomes = train_candidates(ALGORITHMS[:2], "classification", *_split(), workers=2)
+
+    assert discarded == [pools[0]]
+    assert not isinstance(outcomes[0], Exception) and not isinstance(outcomes[1], Exception)
+    assert pools[1].submitted[-1] == ALGORITHMS[0]
+
+
+def test_a_candidate_whose_worker_keeps_dying_fails_alone(parallel, monkeypatch):
+    pool = InlinePool(dying=["Decision Tree"])
+    monkeypatch.setattr(parallel_trainer, "get_executor", lambda: pool)
+    monkeypatch.setattr(parallel_trainer, "discard_executor", lambda executor: None)
+
+    outcomes = train_candidates(["Decision Tree", "Logistic Regression"], "classification", *_split(), workers=2)
+
+    assert pool.submitted.count("Decision Tree") == 2
+    assert isinstance(outcomes[0], BrokenProcessPool)
+    assert not isinstance(outcomes[1], Exception)
+
+
+def test_poll_error_stops_the_run_and_retires_its_pool(parallel, monkeypatch):
+    class StuckPool:
+        def submit(self, *args):
+            future = Future()
+            future.set_running_or_notify_cancel()  # running, and never finishes
+            return future
+
+    pool, retired = StuckPool(), []
+    monkeypatch.setattr(parallel_trainer, "get_executor", lambda: pool)
+    monkeypatch.setattr(parallel_trainer, "retire_executor", retired.append)
+    monkeypatch.setattr(parallel_trainer, "TRAIN_POLL_INTERVAL_S", 0.01)
+
+    def poll():
+        raise RuntimeError("cancelled")
+
+    with pytest.raises(RuntimeError):
+        train_candidates(ALGORITHMS[:2], "classification", *_split(), workers=2, poll=poll)
+    assert retired == [pool]
@@ -0,0 +1,61 @@
+import uuid
+import numpy as np
+import pandas as pd
+import pytest
+
+ACTIONS = ["missing", "encoding", "scaling", "outliers"]
+
+
+def _frame(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "x": rng.normal(size=n),
+        "z": rng.exponential(size=n) * 10,
+        "city": rng.choice(["paris", "rome", "oslo"], n),
+        "y": rng.choice(["yes", "no"], n),
+    })
+    df.loc[::7, "x"] = np.nan
+    return df
+
+
+def _request(dataset_id, **fields):
+    return {"dataset_id": dataset_id, "target_column": "y", "categorical_columns": ["city"], **fields}
+
+
+@pytest.mark.parametrize("outlier_method", ["iqr", "zscore", "mad"])
+def test_batch_equals_sequential_actions(client, store, outlier_method):
+    batched, sequential = str(uuid.uuid4()), str(uuid.uuid4())
+    for dataset_id in (batched, sequential):
+        store.save_dataset(dataset_id, _frame())
+
+    response = client.post("/preprocess/batch", json=_request(batched, actions=ACTIONS, outlier_method=outlier_method))
+    for action in ACTIONS:
+        assert client.post("/preprocess/", json=_request(sequential, action=action,
+                                                         outlier_method=outlier_method)).status_code == 200
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["pipeline"] == store.load_pipeline(sequential).actions == ACTIONS
+    assert [entry["action"] for entry in body["actions"]] == ACTIONS
+    assert body["actions"][-1]["rows_after"] == body["rows_after_processing"] == store.dataset_num_rows(sequential)
+    assert body["actions"][-1]["rows_removed"] > 0 and "outlier_counts" in body["actions"][-1]
+    pd.testing.assert_frame_equal(store.load_dataset(batched), store.load_dataset(sequential))
+
+
+def test_batch_is_one_version_per_action(client, store, dataset_id):
+    store.save_dataset(dataset_id, _frame())
+    client.post("/preprocess/batch", json=_request(dataset_id, actions=["missing", "scaling"]))
+
+    versions = client.get(f"/preprocess/versions/{dataset_id}").json()
+    assert len(versions["versions"]) == 3  # the upload, then one per action
+
+
+def test_batch_validation(client, store, dataset_id):
+    store.save_dataset(dataset_id, _frame())
+    assert client.post("/preprocess/batch", json=_request(dataset_id, actions=[])).status_code == 400
+    assert client.post("/preprocess/batch", json=_request(dataset_id, actions=["missing", "nope"])).status_code == 400
+    assert client.post("/preprocess/batch", json=_request(dataset_id, actions=["missing"],
+                                                          target_column="nope")).status_code == 400
+    assert client.post("/preprocess/batch", json=_request(str(uuid.uuid4()), actions=["missing"])).status_code == 404
+    # Nothing was applied
+    assert store.load_pipeline(dataset_id).steps == []
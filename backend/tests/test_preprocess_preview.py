@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+ACTIONS = ["missing", "encoding", "scaling", "outliers"]
+
+
+def _frame(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "x": rng.normal(size=n),
+        "z": rng.exponential(size=n) * 10,
+        "city": rng.choice(["paris", "rome", "oslo"], n),
+        "y": rng.choice(["yes", "no", "maybe"], n, p=[0.6, 0.35, 0.05]),
+    })
+    df.loc[::7, "x"] = np.nan
+    return df
+
+
+def _request(dataset_id, **fields):
+    return {"dataset_id": dataset_id, "target_column": "y", "categorical_columns": ["city"],
+            "actions": ACTIONS, "preview": True, **fields}
+
+
+def test_preview_saves_nothing(client, store, dataset_id):
+    store.save_dataset(dataset_id, _frame())
+    version = store.dataset_version(dataset_id)
+
+    response = client.post("/preprocess/batch", json=_request(dataset_id))
+
+    assert response.status_code == 200 and response.json()["mode"] == "preview"
+    assert store.dataset_version(dataset_id) == version
+    assert store.load_pipeline(dataset_id).steps == []
+    pd.testing.assert_frame_equal(store.load_dataset(dataset_id).astype({"city": object, "y": object}), _frame(),
+                                  check_dtype=False)
+
+
+def test_preview_of_a_small_dataset_is_exact(client, store, dataset_id):
+    store.save_dataset(dataset_id, _frame())
+
+    preview = client.post("/preprocess/batch", json=_request(dataset_id)).json()
+    applied = client.post("/preprocess/batch", json=_request(dataset_id, preview=False)).json()
+
+    assert preview["sample_rows"] == preview["total_rows"] == 2000
+    assert preview["estimated_rows_after_processing"] == applied["rows_after_processing"]
+    assert preview["preview"] == applied["preview"]
+    assert set(preview["changed_statistics"]) == {"x", "z", "city", "y"}
+
+
+def test_preview_of_a_large_dataset_uses_a_stratified_sample(client, store, dataset_id, monkeypatch):
+    from routes import preprocess
+
+    monkeypatch.setattr(preprocess, "PREVIEW_SAMPLE_ROWS", 500)
+    df = _frame()
+    store.save_dataset(dataset_id, df)
+
+    preview = client.post("/preprocess/", json={**_request(dataset_id), "action": "outliers"}).json()
+    sample = store.dataset_sample(dataset_id, 500, stratify="y")
+
+    assert preview["sample_rows"] == len(sample) == pytest.approx(500, abs=2)
+    shares = sample["y"].value_counts(normalize=True)
+    assert shares.to_dict() == pytest.approx(df["y"].value_counts(normalize=True).to_dict(), abs=0.01)
+    removed = preview["actions"][0]["rows_removed"]
+    assert preview["estimated_rows_after_processing"] == round(2000 * (len(sample) - removed) / len(sample))
@@ -0,0 +1,101 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+
+from logic.preprocessing.feature_transformer import encode_data, scale_data
+from ml_engine.outlier_detector import remove_outliers_iqr
+from services.preprocessing_pipeline import PreprocessingPipeline, step_columns
+
+ACTIONS = ["missing", "encoding", "scaling", "outliers"]
+
+
+def _frame(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "row_id": np.arange(n),
+        "x": rng.normal(size=n),
+        "z": rng.exponential(size=n) * 100,
+        "city": rng.choice(["paris", "rome", "oslo"], n),
+        "y": rng.choice(["yes", "no"], n),
+    })
+    df.loc[::11, "x"] = np.nan
+    df.loc[::13, "city"] = None
+    return df
+
+
+def _fit(df, actions=ACTIONS):
+    pipeline = PreprocessingPipeline()
+    for action in actions:
+        df = pipeline.fit_step(action, df, "y", ["city"])
+    return pipeline, df
+
+
+def _same_values(a, b):
+    pd.testing.assert_frame_equal(a.reset_index(drop=True), b.reset_index(drop=True),
+                                  check_dtype=False, check_categorical=False, atol=1e-5)
+
+
+def test_transform_replays_the_fitted_steps():
+    raw = _frame()
+    pipeline, fitted = _fit(raw)
+
+    assert pipeline.actions == ACTIONS
+    assert pipeline.rows == len(fitted) < len(raw)
+    pd.testing.assert_frame_equal(pipeline.transform(raw), fitted)
+
+
+def test_steps_match_the_ml_logic_transforms():
+    raw = _frame()
+    _, fitted = _fit(raw, ["missing", "encoding", "scaling"])
+
+    expected = raw.copy()
+    expected["x"] = expected["x"].fillna(expected["x"].mean())
+    expected["city"] = expected["city"].fillna(expected["city"].mode()[0])
+    expected = scale_data(encode_data(expected, ["city"], "y"), "y")
+    _same_values(fitted, expected)
+
+
+def test_outlier_step_matches_the_iqr_filter():
+    raw = _frame().dropna()
+    _, fitted = _fit(raw, ["outliers"])
+    _same_values(fitted, remove_outliers_iqr(raw, "y"))
+
+
+def test_persisted_pipeline_transforms_identically():
+    raw = _frame()
+    pipeline, fitted = _fit(raw)
+
+    restored = PreprocessingPipeline.from_dict(json.loads(json.dumps(pipeline.to_dict())))
+
+    pd.testing.assert_frame_equal(restored.transform(raw), fitted)
+
+
+def test_batches_and_column_subsets_transform_like_the_whole_frame():
+    raw = _frame()
+    pipeline, fitted = _fit(raw)
+
+    batches = pd.concat([pipeline.transform(raw.iloc[start:start + 120]) for start in range(0, len(raw), 120)])
+    _same_values(batches, fitted)
+
+    columns = pipeline.input_columns(["city"])
+    assert set(columns) >= {"city", "x", "z"}  # the outlier step reads x and z
+    _same_values(pipeline.transform(raw[columns])[["city"]], fitted[["city"]])
+
+
+def test_steps_without_work_are_not_recorded():
+    pipeline = PreprocessingPipeline()
+    df = pd.DataFrame({"a": [1.0, 2.0, 3.0], "y": [0, 1, 0]})
+    assert pipeline.fit_step("missing", df, "y", []) is df
+    assert pipeline.steps == []
+    with pytest.raises(ValueError):
+        pipeline.fit_step("nope", df, "y", [])
+
+
+def test_step_columns():
+    pipeline, _ = _fit(_frame())
+    missing, encoding, scaling, outliers = pipeline.steps
+    assert set(step_columns(missing)) == {"x", "city"}
+    assert set(step_columns(encoding)) == {"city", "y"}
+    assert set(step_columns(scaling)) == {"x", "z", "city"}
+    assert step_columns(outliers) == []
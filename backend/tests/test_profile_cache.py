@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from services.profile_cache import ProfileCache
+
+
+def _fingerprint(raw="a" * 64, content="b" * 64, version=(1, 100)):
+    return {"raw_hash": raw, "content_hash": content, "version": list(version)}
+
+
+def test_results_are_keyed_by_state_target_and_kind(tmp_path):
+    cache = ProfileCache(str(tmp_path), max_entries=16)
+    cache.put("d", _fingerprint(), "y", "profile-full", {"rows": 1})
+
+    assert cache.get("d", _fingerprint(), "y", "profile-full") == {"rows": 1}
+    assert cache.get("d", _fingerprint(), "z", "profile-full") is None
+    assert cache.get("d", _fingerprint(), "y", "meta") is None
+    assert cache.get("d", _fingerprint(version=(2, 100)), "y", "profile-full") is None
+    assert cache.get("other", _fingerprint(), "y", "profile-full") is None
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_results_survive_a_restart(tmp_path):
+    ProfileCache(str(tmp_path), max_entries=16).put("d", _fingerprint(), None, "columns", {"x": [1.5, None]})
+
+    restarted = ProfileCache(str(tmp_path), max_entries=16)
+    assert restarted.get("d", _fingerprint(), None, "columns") == {"x": [1.5, None]}
+
+
+def test_memory_entries_are_bounded_but_disk_still_serves(tmp_path):
+    cache = ProfileCache(str(tmp_path), max_entries=2)
+    for kind in ("a", "b", "c"):
+        cache.put("d", _fingerprint(), None, kind, {"kind": kind})
+
+    assert cache.stats()["entries"] == 2
+    assert cache.get("d", _fingerprint(), None, "a") == {"kind": "a"}
+
+
+def test_versions_per_dataset_and_replaced_raw_data(tmp_path):
+    cache = ProfileCache(str(tmp_path), max_entries=16, versions_per_dataset=2)
+    for version in (1, 2, 3):
+        cache.put("d", _fingerprint(version=(version, 0)), None, "meta", {"v": version})
+
+    assert cache.get("d", _fingerprint(version=(1, 0)), None, "meta") is None
+    assert cache.get("d", _fingerprint(version=(2, 0)), None, "meta") == {"v": 2}
+
+    # New raw data (a fresh upload): every earlier version's result goes
+    cache.put("d", _fingerprint(raw="c" * 64, version=(4, 0)), None, "meta", {"v": 4})
+    assert cache.get("d", _fingerprint(version=(3, 0)), None, "meta") is None
+    assert len(list((tmp_path / "d").iterdir())) == 1
+
+    cache.invalidate("d")
+    assert cache.get("d", _fingerprint(raw="c" * 64, version=(4, 0)), None, "meta") is None
+
+
+def test_profiling_endpoint_is_cached_until_the_dataset_changes(client, store, dataset_id):
+    from services.profile_cache import profile_cache
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"x": rng.normal(size=200), "y": rng.choice(["a", "b"], 200)})
+    store.save_dataset(dataset_id, df)
+
+    first = client.get(f"/profiling/{dataset_id}", params={"target_column": "y"}).json()
+    hits = profile_cache.hits
+    assert client.get(f"/profiling/{dataset_id}", params={"target_column": "y"}).json() == first
+    assert profile_cache.hits == hits + 1
+
+    store.save_dataset(dataset_id, df.head(50))
+    assert client.get(f"/profiling/{dataset_id}", params={"target_column": "y"}).json()["rows"] == 50
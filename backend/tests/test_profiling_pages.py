@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _frame(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({f"n{i}": rng.normal(size=n) for i in range(5)})
+    df["city"] = rng.choice(["paris", "rome"], n)
+    df["y"] = rng.choice(["yes", "no"], n)
+    df.loc[::9, "n2"] = np.nan
+    return df
+
+
+def _filled(stats: dict) -> dict:
+    # Windows only carry the describe rows their own columns use
+    return {stat: value for stat, value in stats.items() if value != ""}
+
+
+@pytest.fixture
+def stored(store, dataset_id):
+    store.save_dataset(dataset_id, _frame())
+    return dataset_id
+
+
+def test_column_pages_add_up_to_the_full_profile(client, stored):
+    full = client.get(f"/profiling/{stored}").json()
+
+    pages = [client.get(f"/profiling/{stored}/columns", params={"offset": offset, "limit": 3}).json()
+             for offset in (0, 3, 6)]
+
+    assert [page["column_names"] for page in pages] == [["n0", "n1", "n2"], ["n3", "n4", "city"], ["y"]]
+    assert sum((page["column_info"] for page in pages), []) == full["column_info"]
+    for page in pages:
+        assert page["rows"] == 200 and page["columns"] == 7
+        for col, stats in page["descriptive_statistics"].items():
+            assert _filled(stats) == pytest.approx(_filled(full["descriptive_statistics"][col]))
+        assert page["preview"] == [{col: row[col] for col in page["column_names"]} for row in full["preview"]]
+
+
+def test_explicit_column_window(client, stored):
+    page = client.get(f"/profiling/{stored}/columns", params=[("columns", "y"), ("columns", "n1")]).json()
+    assert page["column_names"] == ["y", "n1"] and page["offset"] is None
+    assert page["descriptive_statistics"]["y"]["unique"] == 2
+
+
+def test_summary_matches_the_full_profile(client, stored):
+    summary = client.get(f"/profiling/{stored}/summary", params={"target_column": "y"}).json()
+    full = client.get(f"/profiling/{stored}", params={"target_column": "y"}).json()
+
+    assert summary["column_names"] == list(_frame().columns)
+    assert summary["rows"] == full["rows"] and summary["total_missing_values"] == full["total_missing_values"]
+    assert summary["meta_features"] == pytest.approx(full["meta_features"])
+
+
+def test_invalid_windows(client, stored):
+    assert client.get(f"/profiling/{stored}/columns", params={"limit": 0}).status_code == 400
+    assert client.get(f"/profiling/{stored}/columns", params={"offset": -1}).status_code == 400
+    assert client.get(f"/profiling/{stored}/columns", params={"columns": "nope"}).status_code == 400
+    assert client.get("/profiling/missing/columns").status_code == 404
@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml_engine.sketches import DistinctCounter, HyperLogLog, KLLSketch, MisraGries, hash_values
+from ml_engine.streaming_profiler import StreamingProfiler, profile_stream
+
+
+def _chunks(df, size):
+    return [df.iloc[start:start + size] for start in range(0, len(df), size)]
+
+
+def test_hash_values_agree_across_dtypes_and_batches():
+    values = pd.Series(["a", "b", None, "a"])
+    np.testing.assert_array_equal(hash_values(values), hash_values(values.astype("category")))
+    np.testing.assert_array_equal(hash_values(pd.Series([1, 2])), hash_values(np.array([1, 2], dtype=np.int8)))
+
+
+def test_hyperloglog_accuracy_and_merge():
+    hashes = hash_values(np.arange(200_000))
+    single = HyperLogLog()
+    single.update(hashes)
+    left, right = HyperLogLog(), HyperLogLog()
+    left.update(hashes[:120_000])
+    right.update(hashes[80_000:])  # overlapping parts
+
+    np.testing.assert_array_equal(left.merge(right).registers, single.registers)
+    assert single.estimate() == pytest.approx(200_000, rel=0.03)
+    small = HyperLogLog()
+    small.update(hashes[:100])
+    assert small.estimate() == pytest.approx(100, rel=0.05)
+
+
+def test_distinct_counter_is_exact_until_the_limit():
+    counter = DistinctCounter(limit=1000)
+    for part in np.array_split(np.arange(900) % 500, 3):
+        counter.update(hash_values(part))
+    assert not counter.approximate and counter.count() == 500
+
+    left, right = DistinctCounter(limit=1000), DistinctCounter(limit=1000)
+    left.update(hash_values(np.arange(0, 800)))
+    right.update(hash_values(np.arange(600, 5000)))
+    merged = left.merge(right)
+    assert merged.approximate
+    assert merged.count() == pytest.approx(5000, rel=0.03)
+
+
+def test_kll_is_exact_before_compaction_and_within_rank_error_after():
+    rng = np.random.default_rng(0)
+    small = rng.normal(size=150)
+    sketch = KLLSketch(k=200)
+    sketch.update(small)
+    assert not sketch.approximate
+    assert sketch.quantiles([0.25, 0.5]) == pytest.approx(list(np.quantile(small, [0.25, 0.5])))
+
+    values = rng.normal(size=100_000)
+    parts = [KLLSketch(seed=i) for i in range(4)]
+    for part, chunk in zip(parts, np.array_split(values, 4)):
+        for block in np.array_split(chunk, 10):
+            part.update(block)
+    merged = parts[0].merge(parts[1]).merge(parts[2].merge(parts[3]))
+
+    assert merged.approximate and merged.n == len(values)
+    ranks = np.searchsorted(np.sort(values), merged.quantiles([0.1, 0.25, 0.5, 0.75, 0.9])) / len(values)
+    np.testing.assert_allclose(ranks, [0.1, 0.25, 0.5, 0.75, 0.9], atol=0.02)
+
+
+def test_misra_gries_merge_keeps_heavy_hitters():
+    rng = np.random.default_rng(0)
+    values = pd.Series(np.concatenate([np.repeat(["hot", "warm"], [5000, 3000]),
+                                       [f"rare{i}" for i in rng.integers(0, 2000, 4000)]]))
+    values = values.sample(frac=1, random_state=0)
+    truth = values.value_counts()
+
+    parts = []
+    for chunk in _chunks(values, 2400):
+        part = MisraGries(k=64)
+        part.update(chunk)
+        parts.append(part)
+    merged = parts[0]
+    for part in parts[1:]:
+        merged = merged.merge(part)
+
+    top = merged.top(2)
+    assert list(top.index) == ["hot", "warm"]
+    for value, count in top.items():
+        assert truth[value] - merged.error <= count <= truth[value]
+
+    exact = MisraGries(k=64)
+    exact.update(pd.Series(["a", "b", "a"]))
+    assert not exact.approximate and exact.top().to_dict() == {"a": 2, "b": 1}
+
+
+def _frame(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "x": rng.normal(5, 2, n),
+        "y": rng.integers(0, 100, n).astype(float),
+        "city": rng.choice(["paris", "rome", "oslo"], n),
+        "target": rng.choice(["yes", "no"], n, p=[0.3, 0.7]),
+    })
+    df.loc[rng.random(n) < 0.05, "y"] = np.nan
+    return df
+
+
+def test_streaming_profile_matches_in_memory_describe():
+    df = _frame()
+
+    result = profile_stream(_chunks(df, 700), target_column="target", total_rows=len(df))
+
+    assert (result["rows"], result["columns"]) == df.shape
+    assert result["total_missing_values"] == int(df.isna().sum().sum())
+    stats = result["descriptive_statistics"]
+    expected = df.describe(include="all")
+    for col in ("x", "y"):
+        for stat in ("count", "mean", "std", "min", "max"):
+            assert stats[col][stat] == pytest.approx(expected.loc[stat, col], rel=1e-9)
+        for stat, q in (("25%", 0.25), ("50%", 0.5), ("75%", 0.75)):
+            # KLL quantiles: bounded rank error, not value error
+            values = df[col].dropna()
+            assert (values < stats[col][stat]).mean() - 0.02 <= q <= (values <= stats[col][stat]).mean() + 0.02
+    for col in ("city", "target"):
+        for stat in ("count", "unique", "top", "freq"):
+            assert stats[col][stat] == expected.loc[stat, col]
+    assert result["meta_features"]["n_classes"] == 2
+    assert set(result["approximate"]["descriptive_statistics"]) == {"x", "y"}
+
+
+def test_merged_profiles_equal_a_single_pass():
+    df = _frame()
+    single = StreamingProfiler("target", len(df))
+    for chunk in _chunks(df, 500):
+        single.update(chunk)
+    left, right = StreamingProfiler("target", len(df)), StreamingProfiler("target", len(df))
+    left.update(df.iloc[:1200])
+    right.update(df.iloc[1200:])
+
+    merged, expected = left.merge(right).result(), single.result()
+
+    assert merged["rows"] == expected["rows"] and merged["column_info"] == expected["column_info"]
+    for col in ("city", "target"):
+        assert merged["descriptive_statistics"][col] == expected["descriptive_statistics"][col]
+    for stat in ("mean", "std", "min", "max"):
+        assert merged["descriptive_statistics"]["x"][stat] == pytest.approx(expected["descriptive_statistics"]["x"][stat])
+    assert merged["meta_features"]["class_imbalance_ratio"] == pytest.approx(expected["meta_features"]["class_imbalance_ratio"])
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.preprocessing_pipeline import PreprocessingPipeline
+from services.version_log import VersionLog
+
+
+def _step(action, columns=("a",), rows=10):
+    params = {"missing": {"fill": dict.fromkeys(columns, 0.0)}, "scaling": {"mean": dict.fromkeys(columns, 0.0),
+              "scale": dict.fromkeys(columns, 1.0)}, "outliers": {"method": "iqr", "bounds": {}}}[action]
+    return {"action": action, "params": params, "schema": {}, "rows": rows}
+
+
+def _commit(log, *steps):
+    return log.commit(PreprocessingPipeline(log.pipeline().steps + list(steps)))
+
+
+def test_commit_undo_redo_and_branches():
+    log = VersionLog()
+    assert _commit(log, _step("missing"), _step("scaling", ["b"])) == 2
+    assert log.chain() == [1, 2] and log.pipeline().actions == ["missing", "scaling"]
+
+    log.head = log.undo_target()
+    assert log.head == 1 and log.redo_target() == 2
+
+    # A new action after an undo starts a branch; redo follows the newest one
+    assert _commit(log, _step("outliers", rows=8)) == 3
+    assert log.versions[3]["parent"] == 1
+    log.head = log.undo_target()
+    assert log.redo_target() == 3
+    assert log.pipeline(2).actions == ["missing", "scaling"]
+
+    log.head = 0
+    assert log.undo_target() is None and log.pipeline().steps == []
+
+
+def test_compare_versions_from_the_log():
+    log = VersionLog()
+    _commit(log, _step("missing"), _step("scaling", ["b"]))
+    log.head = 1
+    _commit(log, _step("outliers", rows=8))
+
+    result = log.compare(2, 3, raw_rows=10)
+
+    assert result["common_ancestor"] == 1
+    assert result["actions_only_in_a"] == ["scaling"] and result["actions_only_in_b"] == ["outliers"]
+    assert result["rows_differ"] and result["changed_columns"] == ["b"]
+    assert result["a"]["rows"] == 10 and result["b"]["rows"] == 8
+    assert log.compare(0, 2)["changed_columns"] == ["a", "b"]
+
+
+def test_serialization_and_legacy_pipelines():
+    log = VersionLog()
+    _commit(log, _step("missing"))
+    assert VersionLog.from_dict(log.to_dict()).to_dict() == log.to_dict()
+
+    legacy = VersionLog.from_dict(PreprocessingPipeline([_step("missing"), _step("scaling")]).to_dict())
+    assert legacy.head == 2 and legacy.pipeline().actions == ["missing", "scaling"]
+    assert 2 in legacy and 3 not in legacy and "1" not in legacy
+
+
+def _frame(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"x": rng.normal(size=n), "z": rng.exponential(size=n), "y": rng.choice(["a", "b"], n)})
+    df.loc[::5, "x"] = np.nan
+    return df
+
+
+def _apply(client, dataset_id, action):
+    response = client.post("/preprocess/", json={"dataset_id": dataset_id, "target_column": "y", "action": action})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_undo_redo_round_trip(client, store, dataset_id):
+    store.save_dataset(dataset_id, _frame())
+    raw = store.load_dataset(dataset_id)
+    _apply(client, dataset_id, "missing")
+    imputed = store.load_dataset(dataset_id)
+    _apply(client, dataset_id, "outliers")
+    filtered = store.load_dataset(dataset_id)
+    assert len(filtered) < len(raw)
+
+    undone = client.post("/preprocess/undo", json={"dataset_id": dataset_id}).json()
+    assert undone["version"] == 1 and undone["pipeline"] == ["missing"]
+    assert undone["rows_after_processing"] == len(raw)
+    pd.testing.assert_frame_equal(store.load_dataset(dataset_id), imputed)
+
+    client.post("/preprocess/undo", json={"dataset_id": dataset_id})
+    pd.testing.assert_frame_equal(store.load_dataset(dataset_id), raw)
+    assert client.post("/preprocess/undo", json={"dataset_id": dataset_id}).status_code == 400
+
+    client.post("/preprocess/redo", json={"dataset_id": dataset_id})
+    redone = client.post("/preprocess/redo", json={"dataset_id": dataset_id}).json()
+    assert redone["version"] == 2
+    pd.testing.assert_frame_equal(store.load_dataset(dataset_id), filtered)
+    assert client.post("/preprocess/redo", json={"dataset_id": dataset_id}).status_code == 400
+
+
+def test_checkout_and_compare(client, store, dataset_id):
+    store.save_dataset(dataset_id, _frame())
+    _apply(client, dataset_id, "missing")
+    _apply(client, dataset_id, "scaling")
+    scaled = store.load_dataset(dataset_id)
+
+    assert client.post("/preprocess/checkout", json={"dataset_id": dataset_id, "version": 0}).json()["pipeline"] == []
+    assert client.post("/preprocess/checkout", json={"dataset_id": dataset_id, "version": 9}).status_code == 404
+    # Older versions stay readable without moving the head
+    pd.testing.assert_frame_equal(store.load_dataset(dataset_id, version=2), scaled)
+    assert store.load_dataset(dataset_id)["x"].isna().any()
+
+    compared = client.get(f"/preprocess/versions/{dataset_id}/compare",
+                          params={"a": 0, "b": 2, "statistics": True}).json()
+    assert compared["actions_only_in_b"] == ["missing", "scaling"]
+    assert set(compared["changed_statistics"]) == {"x", "z"}
+    assert compared["changed_statistics"]["z"]["b"]["mean"] == pytest.approx(0.0, abs=1e-9)
@@ -1,28 +1,168 @@
-
+import os
+import json
 import math
 import numpy as np
 import pandas as pd
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback: same output, slower
+    orjson = None
+
+# orjson writes numpy arrays/scalars natively (NaN/Inf become null) and accepts int/float dict keys
+ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+
+
+def _sanitize_float(value):
+    return float(value) if math.isfinite(value) else None  #: JSON null
+
+
+def _sanitize_key(key):
+    return key.item() if isinstance(key, np.generic) else key
+
+
+# Exact-type dispatch for the common scalars: one dict lookup instead of a chain of isinstance checks
+_SCALARS = {
+    str: lambda v: v,
+    bool: lambda v: v,
+    int: lambda v: v,
+    type(None): lambda v: v,
+    float: _sanitize_float,
+    np.float64: _sanitize_float,
+    np.float32: _sanitize_float,
+    np.bool_: bool,
+    np.int64: int,
+    np.int32: int,
+}
+
+
+def sanitize_array(values: np.ndarray) -> list:
+    """
+    Vectorized sanitize_for_json for an array: NaN/Inf (and NaT) become None in one
+    mask over the whole array, then a single tolist() yields native Python values.
+    """
+    values = np.asarray(values)
+    kind = values.dtype.kind
+    if kind in "biu":
+        return values.tolist()
+    if kind == "f":
+        finite = np.isfinite(values)
+        if finite.all():
+            return values.tolist()
+        out = values.astype(object)
+        out[~finite] = None
+        return out.tolist()
+    if kind in "mM":
+        out = values.astype(str).astype(object)
+        out[np.isnat(values)] = None
+        return out.tolist()
+    return [sanitize_for_json(v) for v in values.tolist()]
+
+
+def sanitize_series(series: pd.Series) -> list:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Sanitize the (few) categories once and index them with the codes
+        categories = np.array(sanitize_array(series.cat.categories.to_numpy()) + [None], dtype=object)
+        return categories[series.cat.codes.to_numpy()].tolist()
+    if pd.api.types.is_extension_array_dtype(series.dtype) and series.dtype.kind in "biuf":
+        # Nullable ints/floats/booleans: <NA> becomes None
+        return series.astype(object).where(series.notna(), None).tolist()
+    return sanitize_array(series.to_numpy())
+
+
+def frame_records(df: pd.DataFrame) -> list[dict]:
+    """
+    df.to_dict(orient="records") with JSON-safe values: each column is sanitized as a
+    whole (sanitize_series), then the columns are zipped into row dicts.
+    """
+    columns = [sanitize_series(df.iloc[:, i]) for i in range(df.shape[1])]
+    keys = [_sanitize_key(col) for col in df.columns]
+    return [dict(zip(keys, row)) for row in zip(*columns)]
+
 
 def sanitize_for_json(data):
     """
     Recursively sanitize data to ensure it is JSON serializable.
     - Converts NaN, Infinity, -Infinity to None.
     - Converts numpy types to native Python types.
-    - Handles nested dicts and lists.
+    - Handles nested dicts and lists; arrays, Series and DataFrames (as records)
+      are sanitized column-wise in vectorized form.
     """
+    scalar = _SCALARS.get(type(data))
+    if scalar is not None:
+        return scalar(data)
     if isinstance(data, dict):
-        return {k: sanitize_for_json(v) for k, v in data.items()}
-    elif isinstance(data, list):
+        return {_sanitize_key(k): sanitize_for_json(v) for k, v in data.items()}
+    elif isinstance(data, (list, tuple)):
         return [sanitize_for_json(v) for v in data]
-    elif isinstance(data, (float, np.float32, np.float64)):
-        if pd.isna(data) or math.isnan(data) or math.isinf(data):
-            return None #: JSON null
-        return float(data)
-    elif isinstance(data, (int, np.int32, np.int64)):
-        return int(data)
+    elif isinstance(data, np.ndarray):
+        return sanitize_array(data)
+    elif isinstance(data, pd.Series):
+        return sanitize_series(data)
+    elif isinstance(data, pd.DataFrame):
+        return frame_records(data)
     elif isinstance(data, (np.bool_, bool)):
         return bool(data)
-    elif pd.isna(data): # General check for other pandas types like NaT
+    elif isinstance(data, (float, np.floating)):
+        return _sanitize_float(data)
+    elif isinstance(data, (int, np.integer)):
+        return int(data)
+    elif pd.api.types.is_scalar(data) and pd.isna(data): # General check for other pandas types like NaT
         return None
+    elif isinstance(data, pd.Timestamp):
+        return data.isoformat()
     else:
         return data
+
+
+def _default(obj):
+    # orjson hook for the types it does not handle itself
+    if isinstance(obj, (pd.Series, pd.DataFrame, np.ndarray)):
+        return sanitize_for_json(obj)
+    if pd.api.types.is_scalar(obj) and pd.isna(obj):
+        return None
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return sanitize_for_json(obj.item())
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(data) -> bytes:
+    """JSON bytes of `data` (NaN/Inf as null, numpy and pandas values as native JSON)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except TypeError:
+            # e.g. numpy or Timestamp dict keys, which orjson does not convert
+            return orjson.dumps(sanitize_for_json(data), default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(sanitize_for_json(data), allow_nan=False, default=str).encode("utf-8")
+
+
+def loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def dump_json(data, path: str) -> None:
+    """Write `data` to `path` as JSON, atomically (readers never see a partial file)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(dumps(data))
+    os.replace(tmp_path, path)
+
+
+def load_json(path: str):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Default response class of the app (main.py): renders with `dumps`. Routes that
+    return a large payload wrap it in this class directly, which also skips
+    FastAPI's per-value jsonable_encoder pass.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
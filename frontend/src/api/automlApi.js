@@ -31,6 +31,33 @@ export const getProfiling = async (datasetId, targetColumn = null) => {
   return response.json();
 };
 
+// Dataset-level profile (meta-features, suggestions, column names) without per-column stats
+export const getProfilingSummary = async (datasetId, targetColumn = null) => {
+  let url = `${BASE_URL}/profiling/${datasetId}/summary`;
+  if (targetColumn) {
+    url += `?target_column=${encodeURIComponent(targetColumn)}`;
+  }
+  const response = await fetch(url, {
+    headers: getAuthHeaders(),
+  });
+  return response.json();
+};
+
+// Column info, descriptive statistics and preview for a window of columns
+export const getProfilingColumns = async (datasetId, { offset = 0, limit = 50, columns = null } = {}) => {
+  const params = new URLSearchParams();
+  if (columns) {
+    columns.forEach((column) => params.append("columns", column));
+  } else {
+    params.append("offset", offset);
+    params.append("limit", limit);
+  }
+  const response = await fetch(`${BASE_URL}/profiling/${datasetId}/columns?${params}`, {
+    headers: getAuthHeaders(),
+  });
+  return response.json();
+};
+
 export const preprocessDataset = async (datasetId, payload) => {
   const response = await fetch(`${BASE_URL}/preprocess/`, {
     method: "POST",
@@ -43,6 +70,103 @@ export const preprocessDataset = async (datasetId, payload) => {
   return response.json();
 };
 
+// Several actions in one request (one load, one persist), applied in the given order
+export const preprocessDatasetBatch = async (datasetId, payload) => {
+  const response = await fetch(`${BASE_URL}/preprocess/batch`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      ...getAuthHeaders(),
+    },
+    body: JSON.stringify(payload),
+  });
+  return response.json();
+};
+
+// Estimate an action's effect on a cached sample of the dataset; nothing is saved
+export const previewPreprocessing = async (datasetId, payload) => {
+  const response = await fetch(`${BASE_URL}/preprocess/`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      ...getAuthHeaders(),
+    },
+    body: JSON.stringify({ ...payload, preview: true }),
+  });
+  return response.json();
+};
+
+// Version history of the applied actions: list, undo, redo, checkout and compare
+export const getDatasetVersions = async (datasetId) => {
+  const response = await fetch(`${BASE_URL}/preprocess/versions/${datasetId}`, {
+    headers: getAuthHeaders(),
+  });
+  return response.json();
+};
+
+const moveVersion = async (path, body) => {
+  const response = await fetch(`${BASE_URL}/preprocess/${path}`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      ...getAuthHeaders(),
+    },
+    body: JSON.stringify(body),
+  });
+  return response.json();
+};
+
+export const undoPreprocessing = (datasetId) => moveVersion("undo", { dataset_id: datasetId });
+
+export const redoPreprocessing = (datasetId) => moveVersion("redo", { dataset_id: datasetId });
+
+export const checkoutVersion = (datasetId, version) =>
+  moveVersion("checkout", { dataset_id: datasetId, version });
+
+export const compareVersions = async (datasetId, a, b, statistics = false) => {
+  const params = new URLSearchParams({ a, b, statistics });
+  const response = await fetch(`${BASE_URL}/preprocess/versions/${datasetId}/compare?${params}`, {
+    headers: getAuthHeaders(),
+  });
+  return response.json();
+};
+
+// Queued AutoML runs: submit, poll status/progress, fetch results, cancel
+// `options`: racing, racing_min_rows, racing_eta, racing_eval_rows (omitted: server defaults)
+export const submitAutoMLJob = async (datasetId, targetColumn, options = {}) => {
+  const response = await fetch(`${BASE_URL}/automl/jobs`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      ...getAuthHeaders(),
+    },
+    body: JSON.stringify({ dataset_id: datasetId, target_column: targetColumn, ...options }),
+  });
+  return response.json();
+};
+
+export const getAutoMLJob = async (jobId) => {
+  const response = await fetch(`${BASE_URL}/automl/jobs/${jobId}`, {
+    headers: getAuthHeaders(),
+  });
+  return response.json();
+};
+
+export const getAutoMLJobResults = async (jobId) => {
+  const response = await fetch(`${BASE_URL}/automl/jobs/${jobId}/results`, {
+    headers: getAuthHeaders(),
+  });
+  return response.json();
+};
+
+export const cancelAutoMLJob = async (jobId) => {
+  const response = await fetch(`${BASE_URL}/automl/jobs/${jobId}/cancel`, {
+    method: "POST",
+    headers: getAuthHeaders(),
+  });
+  return response.json();
+};
+
 // ✅ FIXED — matches your FastAPI route
 export const getRecommendation = async (datasetId) => {
   const targetColumn = localStorage.getItem("target_column");
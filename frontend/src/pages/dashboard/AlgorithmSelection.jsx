@@ -1,10 +1,12 @@
 import React, { useState, useEffect } from "react";
 import { motion } from "framer-motion";
 import { useNavigate } from "react-router-dom";
-import { FaPlay, FaRobot, FaCheckCircle, FaExclamationTriangle, FaArrowRight, FaFilePdf, FaFileWord } from "react-icons/fa";
+import { FaPlay, FaStop, FaRobot, FaCheckCircle, FaExclamationTriangle, FaArrowRight, FaFilePdf, FaFileWord } from "react-icons/fa";
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts';
 import api from "../../api/axios";
-import { downloadReport } from "../../api/automlApi";
+import {
+  downloadReport, submitAutoMLJob, getAutoMLJob, getAutoMLJobResults, cancelAutoMLJob,
+} from "../../api/automlApi";
 
 // Animation variants
 const containerVariants = {
@@ -25,6 +27,9 @@ const AlgorithmSelection = () => {
   const [datasetId, setDatasetId] = useState(null);
   const [targetColumn, setTargetColumn] = useState(null);
   const [loading, setLoading] = useState(false);
+  const [jobStage, setJobStage] = useState(null);
+  const [jobId, setJobId] = useState(null);
+  const [cancelling, setCancelling] = useState(false);
   const [results, setResults] = useState(null);
   const [error, setError] = useState(null);
   const [downloading, setDownloading] = useState(false);
@@ -68,16 +73,45 @@ const AlgorithmSelection = () => {
     setResults(null);
 
     try {
-      const response = await api.post("/automl/run", {
-        dataset_id: datasetId,
-        target_column: targetColumn,
-      });
-      setResults(response.data);
+      // Queued run: the job id comes back at once, then the job is polled until it finishes
+      const job = await submitAutoMLJob(datasetId, targetColumn);
+      if (!job.job_id) {
+        setError(job.detail || "Failed to submit the AutoML job.");
+        return;
+      }
+      setJobId(job.job_id);
+      let status = job;
+      while (!["succeeded", "failed", "cancelled"].includes(status.status)) {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        status = await getAutoMLJob(job.job_id);
+        if (!status.status) throw new Error(status.detail || "Job not found.");
+        setJobStage(status.progress?.stage || status.status);
+      }
+      if (status.status !== "succeeded") {
+        setError(status.status === "cancelled" ? "AutoML run cancelled." : status.error || `AutoML job ${status.status}.`);
+        return;
+      }
+      setResults(await getAutoMLJobResults(job.job_id));
     } catch (err) {
       console.error("AutoML Error:", err);
       setError("Failed to run AutoML. Please check the backend connection.");
     } finally {
       setLoading(false);
+      setJobStage(null);
+      setJobId(null);
+      setCancelling(false);
+    }
+  };
+
+  const handleCancelAutoML = async () => {
+    if (!jobId) return;
+    // The running job stops at its next progress report; the polling loop sees it as "cancelled"
+    setCancelling(true);
+    try {
+      await cancelAutoMLJob(jobId);
+    } catch (err) {
+      console.error("Cancel Error:", err);
+      setCancelling(false);
     }
   };
 
@@ -128,28 +162,40 @@ const AlgorithmSelection = () => {
             </div>
           </div>
 
-          <button
-            onClick={handleRunAutoML}
-            disabled={loading || !datasetId}
-            className={`
-              flex items-center gap-2 px-6 py-3 rounded-xl font-bold transition-all
-              ${loading 
-                ? "bg-gray-600 cursor-not-allowed" 
-                : "bg-gradient-to-r from-blue-500 to-purple-600 hover:shadow-lg hover:shadow-purple-500/25 active:scale-95"
-              }
-            `}
-          >
-            {loading ? (
-              <>
-                <div className="w-4 h-4 border-2 border-white/30 border-t-white rounded-full animate-spin" />
-                Training Models...
-              </>
-            ) : (
-              <>
-                <FaPlay /> Run AutoML
-              </>
+          <div className="flex items-center gap-3">
+            <button
+              onClick={handleRunAutoML}
+              disabled={loading || !datasetId}
+              className={`
+                flex items-center gap-2 px-6 py-3 rounded-xl font-bold transition-all
+                ${loading 
+                  ? "bg-gray-600 cursor-not-allowed" 
+                  : "bg-gradient-to-r from-blue-500 to-purple-600 hover:shadow-lg hover:shadow-purple-500/25 active:scale-95"
+                }
+              `}
+            >
+              {loading ? (
+                <>
+                  <div className="w-4 h-4 border-2 border-white/30 border-t-white rounded-full animate-spin" />
+                  Training Models{jobStage ? ` (${jobStage})` : ""}...
+                </>
+              ) : (
+                <>
+                  <FaPlay /> Run AutoML
+                </>
+              )}
+            </button>
+
+            {loading && jobId && (
+              <button
+                onClick={handleCancelAutoML}
+                disabled={cancelling}
+                className="flex items-center gap-2 px-6 py-3 rounded-xl font-bold transition-all bg-red-500/10 border border-red-500/30 text-red-400 hover:bg-red-500/20 disabled:opacity-50 disabled:cursor-not-allowed"
+              >
+                <FaStop /> {cancelling ? "Cancelling..." : "Cancel"}
+              </button>
             )}
-          </button>
+          </div>
         </div>
 
         {error && (
@@ -245,7 +291,12 @@ const AlgorithmSelection = () => {
                               <td className="p-3">
                                 {idx === 0 ? <FaTrophy className="text-yellow-400" /> : idx + 1}
                               </td>
-                              <td className="p-3 font-medium">{algo.name}</td>
+                              <td className="p-3 font-medium">
+                                {algo.name}
+                                {algo.eliminated && (
+                                  <span className="ml-2 text-xs text-gray-500">eliminated at {algo.trained_rows} rows</span>
+                                )}
+                              </td>
                               <td className="p-3 font-mono text-green-400 font-bold">{algo.accuracy}%</td>
                               <td className="p-3 font-mono text-blue-400">{algo.f1_score}%</td>
                               <td className="p-3 text-xs text-gray-400 italic max-w-xs">{algo.tradeoffs}</td>
@@ -256,6 +307,42 @@ const AlgorithmSelection = () => {
                     </div>
                   </div>
 
+                  {/* Elimination schedule (successive halving) */}
+                  {results.racing && results.racing.rungs.length > 0 && (
+                    <div className="bg-base-100 p-6 rounded-2xl border border-base-content/10 shadow-sm">
+                      <h3 className="text-lg font-bold text-base-content mb-4">Candidate Racing</h3>
+                      <table className="w-full text-left border-collapse text-sm">
+                        <thead>
+                          <tr className="text-base-content/60 border-b border-base-content/10">
+                            <th className="p-3">Rung</th>
+                            <th className="p-3">Training Rows</th>
+                            <th className="p-3">Candidates (score)</th>
+                          </tr>
+                        </thead>
+                        <tbody className="text-base-content/80">
+                          {results.racing.rungs.map((rung, idx) => (
+                            <tr key={idx} className="border-b border-base-content/5 last:border-0">
+                              <td className="p-3">{idx + 1}</td>
+                              <td className="p-3 font-mono">{rung.rows}</td>
+                              <td className="p-3">
+                                {rung.candidates.map((c) => (
+                                  <span key={c.name} className={`mr-3 ${c.promoted ? "text-green-400" : "text-gray-500 line-through"}`}>
+                                    {c.name} ({c.score === null ? "failed" : c.score.toFixed(3)})
+                                  </span>
+                                ))}
+                              </td>
+                            </tr>
+                          ))}
+                          <tr>
+                            <td className="p-3">Final</td>
+                            <td className="p-3 font-mono">{results.racing.train_rows}</td>
+                            <td className="p-3 text-green-400">{results.racing.finalists.join(", ")}</td>
+                          </tr>
+                        </tbody>
+                      </table>
+                    </div>
+                  )}
+
                    {/* Charts (Feature Importance) */}
                    <div className="bg-base-100 p-6 rounded-2xl border border-base-content/10 shadow-sm">
                       <h3 className="text-lg font-bold text-base-content mb-4">Feature Importance (SHAP)</h3>
@@ -1,11 +1,15 @@
 
 import React, { useState } from "react";
-import { FaMagic, FaEraser, FaSlidersH, FaCheckCircle, FaArrowRight, FaExclamationTriangle } from "react-icons/fa";
+import { FaMagic, FaEraser, FaSlidersH, FaCheckCircle, FaArrowRight, FaExclamationTriangle, FaUndo, FaRedo, FaHistory } from "react-icons/fa";
 import { useQuery, useMutation } from "@tanstack/react-query";
-import { getProfiling, preprocessDataset } from "../../api/automlApi";
+import {
+  getProfiling, preprocessDataset, preprocessDatasetBatch, previewPreprocessing,
+  getDatasetVersions, undoPreprocessing, redoPreprocessing, checkoutVersion, compareVersions,
+} from "../../api/automlApi";
 import { useNavigate } from "react-router-dom";
 
-const ActionCard = ({ icon: Icon, title, desc, action, loading, onClick, status }) => (
+// An action is previewed on a sample first (nothing saved); Apply then runs it on the whole dataset
+const ActionCard = ({ icon: Icon, title, desc, action, loading, onClick, status, preview, previewing, onPreview, onDiscard }) => (
   <div className="p-6 rounded-xl border border-base-content/10 bg-base-100 hover:border-base-content/20 transition-all shadow-sm">
     <div className="flex justify-between items-start mb-4">
       <div className="p-3 rounded-lg bg-base-200 text-base-content/60">
@@ -16,20 +20,52 @@ const ActionCard = ({ icon: Icon, title, desc, action, loading, onClick, status
     </div>
     <h3 className="text-lg font-bold text-base-content mb-2">{title}</h3>
     <p className="text-sm text-base-content/70 mb-4">{desc}</p>
-    
-    <button
-      onClick={() => onClick(action)}
-      disabled={loading || status === "success"}
-      className={`
-        w-full py-2 rounded-lg font-medium transition-all
-        ${status === "success" 
-          ? "bg-green-500/20 text-green-400 border border-green-500/20 cursor-default"
-          : "bg-primary text-white hover:bg-primary/90 active:scale-95 disabled:opacity-50 disabled:cursor-not-allowed"
-        }
-      `}
-    >
-      {loading ? "Processing..." : status === "success" ? "Applied" : "Apply"}
-    </button>
+
+    {preview && status !== "success" && (
+      <div className="mb-4 p-3 rounded-lg bg-base-200/60 text-xs text-base-content/70 space-y-1">
+        <p>
+          Rows after: <span className="font-mono text-primary">{preview.estimated_rows_after_processing}</span> of{" "}
+          <span className="font-mono">{preview.total_rows}</span> (estimated)
+        </p>
+        <p>Columns changed: {Object.keys(preview.changed_statistics || {}).join(", ") || "none"}</p>
+        <p className="italic">Previewed on a {preview.sample_rows}-row sample; nothing saved yet.</p>
+      </div>
+    )}
+
+    {preview || status === "success" ? (
+      <div className="flex gap-2">
+        <button
+          onClick={() => onClick(action)}
+          disabled={loading || status === "success"}
+          className={`
+            flex-1 py-2 rounded-lg font-medium transition-all
+            ${status === "success" 
+              ? "bg-green-500/20 text-green-400 border border-green-500/20 cursor-default"
+              : "bg-primary text-white hover:bg-primary/90 active:scale-95 disabled:opacity-50 disabled:cursor-not-allowed"
+            }
+          `}
+        >
+          {loading ? "Processing..." : status === "success" ? "Applied" : "Apply"}
+        </button>
+        {status !== "success" && (
+          <button
+            onClick={() => onDiscard(action)}
+            disabled={loading}
+            className="px-3 py-2 rounded-lg font-medium border border-base-content/20 text-base-content/70 hover:bg-base-200 disabled:opacity-50"
+          >
+            Discard
+          </button>
+        )}
+      </div>
+    ) : (
+      <button
+        onClick={() => onPreview(action)}
+        disabled={loading || previewing}
+        className="w-full py-2 rounded-lg font-medium transition-all border border-primary text-primary hover:bg-primary/10 active:scale-95 disabled:opacity-50 disabled:cursor-not-allowed"
+      >
+        {previewing ? "Previewing..." : "Preview"}
+      </button>
+    )}
   </div>
 );
 
@@ -63,6 +99,11 @@ const Preprocessing = () => {
     outliers: "idle"
   });
 
+  // Sample-based previews of the actions not applied yet (action -> preview response)
+  const [previews, setPreviews] = useState({});
+  // How a selected version differs from the current one
+  const [comparison, setComparison] = useState(null);
+
   const navigate = useNavigate();
   const datasetId = localStorage.getItem("dataset_id");
 
@@ -73,11 +114,20 @@ const Preprocessing = () => {
     enabled: !!datasetId,
   });
 
+  // Version history of the applied actions (undo/redo/checkout move between versions)
+  const { data: versionData, refetch: refetchVersions } = useQuery({
+    queryKey: ["versions", datasetId],
+    queryFn: () => getDatasetVersions(datasetId),
+    enabled: !!datasetId,
+  });
+
   const mutation = useMutation({
     mutationFn: (payload) => preprocessDataset(datasetId, payload),
     onSuccess: (data, variables) => {
       setActionStatus(prev => ({ ...prev, [variables.action]: "success" }));
+      setPreviews({}); // the dataset changed: previews of the other actions are stale
       refetchProfiling(); // Refresh data to show changes
+      refetchVersions();
     },
     onError: (error, variables) => {
       console.error(error);
@@ -86,6 +136,33 @@ const Preprocessing = () => {
     },
   });
 
+  const previewMutation = useMutation({
+    mutationFn: (payload) => previewPreprocessing(datasetId, payload),
+    onSuccess: (data, variables) => {
+      if (data?.mode !== "preview") {
+        alert(`Failed to preview ${variables.action}: ${data?.detail || "unknown error"}`);
+        return;
+      }
+      setPreviews(prev => ({ ...prev, [variables.action]: data }));
+    },
+    onError: (error, variables) => {
+      console.error(error);
+      alert(`Failed to preview ${variables.action}: ${error.message}`);
+    },
+  });
+
+  const buildPayload = (action) => ({
+    dataset_id: datasetId,
+    target_column: targetColumn,
+    action: action,
+    categorical_columns: [] 
+    // Note: Ideally we pass specific columns, but current backend 
+    // logic might infer them or we should allow user selection.
+    // For V1, the backend helper 'handle_missing' etc. often re-detects 
+    // or we can pass all cats from profiling if strictly needed. 
+    // Let's rely on backend detection or pass empty if not manually selected.
+  });
+
   const handleAction = (action) => {
     if (!targetColumn) {
       alert("Please select a target column first.");
@@ -93,20 +170,93 @@ const Preprocessing = () => {
     }
     // Set loading
     setActionStatus(prev => ({ ...prev, [action]: "loading" }));
+    mutation.mutate(buildPayload(action));
+  };
+
+  const handlePreview = (action) => {
+    if (!targetColumn) {
+      alert("Please select a target column first.");
+      return;
+    }
+    previewMutation.mutate(buildPayload(action));
+  };
+
+  const handleDiscard = (action) => {
+    setPreviews(({ [action]: _, ...rest }) => rest);
+  };
 
-    const payload = {
+  // Apply every suggested action that is not applied yet, in one batch request
+  const batchMutation = useMutation({
+    mutationFn: (payload) => preprocessDatasetBatch(datasetId, payload),
+    onSuccess: (data, variables) => {
+      const status = data?.actions ? "success" : "error";
+      setActionStatus(prev => ({
+        ...prev,
+        ...Object.fromEntries(variables.actions.map(action => [action, status])),
+      }));
+      setPreviews({});
+      refetchProfiling();
+      refetchVersions();
+    },
+    onError: (error, variables) => {
+      console.error(error);
+      setActionStatus(prev => ({
+        ...prev,
+        ...Object.fromEntries(variables.actions.map(action => [action, "error"])),
+      }));
+      alert(`Failed to apply ${variables.actions.join(", ")}: ${error.message}`);
+    },
+  });
+
+  // Undo, redo and checkout only move the current version; the cards follow its actions
+  const versionMutation = useMutation({
+    mutationFn: ({ move, version }) =>
+      move === "undo" ? undoPreprocessing(datasetId)
+        : move === "redo" ? redoPreprocessing(datasetId)
+        : checkoutVersion(datasetId, version),
+    onSuccess: (data) => {
+      if (!data?.pipeline) {
+        alert(data?.detail || "Could not change the dataset version.");
+        return;
+      }
+      setActionStatus(prev => Object.fromEntries(
+        Object.keys(prev).map(action => [action, data.pipeline.includes(action) ? "success" : "idle"])
+      ));
+      setPreviews({});
+      setComparison(null);
+      refetchProfiling();
+      refetchVersions();
+    },
+    onError: (error) => {
+      console.error(error);
+      alert(`Could not change the dataset version: ${error.message}`);
+    },
+  });
+
+  const handleCompare = async (version) => {
+    const result = await compareVersions(datasetId, versionData.current, version);
+    setComparison(result?.a ? result : null);
+  };
+
+  const pendingSuggestions = (profilingData?.preprocessing_suggestions || [])
+    .map(s => s.action)
+    .filter(action => actionStatus[action] !== "success");
+
+  const handleApplyAll = () => {
+    if (!targetColumn) {
+      alert("Please select a target column first.");
+      return;
+    }
+    setActionStatus(prev => ({
+      ...prev,
+      ...Object.fromEntries(pendingSuggestions.map(action => [action, "loading"])),
+    }));
+    batchMutation.mutate({
       dataset_id: datasetId,
       target_column: targetColumn,
-      action: action,
-      categorical_columns: [] 
-      // Note: Ideally we pass specific columns, but current backend 
-      // logic might infer them or we should allow user selection.
-      // For V1, the backend helper 'handle_missing' etc. often re-detects 
-      // or we can pass all cats from profiling if strictly needed. 
-      // Let's rely on backend detection or pass empty if not manually selected.
-    };
-
-    mutation.mutate(payload);
+      actions: pendingSuggestions,
+      categorical_columns: []
+    });
   };
 
   // Helper to check if action is suggested
@@ -212,9 +362,20 @@ const Preprocessing = () => {
       {/* SUGGESTED ACTIONS GRID */}
       {profilingData?.preprocessing_suggestions && (
         <div className="space-y-4">
-          <h3 className="text-xl font-bold text-base-content flex items-center gap-2">
-            <FaMagic className="text-primary" /> Recommended Actions
-          </h3>
+          <div className="flex justify-between items-center">
+            <h3 className="text-xl font-bold text-base-content flex items-center gap-2">
+              <FaMagic className="text-primary" /> Recommended Actions
+            </h3>
+            {pendingSuggestions.length > 1 && (
+              <button
+                onClick={handleApplyAll}
+                disabled={batchMutation.isPending}
+                className="px-4 py-2 rounded-lg font-medium bg-primary text-white hover:bg-primary/90 active:scale-95 disabled:opacity-50 disabled:cursor-not-allowed"
+              >
+                {batchMutation.isPending ? "Processing..." : "Apply All"}
+              </button>
+            )}
+          </div>
           
           <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6">
             {/* Render Missing Values if suggested */}
@@ -227,6 +388,10 @@ const Preprocessing = () => {
                 loading={actionStatus.missing === "loading"}
                 status={actionStatus.missing}
                 onClick={handleAction}
+                preview={previews.missing}
+                previewing={previewMutation.isPending && previewMutation.variables?.action === "missing"}
+                onPreview={handlePreview}
+                onDiscard={handleDiscard}
               />
             )}
             
@@ -240,6 +405,10 @@ const Preprocessing = () => {
                 loading={actionStatus.outliers === "loading"}
                 status={actionStatus.outliers}
                 onClick={handleAction}
+                preview={previews.outliers}
+                previewing={previewMutation.isPending && previewMutation.variables?.action === "outliers"}
+                onPreview={handlePreview}
+                onDiscard={handleDiscard}
               />
             )}
 
@@ -253,6 +422,10 @@ const Preprocessing = () => {
                 loading={actionStatus.scaling === "loading"}
                 status={actionStatus.scaling}
                 onClick={handleAction}
+                preview={previews.scaling}
+                previewing={previewMutation.isPending && previewMutation.variables?.action === "scaling"}
+                onPreview={handlePreview}
+                onDiscard={handleDiscard}
               />
             )}
 
@@ -266,6 +439,10 @@ const Preprocessing = () => {
                 loading={actionStatus.encoding === "loading"}
                 status={actionStatus.encoding}
                 onClick={handleAction}
+                preview={previews.encoding}
+                previewing={previewMutation.isPending && previewMutation.variables?.action === "encoding"}
+                onPreview={handlePreview}
+                onDiscard={handleDiscard}
               />
             )}
           </div>
@@ -283,7 +460,85 @@ const Preprocessing = () => {
         </div>
       )}
 
+      {/* VERSION HISTORY */}
+      {versionData?.versions && (
+        <div className="bg-base-100 border border-base-content/10 rounded-xl p-6 shadow-sm space-y-4">
+          <div className="flex justify-between items-center">
+            <h3 className="text-base-content font-bold flex items-center gap-2">
+              <FaHistory className="text-primary" /> Version History
+            </h3>
+            <div className="flex gap-2">
+              <button
+                onClick={() => versionMutation.mutate({ move: "undo" })}
+                disabled={versionData.undo === null || versionMutation.isPending}
+                className="flex items-center gap-2 px-3 py-2 rounded-lg font-medium border border-base-content/20 text-base-content/80 hover:bg-base-200 disabled:opacity-50 disabled:cursor-not-allowed"
+              >
+                <FaUndo /> Undo
+              </button>
+              <button
+                onClick={() => versionMutation.mutate({ move: "redo" })}
+                disabled={versionData.redo === null || versionMutation.isPending}
+                className="flex items-center gap-2 px-3 py-2 rounded-lg font-medium border border-base-content/20 text-base-content/80 hover:bg-base-200 disabled:opacity-50 disabled:cursor-not-allowed"
+              >
+                <FaRedo /> Redo
+              </button>
+            </div>
+          </div>
 
+          <table className="w-full text-left border-collapse text-sm">
+            <thead>
+              <tr className="text-base-content/60 border-b border-base-content/10">
+                <th className="p-2">Version</th>
+                <th className="p-2">Action</th>
+                <th className="p-2">Rows</th>
+                <th className="p-2"></th>
+              </tr>
+            </thead>
+            <tbody className="text-base-content/80">
+              {versionData.versions.map((v) => (
+                <tr key={v.version} className={`border-b border-base-content/5 last:border-0 ${v.head ? "bg-primary/10" : ""}`}>
+                  <td className="p-2 font-mono">v{v.version}{v.parent !== null && v.parent !== v.version - 1 ? ` (from v${v.parent})` : ""}</td>
+                  <td className="p-2">{v.action || "Raw data"}</td>
+                  <td className="p-2 font-mono">{v.rows}</td>
+                  <td className="p-2 text-right space-x-2">
+                    {v.head ? (
+                      <span className="text-xs text-primary font-semibold">Current</span>
+                    ) : (
+                      <>
+                        <button onClick={() => handleCompare(v.version)} className="text-xs text-base-content/60 hover:text-primary">
+                          Compare
+                        </button>
+                        <button
+                          onClick={() => versionMutation.mutate({ move: "checkout", version: v.version })}
+                          disabled={versionMutation.isPending}
+                          className="text-xs text-primary hover:underline disabled:opacity-50"
+                        >
+                          Checkout
+                        </button>
+                      </>
+                    )}
+                  </td>
+                </tr>
+              ))}
+            </tbody>
+          </table>
+
+          {comparison && (
+            <div className="p-3 rounded-lg bg-base-200/60 text-xs text-base-content/70 space-y-1">
+              <p className="font-semibold">
+                Current (v{comparison.a.version}) vs v{comparison.b.version}, from v{comparison.common_ancestor}
+              </p>
+              <p>Only in current: {comparison.actions_only_in_a.join(", ") || "none"}</p>
+              <p>Only in v{comparison.b.version}: {comparison.actions_only_in_b.join(", ") || "none"}</p>
+              <p>
+                {comparison.rows_differ
+                  ? "Rows differ (an outlier filter is involved): every column differs."
+                  : `Columns that differ: ${comparison.changed_columns.join(", ") || "none"}`}
+              </p>
+            </div>
+          )}
+        </div>
+      )}
     </div>
   );
 };
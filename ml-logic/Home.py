@@ -38,6 +38,7 @@ if uploaded_file and "df" not in st.session_state:
     # Use our newly created unique ID
     st.session_state.file_id = f"{uploaded_file.name}-{uploaded_file.size}"
     
+    # Multithreaded Arrow parser (falls back to pandas for malformed files)
     st.session_state.df = load_csv(uploaded_file)
     st.session_state.categorical_cols_initial = st.session_state.df.select_dtypes(include=['object', 'category']).columns.tolist()
     st.session_state.imbalance_ratio = None
@@ -1,9 +1,43 @@
 # ml-logic/logic/preprocessing/feature_transformer.py
 
-from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.preprocessing import StandardScaler
 import pandas as pd
 import numpy as np
 
+def factorize_labels(series):
+    """
+    Codes and classes of LabelEncoder().fit_transform(series.astype(str)), from a
+    factorization: values are hashed to codes once and only the distinct values are
+    turned into strings and sorted. `category` columns are encoded from their integer codes.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        labels = np.asarray(series.cat.categories.astype(str), dtype=object)
+        codes = series.cat.codes.to_numpy().astype(np.int64)
+        na_labels = np.array(["nan"], dtype=object)
+        na_codes = np.zeros(int((codes < 0).sum()), dtype=np.int64)
+    else:
+        values = series.to_numpy()
+        codes, uniques = pd.factorize(values)
+        labels = np.asarray(pd.Index(uniques, dtype=object).astype(str), dtype=object)
+        # Missing values become their string form ("nan", "None"), exactly like astype(str)
+        na_labels, na_codes = np.unique(values[codes < 0].astype(str), return_inverse=True)
+
+    na = codes < 0
+    if na.any():
+        codes = codes.copy()
+        codes[na] = len(labels) + na_codes
+        labels = np.concatenate([labels, na_labels.astype(object)])
+
+    # Distinct values sharing a string form (1 and "1") share a code, sorted like LabelEncoder's classes
+    labels, inverse = np.unique(labels, return_inverse=True)
+    return inverse[codes], labels
+
+
+def _label_encode(series):
+    """Same codes as LabelEncoder().fit_transform(series.astype(str)) (see factorize_labels)."""
+    return pd.to_numeric(factorize_labels(series)[0], downcast="integer")
+
+
 def encode_data(df, categorical_cols, target_column=None):
     """Encodes categorical features and target column."""
     df_processed = df.copy()
@@ -15,15 +49,12 @@ def encode_data(df, categorical_cols, target_column=None):
             not col.lower().endswith("id") and 
             col.lower() not in ["id", "index", "row_id", "observation_id"]):
             
-            df_processed[col] = df_processed[col].astype(str)
-            le = LabelEncoder()
-            df_processed[col] = le.fit_transform(df_processed[col])
+            df_processed[col] = _label_encode(df_processed[col])
 
     # --- Step 2: Encode Target Column if Categorical ---
     if target_column and target_column in df_processed.columns:
         if df_processed[target_column].dtype == 'object' or df_processed[target_column].dtype.name == 'category':
-            le_target = LabelEncoder()
-            df_processed[target_column] = le_target.fit_transform(df_processed[target_column].astype(str))
+            df_processed[target_column] = _label_encode(df_processed[target_column])
             
     return df_processed
 
@@ -1,6 +1,49 @@
 # ml-logic/logic/preprocessing/algorithm_recommender.py
 
-def recommend_algorithm(df, target_column, imbalance_ratio):
+# Landmark score margin within which the linear proxy counts as "as good as" the non-linear ones
+LINEAR_MARGIN = 0.01
+
+# Entries available for promotion when landmarking picks the top algorithm
+ALGORITHM_CATALOG = {
+    "Logistic Regression": "Provides interpretable results and works well when classes are close to linearly separable.",
+    "Linear Regression": "Simple, transparent, and efficient when the target depends roughly linearly on the features.",
+    "SVM": "Effective in high-dimensional spaces and best for smaller, complex datasets.",
+    "SVR": "Robust to outliers and effective in high-dimensional spaces.",
+    "Random Forest": "Suitable for large datasets, handles mixed features, and provides stability.",
+    "Random Forest Regressor": "Captures nonlinear relationships and interactions automatically.",
+}
+
+
+def _landmark_choice(landmarks, task_type, n_rows):
+    """
+    Top algorithm from the landmarking meta-features (proxy model scores), or None
+    when none are available. Returns (algorithm, catalog name, reason).
+    """
+    scores = {name: landmarks.get(f"landmark_{name}") for name in ("linear", "1nn", "stump", "naive_bayes")}
+    scores = {name: score for name, score in scores.items() if score is not None}
+    nonlinear = {name: scores[name] for name in ("1nn", "stump") if name in scores}
+    if "linear" not in scores or not nonlinear:
+        return None
+
+    best_nonlinear = max(nonlinear, key=nonlinear.get)
+    if scores["linear"] >= nonlinear[best_nonlinear] - LINEAR_MARGIN:
+        algo = "Logistic Regression" if task_type == "classification" else "Linear Regression"
+        return algo, algo, "a linear proxy scores as well as the non-linear ones, so a linear model should suffice."
+    if best_nonlinear == "1nn" and n_rows < 10000:
+        # Local, non-linear class structure on a small dataset: kernel methods
+        algo = "SVM" if task_type == "classification" else "SVR"
+        return algo, algo, "1-NN beats the linear proxy, pointing to a non-linear boundary."
+    # Few strong, threshold-like features (stump) or non-linear structure on large data: tree ensembles
+    name = "Random Forest" if task_type == "classification" else "Random Forest Regressor"
+    return "Random Forest", name, f"{'a decision stump' if best_nonlinear == 'stump' else '1-NN'} beats the linear proxy, pointing to non-linear structure."
+
+
+def recommend_algorithm(df, target_column, imbalance_ratio, landmarks=None):
+    """
+    `landmarks` optionally holds landmarking meta-features (scores of cheap proxy
+    models, see the backend's Landmarker); when present they pick the top algorithm
+    instead of the row-count thresholds.
+    """
     n_rows = df.shape[0]
     target_dtype = df[target_column].dtype
 
@@ -11,7 +54,10 @@ def recommend_algorithm(df, target_column, imbalance_ratio):
         task_type = "regression"
 
     # Base algorithm recommendation
-    if n_rows < 10000:
+    choice = _landmark_choice(landmarks, task_type, n_rows) if landmarks else None
+    if choice is not None:
+        base_algo = choice[0]
+    elif n_rows < 10000:
         base_algo = "Logistic Regression" if task_type == "classification" else "Linear Regression"
     else:
         base_algo = "Random Forest" if task_type == "classification" else "XGBoost"
@@ -29,6 +75,14 @@ def recommend_algorithm(df, target_column, imbalance_ratio):
     ]
     if is_imbalanced:
         reason_parts.append(f"**Class Imbalance**: Detected (Ratio > 2).")
+    if choice is not None:
+        metric = "accuracy" if task_type == "classification" else "R²"
+        labels = {"linear": "linear", "1nn": "1-NN", "stump": "stump", "naive_bayes": "naive Bayes"}
+        measured = ", ".join(
+            f"{label} {landmarks[f'landmark_{name}']}" for name, label in labels.items()
+            if landmarks.get(f"landmark_{name}") is not None
+        )
+        reason_parts.append(f"**Landmarking** ({metric} of quick proxy models: {measured}): {choice[2]}")
 
     # Explanation
     from logic.selection.explanation_generator import get_explanation
@@ -103,6 +157,12 @@ def recommend_algorithm(df, target_column, imbalance_ratio):
                 }
             ]
 
+    # Landmarking pick leads the list (it is what gets trained first)
+    if choice is not None:
+        name = choice[1]
+        recommendations = [r for r in recommendations if r["name"] != name]
+        recommendations = [{"name": name, "best_for": ALGORITHM_CATALOG[name]}] + recommendations[:2]
+
     # ✅ Return consistent structure
     return {
         "top_algorithm": base_algo,
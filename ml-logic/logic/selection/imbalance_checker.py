@@ -2,5 +2,7 @@
 
 def check_class_imbalance(df, target_column):
     counts = df[target_column].value_counts()
+    # `category` targets also list unused categories with a count of 0
+    counts = counts[counts > 0]
     ratio = counts.max() / counts.min()
     return ratio
\ No newline at end of file
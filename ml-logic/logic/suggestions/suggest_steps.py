@@ -41,7 +41,7 @@ def generate_suggestions(df, categorical_cols, imbalance_ratio, target_column=No
                            "Apply encoding (Label Encoding for ordinal, One-Hot Encoding for nominal).")
 
     # 3. Numeric scaling
-    numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
+    numeric_cols = df.select_dtypes(include='number').columns
     
     # --- THIS IS THE FIX ---
     # Exclude the target column from the list of columns to check for scaling
@@ -1,6 +1,173 @@
 # ml-logic/utils/file_ops/csv_loader.py
 
+import io
+import os
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 
-def load_csv(uploaded_file):
-    return pd.read_csv(uploaded_file)
\ No newline at end of file
+# Parser used by load_csv / iter_csv unless a caller asks for a specific one
+CSV_ENGINE = os.getenv("CSV_ENGINE", "arrow")
+
+# Arrow parses blocks of this size in parallel; bigger blocks = fewer, larger tasks
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Bytes read from the start of the file to infer column types
+DEFAULT_SAMPLE_BYTES = 1024 * 1024
+
+# Rows per chunk for the pandas backend's iterator
+DEFAULT_CHUNK_ROWS = 250_000
+
+# Same strings pandas treats as missing by default, so both engines agree
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+
+def arrow_type(dtype):
+    """Arrow type that converts back to the given pandas dtype (what iter_csv parses a column of it into)."""
+    if pd.api.types.is_bool_dtype(dtype):
+        return pa.bool_()
+    if pd.api.types.is_integer_dtype(dtype):
+        return pa.int64()
+    if pd.api.types.is_float_dtype(dtype):
+        return pa.float64()
+    return pa.string()
+
+
+def _read_sample(source, sample_bytes):
+    """First `sample_bytes` of the source cut at a line end; rewinds file objects."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            sample = f.read(sample_bytes)
+    else:
+        sample = source.read(sample_bytes)
+        source.seek(0)
+    if isinstance(sample, str):
+        sample = sample.encode()
+    if len(sample) == sample_bytes:
+        # Cut after the last complete record (a newline inside a quoted field does not end one)
+        end = sample.rfind(b"\n")
+        quotes = sample.count(b'"', 0, end) if end != -1 else 0
+        while end != -1 and quotes % 2:
+            previous = sample.rfind(b"\n", 0, end)
+            quotes -= sample.count(b'"', previous + 1, end)
+            end = previous
+        sample = sample[:end + 1] or sample
+    return sample
+
+
+def _rewind(source):
+    if not isinstance(source, (str, os.PathLike)) and hasattr(source, "seek"):
+        source.seek(0)
+
+
+class PandasCSVParser:
+    """Single-threaded pandas parser. Slowest, but tolerant of malformed files."""
+
+    name = "pandas"
+
+    def __init__(self, chunk_rows=DEFAULT_CHUNK_ROWS, **options):
+        self.chunk_rows = chunk_rows
+
+    def read(self, source, dtypes=None) -> pd.DataFrame:
+        return pd.read_csv(source, dtype=dtypes)
+
+    def iter_batches(self, source, dtypes=None):
+        schema = None
+        for chunk in pd.read_csv(source, dtype=dtypes, chunksize=self.chunk_rows):
+            batch = pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False)
+            schema = batch.schema
+            yield batch
+
+
+class ArrowCSVParser:
+    """
+    Multithreaded Arrow parser.
+    Column types come from the caller or are inferred by pandas on a small sample, so the
+    result has the same dtypes a plain `pd.read_csv` would produce (no Arrow date/timestamp
+    inference). Raises `pa.ArrowInvalid` when the rest of the file disagrees with the sample.
+    """
+
+    name = "arrow"
+
+    def __init__(self, block_size=DEFAULT_BLOCK_SIZE, sample_bytes=DEFAULT_SAMPLE_BYTES,
+                 use_threads=True, **options):
+        self.block_size = block_size
+        self.sample_bytes = sample_bytes
+        self.use_threads = use_threads
+
+    def _options(self, source, dtypes):
+        if dtypes is None:
+            dtypes = pd.read_csv(io.BytesIO(_read_sample(source, self.sample_bytes))).dtypes.to_dict()
+        read_options = pa_csv.ReadOptions(block_size=self.block_size, use_threads=self.use_threads)
+        convert_options = pa_csv.ConvertOptions(
+            column_types={col: arrow_type(dtype) for col, dtype in dtypes.items()},
+            null_values=NA_VALUES,
+            strings_can_be_null=True,
+        )
+        return read_options, convert_options
+
+    def read(self, source, dtypes=None) -> pd.DataFrame:
+        read_options, convert_options = self._options(source, dtypes)
+        table = pa_csv.read_csv(source, read_options=read_options, convert_options=convert_options)
+        return table.to_pandas()
+
+    def iter_batches(self, source, dtypes=None):
+        read_options, convert_options = self._options(source, dtypes)
+        with pa_csv.open_csv(source, read_options=read_options, convert_options=convert_options) as reader:
+            for batch in reader:
+                yield batch
+
+
+PARSERS = {
+    PandasCSVParser.name: PandasCSVParser,
+    ArrowCSVParser.name: ArrowCSVParser,
+}
+
+
+def register_parser(name, parser_cls):
+    """Plug in another backend (anything with `read` and `iter_batches`)."""
+    PARSERS[name] = parser_cls
+
+
+def get_parser(engine=None, **options):
+    engine = engine or CSV_ENGINE
+    if engine not in PARSERS:
+        raise ValueError(f"Unknown CSV engine '{engine}'. Available: {sorted(PARSERS)}")
+    return PARSERS[engine](**options)
+
+
+def load_csv(uploaded_file, engine=None, dtypes=None, **options):
+    """
+    Parse a whole CSV (path or file-like) into a DataFrame.
+    Falls back to pandas when the selected engine cannot handle the file.
+    """
+    parser = get_parser(engine, **options)
+    try:
+        return parser.read(uploaded_file, dtypes=dtypes)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, UnicodeDecodeError):
+        if parser.name == PandasCSVParser.name:
+            raise
+        _rewind(uploaded_file)
+        return PandasCSVParser(**options).read(uploaded_file, dtypes=dtypes)
+
+
+def iter_csv(source, engine=None, dtypes=None, **options):
+    """
+    Stream a CSV as Arrow record batches with one schema.
+    A malformed file only falls back to pandas if nothing has been yielded yet;
+    callers that must survive late failures should restart with engine="pandas".
+    """
+    parser = get_parser(engine, **options)
+    yielded = False
+    try:
+        for batch in parser.iter_batches(source, dtypes=dtypes):
+            yielded = True
+            yield batch
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, UnicodeDecodeError):
+        if yielded or parser.name == PandasCSVParser.name:
+            raise
+        _rewind(source)
+        yield from PandasCSVParser(**options).iter_batches(source, dtypes=dtypes)
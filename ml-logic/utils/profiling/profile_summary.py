@@ -10,7 +10,7 @@ def get_column_info(df):
     })
 
 def get_categorical_summary(df):
-    categorical_cols = df.select_dtypes(include=['object']).columns
+    categorical_cols = df.select_dtypes(include=['object', 'category']).columns
     summary = {}
     for col in categorical_cols:
         summary[col] = {